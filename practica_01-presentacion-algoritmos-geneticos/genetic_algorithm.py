@@ -0,0 +1,377 @@
+"""
+genetic_algorithm.py - Motor de algoritmo genético vectorizado
+
+El ciclo de la guía (genetic_algorithms_guide.md, Parte 3) en código:
+
+    población inicial → evaluación → selección → cruce → mutación → ...
+
+¿POR QUÉ VECTORIZADO?
+La población es UN array 2D de NumPy:
+
+    población.shape = (n_individuos, n_genes)
+
+Selección, cruce y mutación se hacen con operaciones sobre el array
+entero (máscaras aleatorias, np.where), sin bucles de Python por
+individuo ni por gen. Con poblaciones grandes la diferencia es enorme.
+
+¿POR QUÉ EVALUACIÓN EN PARALELO Y CON CACHÉ?
+Si el fitness es entrenar un modelo (p. ej. los hiperparámetros del
+clasificador de la práctica 04 o de la red de la práctica 02), evaluar
+es lo ÚNICO que cuesta:
+- Cada individuo se evalúa en un proceso distinto (ProcessPoolExecutor)
+- Un genoma ya evaluado no se vuelve a evaluar: los élites y los hijos
+  idénticos a sus padres salen de la caché
+
+¿POR QUÉ CHECKPOINTS?
+Una búsqueda de hiperparámetros puede durar horas. Cada pocas
+generaciones se guarda el estado completo (población, fitness, caché y
+estado del generador aleatorio) y run(resume=True) continúa donde se
+quedó, con los mismos resultados que sin interrupción.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+class _NamedFitness:
+    """Convierte el genoma en un dict {nombre: valor} antes de llamar al fitness."""
+
+    def __init__(self, fitness_fn, gene_names, integer_mask):
+        self.fitness_fn = fitness_fn
+        self.gene_names = gene_names
+        self.integer_mask = integer_mask
+
+    def __call__(self, genome):
+        return self.fitness_fn(decode_genome(genome, self.gene_names, self.integer_mask))
+
+
+def decode_genome(genome, gene_names, integer_mask=None):
+    """Genoma → dict {nombre: valor}; los genes enteros se devuelven como int."""
+    integer_mask = np.zeros(len(genome), dtype=bool) if integer_mask is None else integer_mask
+    return {
+        name: int(value) if is_int else float(value)
+        for name, value, is_int in zip(gene_names, genome, integer_mask)
+    }
+
+
+class GeneticAlgorithm:
+    """
+    Algoritmo genético con genes reales/enteros acotados. MAXIMIZA el fitness.
+
+    Ejemplo (hiperparámetros):
+        def fitness(params):            # función de módulo (se envía a otros procesos)
+            model = build(hidden=params['hidden'], lr=10 ** params['log_lr'])
+            return validation_accuracy(model)
+
+        ga = GeneticAlgorithm(
+            fitness,
+            gene_low=[16, -4], gene_high=[512, -1],
+            gene_names=['hidden', 'log_lr'], integer_genes=[True, False],
+            population_size=30, n_workers=4,
+            checkpoint_path='results/ga.npz'
+        )
+        best, score = ga.run(generations=20, resume=True)
+
+    Args:
+        fitness_fn: fitness_fn(genoma) → float, o fitness_fn(dict) si se
+                    dan gene_names. Debe poder enviarse a otro proceso
+                    (definida a nivel de módulo) si n_workers > 1
+        gene_low, gene_high: Límites de cada gen
+        integer_genes: Máscara de genes enteros (se redondean)
+        tournament_size: Individuos por torneo de selección
+        crossover_rate: Probabilidad de cruzar cada pareja
+        mutation_rate: Probabilidad de mutar cada gen
+        mutation_scale: Desviación de la mutación, relativa al rango del gen
+        elitism: Mejores individuos que pasan intactos a la siguiente generación
+        n_workers: Procesos para evaluar (1 = en este proceso)
+        checkpoint_path: Fichero .npz para guardar/reanudar
+        checkpoint_every: Guardar cada cuántas generaciones
+    """
+
+    def __init__(self, fitness_fn, gene_low, gene_high, population_size=50,
+                 gene_names=None, integer_genes=None, tournament_size=3,
+                 crossover_rate=0.9, mutation_rate=0.1, mutation_scale=0.1,
+                 elitism=2, n_workers=1, checkpoint_path=None, checkpoint_every=1,
+                 seed=None):
+        self.low = np.asarray(gene_low, dtype=np.float64)
+        self.high = np.asarray(gene_high, dtype=np.float64)
+        if self.low.shape != self.high.shape or np.any(self.low > self.high):
+            raise ValueError("gene_low y gene_high deben tener la misma forma y low <= high")
+        if elitism >= population_size:
+            raise ValueError("elitism debe ser menor que population_size")
+
+        self.n_genes = len(self.low)
+        self.population_size = population_size
+        self.integer_mask = (np.zeros(self.n_genes, dtype=bool) if integer_genes is None
+                             else np.asarray(integer_genes, dtype=bool))
+        self.gene_names = gene_names
+        self.fitness_fn = (fitness_fn if gene_names is None
+                           else _NamedFitness(fitness_fn, list(gene_names), self.integer_mask))
+
+        self.tournament_size = tournament_size
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.mutation_scale = mutation_scale
+        self.elitism = elitism
+        self.n_workers = n_workers
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+
+        self.rng = np.random.default_rng(seed)
+        self.population = None
+        self.fitness = None
+        self.generation = 0
+        self.cache = {}
+        self.history = {'best': [], 'mean': [], 'std': [], 'evaluations': [], 'cache_hits': []}
+
+    # ------------------------------------------------------------------
+    # Representación
+    # ------------------------------------------------------------------
+    def _repair(self, population):
+        """Recorta a los límites y redondea los genes enteros (in-place)."""
+        np.clip(population, self.low, self.high, out=population)
+        if self.integer_mask.any():
+            population[:, self.integer_mask] = np.round(population[:, self.integer_mask])
+        return population
+
+    def initial_population(self):
+        """Individuos uniformes en [low, high]."""
+        population = self.rng.uniform(self.low, self.high, size=(self.population_size, self.n_genes))
+        return self._repair(population)
+
+    def decode(self, genome):
+        """Genoma → dict {nombre: valor} (requiere gene_names)."""
+        if self.gene_names is None:
+            raise ValueError("decode necesita gene_names")
+        return decode_genome(genome, self.gene_names, self.integer_mask)
+
+    # ------------------------------------------------------------------
+    # Evaluación
+    # ------------------------------------------------------------------
+    def evaluate(self, population, executor=None):
+        """
+        Fitness de cada individuo, evaluando solo los genomas no vistos.
+
+        Los genomas repetidos dentro de la población se evalúan una vez
+        (np.unique) y los ya evaluados en generaciones anteriores salen
+        de la caché (clave: bytes del genoma).
+
+        Returns:
+            (fitness, evaluaciones nuevas, aciertos de caché)
+        """
+        unique, inverse = np.unique(population, axis=0, return_inverse=True)
+        keys = [genome.tobytes() for genome in unique]
+        pending = [i for i, key in enumerate(keys) if key not in self.cache]
+
+        if pending:
+            genomes = [unique[i] for i in pending]
+            if executor is None:
+                scores = [self.fitness_fn(g) for g in genomes]
+            else:
+                chunksize = max(1, len(genomes) // (4 * self.n_workers))
+                scores = list(executor.map(self.fitness_fn, genomes, chunksize=chunksize))
+            for i, score in zip(pending, scores):
+                self.cache[keys[i]] = float(score)
+
+        unique_fitness = np.array([self.cache[key] for key in keys])
+        fitness = unique_fitness[inverse.ravel()]
+        return fitness, len(pending), len(population) - len(pending)
+
+    # ------------------------------------------------------------------
+    # Operadores genéticos (todos sobre la población entera)
+    # ------------------------------------------------------------------
+    def select(self, fitness, n):
+        """
+        Selección por torneo: n torneos de tournament_size individuos.
+
+        Una matriz (n, tournament_size) de índices al azar; el ganador de
+        cada fila es el de mayor fitness.
+        """
+        contenders = self.rng.integers(0, len(fitness), size=(n, self.tournament_size))
+        winners = np.argmax(fitness[contenders], axis=1)
+        return contenders[np.arange(n), winners]
+
+    def crossover(self, parents_a, parents_b):
+        """
+        Cruce uniforme: cada gen del hijo viene de uno u otro padre.
+
+        Cada pareja da dos hijos complementarios. Las parejas que no se
+        cruzan (1 - crossover_rate) pasan como copias de los padres.
+        """
+        n = len(parents_a)
+        mask = self.rng.random((n, self.n_genes)) < 0.5
+        mask &= (self.rng.random(n) < self.crossover_rate)[:, None]
+        child_a = np.where(mask, parents_b, parents_a)
+        child_b = np.where(mask, parents_a, parents_b)
+        return np.concatenate([child_a, child_b])
+
+    def mutate(self, population):
+        """Mutación gaussiana: cada gen muta con probabilidad mutation_rate (in-place)."""
+        mask = self.rng.random(population.shape) < self.mutation_rate
+        noise = self.rng.normal(0.0, 1.0, size=population.shape)
+        noise *= self.mutation_scale * (self.high - self.low)
+        population += mask * noise
+        return self._repair(population)
+
+    def next_generation(self, population, fitness):
+        """Élites + hijos de torneo, cruce y mutación."""
+        n_children = self.population_size - self.elitism
+        n_pairs = (n_children + 1) // 2
+
+        parents = population[self.select(fitness, 2 * n_pairs)]
+        children = self.crossover(parents[:n_pairs], parents[n_pairs:])[:n_children]
+        children = self.mutate(children)
+
+        elite = population[np.argsort(fitness)[::-1][:self.elitism]]
+        return np.concatenate([elite, children])
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+    def save_checkpoint(self, path=None):
+        """Guarda el estado completo en un .npz (escritura atómica)."""
+        path = path or self.checkpoint_path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        cache_keys = list(self.cache.keys())
+        cache_genomes = (np.frombuffer(b''.join(cache_keys), dtype=np.float64).reshape(-1, self.n_genes)
+                         if cache_keys else np.empty((0, self.n_genes)))
+        state = {
+            'generation': self.generation,
+            'history': self.history,
+            'rng_state': self.rng.bit_generator.state,
+        }
+
+        tmp_path = path + '.tmp.npz'
+        np.savez(
+            tmp_path,
+            population=self.population,
+            fitness=self.fitness,
+            cache_genomes=cache_genomes,
+            cache_scores=np.array([self.cache[k] for k in cache_keys]),
+            state=np.array(json.dumps(state)),
+        )
+        # Si el proceso muere a mitad de escritura, el checkpoint anterior sigue intacto
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, path=None):
+        """Restaura población, fitness, caché, historial y generador aleatorio."""
+        path = path or self.checkpoint_path
+        with np.load(path) as data:
+            if data['population'].shape[1] != self.n_genes:
+                raise ValueError(f"El checkpoint tiene {data['population'].shape[1]} genes, "
+                                 f"se esperaban {self.n_genes}")
+            self.population = data['population']
+            self.fitness = data['fitness']
+            self.cache = {g.tobytes(): float(s)
+                          for g, s in zip(data['cache_genomes'], data['cache_scores'])}
+            state = json.loads(str(data['state']))
+
+        self.generation = state['generation']
+        self.history = state['history']
+        self.rng.bit_generator.state = state['rng_state']
+
+    # ------------------------------------------------------------------
+    # Bucle principal
+    # ------------------------------------------------------------------
+    def run(self, generations=50, resume=False, verbose=True):
+        """
+        Evoluciona hasta completar `generations` generaciones en total.
+
+        Args:
+            resume: Continuar desde checkpoint_path si existe
+
+        Returns:
+            (mejor genoma, su fitness)
+        """
+        if resume and self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            self.load_checkpoint()
+            if verbose:
+                print(f"Reanudando desde la generación {self.generation} ({self.checkpoint_path})")
+
+        executor = ProcessPoolExecutor(self.n_workers) if self.n_workers > 1 else None
+        try:
+            if self.population is None:
+                self.population = self.initial_population()
+                self.fitness, _, _ = self.evaluate(self.population, executor)
+
+            while self.generation < generations:
+                start = time.perf_counter()
+                self.population = self.next_generation(self.population, self.fitness)
+                self.fitness, n_evals, n_hits = self.evaluate(self.population, executor)
+                self.generation += 1
+
+                self.history['best'].append(float(self.fitness.max()))
+                self.history['mean'].append(float(self.fitness.mean()))
+                self.history['std'].append(float(self.fitness.std()))
+                self.history['evaluations'].append(n_evals)
+                self.history['cache_hits'].append(n_hits)
+
+                if verbose:
+                    print(f"Generación {self.generation:3d}/{generations} - "
+                          f"mejor: {self.history['best'][-1]:.4f}  media: {self.history['mean'][-1]:.4f}  "
+                          f"evaluados: {n_evals:3d}  caché: {n_hits:3d}  "
+                          f"({time.perf_counter() - start:.2f}s)")
+
+                if self.checkpoint_path and self.generation % self.checkpoint_every == 0:
+                    self.save_checkpoint()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if self.checkpoint_path:
+            self.save_checkpoint()
+
+        best = int(np.argmax(self.fitness))
+        return self.population[best].copy(), float(self.fitness[best])
+
+
+# ============================================================
+# PRUEBAS
+# ============================================================
+def rastrigin_fitness(genome):
+    """Rastrigin negada: máximo 0 en el origen, con muchos óptimos locales."""
+    return -float(10 * len(genome) + np.sum(genome ** 2 - 10 * np.cos(2 * np.pi * genome)))
+
+
+def slow_fitness(params):
+    """Fitness "caro" de juguete: simula entrenar un modelo."""
+    time.sleep(0.01)
+    return -((params['hidden'] - 128) / 128) ** 2 - (params['log_lr'] + 3) ** 2
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("=" * 50)
+    print("ALGORITMO GENÉTICO: RASTRIGIN 10D")
+    print("=" * 50)
+
+    ga = GeneticAlgorithm(rastrigin_fitness, gene_low=[-5.12] * 10, gene_high=[5.12] * 10,
+                          population_size=200, mutation_rate=0.1, seed=42)
+    best, score = ga.run(generations=100, verbose=False)
+    print(f"Mejor fitness: {score:.4f} (óptimo 0)")
+    print(f"Mejor genoma: {np.round(best, 3)}")
+
+    print("\n" + "=" * 50)
+    print("HIPERPARÁMETROS: PARALELO + CACHÉ + CHECKPOINT")
+    print("=" * 50)
+
+    checkpoint = os.path.join(tempfile.mkdtemp(), 'ga.npz')
+    common = dict(gene_low=[16, -5], gene_high=[512, -1], gene_names=['hidden', 'log_lr'],
+                  integer_genes=[True, False], population_size=20,
+                  n_workers=min(4, os.cpu_count() or 1), checkpoint_path=checkpoint, seed=0)
+
+    ga = GeneticAlgorithm(slow_fitness, **common)
+    ga.run(generations=5)
+
+    print("\n--- Interrupción simulada: nueva instancia, resume=True ---")
+    ga = GeneticAlgorithm(slow_fitness, **common)
+    best, score = ga.run(generations=10, resume=True)
+    print(f"\nMejor: {ga.decode(best)} (fitness {score:.4f})")
+    print(f"Evaluaciones totales: {len(ga.cache)}  "
+          f"aciertos de caché: {sum(ga.history['cache_hits'])}")
@@ -0,0 +1,273 @@
+"""
+benchmark.py - Comparación de rendimiento: implementaciones propias vs librerías
+
+¿QUÉ SE MIDE?
+Para cada modelo, tamaño de datos y número de hilos:
+- wall_time: segundos de entrenamiento (reloj real)
+- samples_per_sec: muestras procesadas por segundo (n × épocas / tiempo)
+- peak_rss_mb: pico de memoria que añade el entrenamiento: RSS máxima
+  durante la ejecución menos la RSS justo antes de empezarla
+  (rss_baseline_mb). Sin restar, cada ejecución heredaría la memoria que
+  las anteriores dejaron reservada en el proceso
+- peak_alloc_mb: pico de memoria reservada por Python/NumPy (tracemalloc,
+  opcional porque ralentiza el código con muchas reservas pequeñas)
+- accuracy: en un conjunto de test separado. Para los modelos no
+  supervisados (SOM, k-means) cada neurona/cluster predice la clase
+  mayoritaria de sus muestras de entrenamiento ("pureza")
+
+Todos los modelos reciben exactamente los mismos datos preprocesados y
+hacen el mismo número de pasadas por ellos (épocas), también k-means.
+"""
+
+import csv
+import gc
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+import numpy as np
+
+from .custom.mlp import MLP
+from .custom.som import SOM
+from .utils.preprocessing import StandardScaler
+
+
+# ============================================================
+# MEDICIÓN
+# ============================================================
+def _current_rss_mb():
+    """RSS actual del proceso en MB (Linux: /proc; resto: pico de getrusage)."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux lo da en KB, macOS en bytes
+        return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+class _RSSSampler(threading.Thread):
+    """Hilo que muestrea la RSS cada `interval` segundos y guarda el máximo."""
+
+    def __init__(self, interval=0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = _current_rss_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, _current_rss_mb())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak = max(self.peak, _current_rss_mb())
+
+
+def _thread_limit(n_threads):
+    """Limita los hilos de BLAS/OpenMP (threadpoolctl viene con scikit-learn)."""
+    if n_threads is None:
+        return nullcontext()
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        print("  (threadpoolctl no instalado: no se limita el número de hilos)")
+        return nullcontext()
+    return threadpool_limits(limits=n_threads)
+
+
+def measure(train_fn, n_threads=None, trace_allocations=False):
+    """
+    Ejecuta train_fn() y mide tiempo y memoria.
+
+    La RSS de referencia se toma justo antes de empezar (tras gc.collect())
+    y se resta del pico. Fuera de Linux solo hay pico de toda la vida del
+    proceso (getrusage), así que la diferencia es 0 si no se supera el
+    pico de una ejecución anterior.
+
+    Returns:
+        (resultado de train_fn, dict con wall_time, peak_rss_mb,
+        rss_baseline_mb, peak_alloc_mb)
+        peak_alloc_mb es None si trace_allocations=False
+    """
+    gc.collect()
+    baseline = _current_rss_mb()
+    sampler = _RSSSampler()
+    if trace_allocations:
+        tracemalloc.start()
+    sampler.start()
+    peak_alloc = None
+    try:
+        with _thread_limit(n_threads):
+            start = time.perf_counter()
+            result = train_fn()
+            wall_time = time.perf_counter() - start
+    finally:
+        sampler.stop()
+        if trace_allocations:
+            peak_alloc = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.stop()
+
+    return result, {
+        'wall_time': wall_time,
+        'peak_rss_mb': max(sampler.peak - baseline, 0.0),
+        'rss_baseline_mb': baseline,
+        'peak_alloc_mb': peak_alloc,
+    }
+
+
+def cluster_purity(train_assignments, y_train, test_assignments, y_test, n_units):
+    """Accuracy de predecir la clase mayoritaria de cada neurona/cluster."""
+    n_classes = int(max(y_train.max(), y_test.max())) + 1
+    votes = np.bincount(train_assignments * n_classes + y_train, minlength=n_units * n_classes)
+    majority = votes.reshape(n_units, n_classes).argmax(axis=1)
+    return float(np.mean(majority[test_assignments] == y_test))
+
+
+# ============================================================
+# MODELOS A COMPARAR
+# ============================================================
+def default_models(n_features, n_classes, epochs=5, batch_size=64, som_shape=(10, 10)):
+    """
+    Pares propio/librería. Cada entrada define cómo entrenar y evaluar.
+
+    Returns:
+        Lista de dicts con name, family ('custom'/'library'), epochs,
+        train(X, y) → modelo y accuracy(modelo, X_tr, y_tr, X_te, y_te)
+    """
+    from .library_based.sklearn_models import build_mlp_classifier, build_som_proxy
+
+    rows, cols = som_shape
+    n_units = rows * cols
+
+    def train_custom_mlp(X, y):
+        mlp = MLP([n_features, 128, n_classes], seed=42)
+        mlp.fit(X, y, epochs=epochs, batch_size=batch_size, verbose=False)
+        return mlp
+
+    def train_sklearn_mlp(X, y):
+        import warnings
+        from sklearn.exceptions import ConvergenceWarning
+        model = build_mlp_classifier((128,), epochs=epochs, batch_size=batch_size)
+        with warnings.catch_warnings():
+            # max_iter=epochs corta antes de converger a propósito
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            return model.fit(X, y)
+
+    def train_custom_som(X, y):
+        return SOM(rows, cols, n_features, seed=42).fit(X, epochs=epochs, verbose=False)
+
+    def train_kmeans(X, y):
+        return build_som_proxy(rows, cols, epochs=epochs).fit(X)
+
+    def supervised_accuracy(model, X_tr, y_tr, X_te, y_te):
+        return float(np.mean(model.predict(X_te) == y_te))
+
+    def som_accuracy(model, X_tr, y_tr, X_te, y_te):
+        return cluster_purity(model.bmu(X_tr), y_tr, model.bmu(X_te), y_te, n_units)
+
+    def kmeans_accuracy(model, X_tr, y_tr, X_te, y_te):
+        return cluster_purity(model.predict(X_tr), y_tr, model.predict(X_te), y_te, n_units)
+
+    return [
+        {'name': 'MLP', 'family': 'custom', 'epochs': epochs,
+         'train': train_custom_mlp, 'accuracy': supervised_accuracy},
+        {'name': 'MLP', 'family': 'library', 'epochs': epochs,
+         'train': train_sklearn_mlp, 'accuracy': supervised_accuracy},
+        {'name': 'SOM', 'family': 'custom', 'epochs': epochs,
+         'train': train_custom_som, 'accuracy': som_accuracy},
+        # MiniBatchKMeans sin parada temprana: las mismas épocas que el SOM
+        {'name': 'SOM', 'family': 'library', 'epochs': epochs,
+         'train': train_kmeans, 'accuracy': kmeans_accuracy},
+    ]
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+def run_benchmark(X, y, sizes, threads=(None,), models=None, test_size=0.2,
+                  epochs=5, seed=42, trace_allocations=False, verbose=True):
+    """
+    Entrena cada modelo con cada tamaño de datos y número de hilos.
+
+    Los datos se preprocesan una vez (StandardScaler ajustado con el
+    conjunto de entrenamiento) y todos los modelos usan los mismos.
+
+    Args:
+        X, y: Dataset completo (p. ej. MNIST de data_loader.load_mnist)
+        sizes: Tamaños de entrenamiento a probar
+        threads: Números de hilos de BLAS a probar (None = sin límite)
+        models: Lista de default_models(...) o equivalente
+
+    Returns:
+        Lista de dicts, uno por ejecución
+    """
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(X))
+    n_test = int(len(X) * test_size)
+    test_idx = np.sort(order[:n_test])
+    train_idx = order[n_test:]
+
+    y = np.asarray(y, dtype=int)
+    scaler = StandardScaler()
+    sorted_train = np.sort(train_idx)
+    for start in range(0, len(sorted_train), 8192):
+        scaler.partial_fit(X[sorted_train[start:start + 8192]])
+    X_test = scaler.transform(np.asarray(X[test_idx], dtype=np.float32)).astype(np.float32)
+    y_test = y[test_idx]
+
+    n_classes = int(y.max()) + 1
+    models = models or default_models(X.shape[1], n_classes, epochs=epochs)
+
+    results = []
+    for n in sizes:
+        idx = np.sort(train_idx[:n])
+        X_train = scaler.transform(np.asarray(X[idx], dtype=np.float32)).astype(np.float32)
+        y_train = y[idx]
+
+        for n_threads in threads:
+            for spec in models:
+                model, stats = measure(lambda: spec['train'](X_train, y_train),
+                                       n_threads, trace_allocations)
+                row = {
+                    'model': spec['name'],
+                    'family': spec['family'],
+                    'n_samples': len(X_train),
+                    'threads': n_threads if n_threads is not None else 0,
+                    **stats,
+                    'samples_per_sec': len(X_train) * spec['epochs'] / stats['wall_time'],
+                    'accuracy': spec['accuracy'](model, X_train, y_train, X_test, y_test),
+                }
+                results.append(row)
+
+                if verbose:
+                    print(f"  {row['family']:8} {row['model']:4} n={row['n_samples']:6} "
+                          f"hilos={row['threads'] or '-':>2}  {row['wall_time']:7.2f}s  "
+                          f"{row['samples_per_sec']:9.0f} muestras/s  "
+                          f"RSS +{row['peak_rss_mb']:5.0f} MB  acc {row['accuracy']:.3f}")
+
+    return results
+
+
+def save_results(results, results_dir, name='benchmark'):
+    """Guarda los resultados como JSON y CSV en results_dir."""
+    os.makedirs(results_dir, exist_ok=True)
+    json_path = os.path.join(results_dir, f'{name}.json')
+    csv_path = os.path.join(results_dir, f'{name}.csv')
+
+    with open(json_path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+        writer.writeheader()
+        writer.writerows(results)
+
+    return json_path, csv_path
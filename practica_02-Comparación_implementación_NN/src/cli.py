@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Práctica 02: Comparación de implementaciones de redes neuronales
+
+Uso:
+    python src/cli.py benchmark                        # MNIST, tamaños por defecto
+    python src/cli.py benchmark --sizes 1000 5000 --threads 1 2 4
+    python src/cli.py benchmark --synthetic            # Sin descargar datos
+"""
+
+import argparse
+import os
+import sys
+
+# Añadir la carpeta de la práctica al path para importar el paquete src
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(BASE_DIR, 'results')
+
+
+def _synthetic_dataset(n=20000, n_features=784, n_classes=10, seed=42):
+    """Nubes gaussianas con la forma de MNIST (para probar sin datos)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0, 1, size=(n_classes, n_features)).astype(np.float32)
+    y = rng.integers(0, n_classes, size=n)
+    X = centers[y] + rng.normal(0, 2, size=(n, n_features)).astype(np.float32)
+    return X, y
+
+
+def run_benchmark_command(args):
+    """Benchmark propio vs librería y gráficos de escalado."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+    from src.benchmark import run_benchmark, save_results
+    from src.utils.visualization import plot_benchmark_scaling
+
+    print("=" * 50)
+    print("BENCHMARK: IMPLEMENTACIÓN PROPIA VS LIBRERÍA")
+    print("=" * 50)
+
+    if args.synthetic:
+        X, y = _synthetic_dataset()
+        dataset = 'synthetic'
+    else:
+        from src.utils.data_loader import load_mnist
+        X, y = load_mnist()
+        dataset = 'mnist'
+
+    sizes = [n for n in args.sizes if n <= len(X) * 0.8]
+    threads = args.threads or [None]
+    print(f"\n📂 Datos: {dataset} {X.shape}")
+    print(f"📏 Tamaños: {sizes}  🧵 Hilos: {args.threads or 'sin límite'}\n")
+
+    results = run_benchmark(X, y, sizes, threads=threads, epochs=args.epochs,
+                            trace_allocations=args.trace_allocations)
+
+    name = f'benchmark_{dataset}'
+    json_path, csv_path = save_results(results, args.output, name=name)
+    print(f"\n💾 Resultados: {json_path}, {csv_path}")
+
+    fig = plot_benchmark_scaling(results, x='n_samples')
+    fig.savefig(os.path.join(args.output, f'{name}_scaling.png'), dpi=100, bbox_inches='tight')
+    if len(threads) > 1:
+        fig = plot_benchmark_scaling(results, x='threads')
+        fig.savefig(os.path.join(args.output, f'{name}_threads.png'), dpi=100, bbox_inches='tight')
+    print(f"📈 Gráficos en {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Comparación de implementaciones de redes neuronales",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    subparsers = parser.add_subparsers(dest='command', help='Comandos disponibles')
+
+    bench_parser = subparsers.add_parser('benchmark', help='Propio vs librería (tiempo, memoria, accuracy)')
+    bench_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000],
+                              help='Tamaños de entrenamiento')
+    bench_parser.add_argument('--threads', type=int, nargs='+',
+                              help='Números de hilos de BLAS a probar')
+    bench_parser.add_argument('--epochs', type=int, default=5, help='Épocas por modelo')
+    bench_parser.add_argument('--synthetic', action='store_true',
+                              help='Usar datos sintéticos en lugar de MNIST')
+    bench_parser.add_argument('--trace-allocations', action='store_true',
+                              help='Medir también el pico de memoria con tracemalloc')
+    bench_parser.add_argument('--output', default=RESULTS_DIR, help='Carpeta de resultados')
+
+    args = parser.parse_args()
+
+    if args.command == 'benchmark':
+        run_benchmark_command(args)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
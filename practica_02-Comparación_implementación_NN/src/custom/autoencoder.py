@@ -0,0 +1,292 @@
+"""
+autoencoder.py - Autoencoder desde cero
+
+¿QUÉ ES UN AUTOENCODER?
+Una red que aprende a copiar su entrada pasando por un "cuello de botella":
+
+    Entrada → Encoder → Código latente → Decoder → Reconstrucción
+    (784)     (128)        (32)           (128)       (784)
+
+Como el código latente es mucho más pequeño que la entrada, la red
+está obligada a quedarse con lo esencial. Es aprendizaje NO supervisado:
+el objetivo es la propia entrada, no hacen falta etiquetas.
+
+Usa las mismas capas que el MLP (src/custom/layers.py) y los mismos
+optimizadores (src/custom/optimizers.py).
+
+¿QUÉ ES EL CHECKPOINTING?
+Para hacer backpropagation hay que guardar las activaciones de todas
+las capas. Con checkpoint=True solo se guarda la entrada y el código
+latente: las activaciones del encoder se liberan tras el forward y se
+recalculan cuando llega su turno en el backward. Se paga un forward
+extra del encoder a cambio de tener en memoria las activaciones de una
+sola mitad de la red a la vez.
+"""
+
+import numpy as np
+
+from ..utils.data_loader import iter_minibatches
+from .layers import Dense
+from .optimizers import get_optimizer
+
+
+class Autoencoder:
+    """
+    Autoencoder totalmente conectado con encoder y decoder simétricos.
+
+    Ejemplo (MNIST):
+        ae = Autoencoder([784, 128, 32])
+        ae.fit(X_train, epochs=10)          # X_train uint8 se escala a [0, 1]
+        X_rec = ae.reconstruct(X_test[:10])
+        plot_autoencoder_reconstruction(X_test[:10] / 255, X_rec)
+        ae.encode_batched(X_train, 'data/processed/mnist_latent.npy')
+    """
+
+    def __init__(self, encoder_sizes, activation='relu', latent_activation='linear',
+                 output='sigmoid', optimizer='adam', learning_rate=0.001,
+                 dtype=np.float32, checkpoint=False, seed=None, **optimizer_kwargs):
+        """
+        Args:
+            encoder_sizes: Neuronas del encoder, de la entrada al código
+                           latente. El decoder es el camino inverso
+            activation: Activación de las capas ocultas
+            latent_activation: Activación de la capa latente
+            output: 'sigmoid' (datos en [0, 1], pérdida BCE) o 'linear' (MSE)
+            checkpoint: Recalcular el encoder en el backward en lugar de
+                        guardar sus activaciones
+        """
+        if output not in ('sigmoid', 'linear'):
+            raise ValueError(f"Salida desconocida: {output}")
+
+        self.encoder_sizes = list(encoder_sizes)
+        self.output = output
+        self.dtype = np.dtype(dtype)
+        self.checkpoint = checkpoint
+        self.rng = np.random.default_rng(seed)
+
+        sizes = self.encoder_sizes
+        decoder_sizes = sizes[::-1]
+
+        self.encoder = [
+            Dense(n_in, n_out,
+                  activation=latent_activation if i == len(sizes) - 2 else activation,
+                  dtype=self.dtype, rng=self.rng)
+            for i, (n_in, n_out) in enumerate(zip(sizes[:-1], sizes[1:]))
+        ]
+        self.decoder = [
+            Dense(n_in, n_out,
+                  activation=output if i == len(decoder_sizes) - 2 else activation,
+                  dtype=self.dtype, rng=self.rng)
+            for i, (n_in, n_out) in enumerate(zip(decoder_sizes[:-1], decoder_sizes[1:]))
+        ]
+
+        self.optimizer = get_optimizer(
+            optimizer, self.params, self.grads, learning_rate, **optimizer_kwargs
+        )
+        self._grad_out = None
+        self._latent = None
+
+    @property
+    def layers(self):
+        return self.encoder + self.decoder
+
+    @property
+    def params(self):
+        return [p for layer in self.layers for p in layer.params]
+
+    @property
+    def grads(self):
+        return [g for layer in self.layers for g in layer.grads]
+
+    @property
+    def latent_dim(self):
+        return self.encoder_sizes[-1]
+
+    # ------------------------------------------------------------------
+    # Forward / backward
+    # ------------------------------------------------------------------
+    def _prepare(self, X_batch):
+        """Convierte al dtype de la red; uint8 (píxeles 0-255) se escala a [0, 1]."""
+        X_batch = np.asarray(X_batch)
+        if X_batch.dtype == np.uint8:
+            return X_batch.astype(self.dtype) / self.dtype.type(255)
+        return X_batch.astype(self.dtype, copy=False)
+
+    @staticmethod
+    def _forward(layers, a):
+        for layer in layers:
+            a = layer.forward(a)
+        return a
+
+    @staticmethod
+    def _backward(layers, grad, preactivation, need_input_grad):
+        last = len(layers) - 1
+        for i in range(last, -1, -1):
+            grad = layers[i].backward(
+                grad,
+                preactivation=preactivation and i == last,
+                need_input_grad=need_input_grad or i > 0
+            )
+        return grad
+
+    def loss(self, output, X):
+        """Pérdida media por muestra."""
+        eps = 1e-7
+        if self.output == 'sigmoid':
+            return float(-np.sum(X * np.log(output + eps) + (1 - X) * np.log(1 - output + eps)) / len(X))
+        return float(0.5 * np.sum((output - X) ** 2) / len(X))
+
+    def train_step(self, X_batch):
+        """Forward + backward + actualización. Devuelve la pérdida del batch."""
+        n = len(X_batch)
+        latent = self._forward(self.encoder, X_batch)
+
+        if self.checkpoint:
+            # Guardar solo el código latente y soltar las activaciones del encoder
+            if self._latent is None or self._latent.shape[0] < n:
+                self._latent = np.empty((n, self.latent_dim), dtype=self.dtype)
+            np.copyto(self._latent[:n], latent)
+            latent = self._latent[:n]
+            for layer in self.encoder:
+                layer.release()
+
+        output = self._forward(self.decoder, latent)
+        loss = self.loss(output, X_batch)
+
+        # Sigmoid + BCE y lineal + MSE: dL/dz de salida = (a - x) / n
+        if self._grad_out is None or self._grad_out.shape[0] < n:
+            self._grad_out = np.empty((n, self.encoder_sizes[0]), dtype=self.dtype)
+        grad = self._grad_out[:n]
+        np.subtract(output, X_batch, out=grad)
+        grad /= n
+
+        grad_latent = self._backward(self.decoder, grad, preactivation=True, need_input_grad=True)
+
+        if self.checkpoint:
+            # Soltar el decoder (grad_latent sigue vivo, es pequeño) y
+            # recalcular el encoder para su backward
+            for layer in self.decoder:
+                layer.release()
+            self._forward(self.encoder, X_batch)
+
+        self._backward(self.encoder, grad_latent, preactivation=False, need_input_grad=False)
+
+        if self.checkpoint:
+            for layer in self.encoder:
+                layer.release()
+
+        self.optimizer.step()
+        return loss
+
+    # ------------------------------------------------------------------
+    # Entrenamiento
+    # ------------------------------------------------------------------
+    def fit(self, X, epochs=10, batch_size=128, shuffle=True, validation_data=None,
+            recorder=None, verbose=True):
+        """
+        Entrena el autoencoder por mini-batches.
+
+        Args:
+            X: Datos (array o np.memmap). Si son uint8 se escalan a [0, 1]
+               batch a batch, así que el memmap de MNIST se usa tal cual
+            validation_data: X_val opcional
+            recorder: MetricsRecorder opcional (src/utils/training_log.py)
+
+        Returns:
+            history: {'loss': [...], 'val_loss': [...]}
+        """
+        history = {'loss': []}
+        if validation_data is not None:
+            history['val_loss'] = []
+
+        for epoch in range(epochs):
+            total = 0.0
+
+            for X_batch in iter_minibatches(X, batch_size=batch_size, shuffle=shuffle, rng=self.rng):
+                X_batch = self._prepare(X_batch)
+                total += self.train_step(X_batch) * len(X_batch)
+
+            metrics = {'loss': total / len(X)}
+            if validation_data is not None:
+                metrics['val_loss'] = self.evaluate(validation_data)
+
+            for name, value in metrics.items():
+                history[name].append(value)
+            if recorder is not None:
+                recorder.log(epoch, **metrics)
+
+            if verbose:
+                summary = ' - '.join(f"{k}: {v:.4f}" for k, v in metrics.items())
+                print(f"Época {epoch + 1}/{epochs} - {summary}")
+
+        return history
+
+    # ------------------------------------------------------------------
+    # Inferencia
+    # ------------------------------------------------------------------
+    def _iter_outputs(self, X, layers, batch_size):
+        for start in range(0, len(X), batch_size):
+            X_batch = self._prepare(X[start:start + batch_size])
+            yield start, X_batch, self._forward(layers, X_batch)
+
+    def encode(self, X, batch_size=1024):
+        """Código latente de X, forma (n, latent_dim)."""
+        out = np.empty((len(X), self.latent_dim), dtype=self.dtype)
+        for start, X_batch, latent in self._iter_outputs(X, self.encoder, batch_size):
+            out[start:start + len(X_batch)] = latent
+        return out
+
+    def encode_batched(self, X, path, batch_size=1024):
+        """
+        Escribe el código latente de X en un .npy, batch a batch.
+
+        Ni X ni el resultado tienen que caber en memoria: X puede ser un
+        np.memmap y la salida es otro np.memmap (abrir después con
+        np.load(path, mmap_mode='r')).
+        """
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype,
+                                        shape=(len(X), self.latent_dim))
+        for start, X_batch, latent in self._iter_outputs(X, self.encoder, batch_size):
+            out[start:start + len(X_batch)] = latent
+        out.flush()
+        return out
+
+    def reconstruct(self, X, batch_size=1024):
+        """Reconstrucción de X (entrada → encoder → decoder)."""
+        out = np.empty((len(X), self.encoder_sizes[0]), dtype=self.dtype)
+        for start, X_batch, reconstruction in self._iter_outputs(X, self.layers, batch_size):
+            out[start:start + len(X_batch)] = reconstruction
+        return out
+
+    def evaluate(self, X, batch_size=1024):
+        """Pérdida media de reconstrucción sobre X."""
+        total = 0.0
+        for start in range(0, len(X), batch_size):
+            X_batch = self._prepare(X[start:start + batch_size])
+            total += self.loss(self._forward(self.layers, X_batch), X_batch) * len(X_batch)
+        return total / len(X)
+
+
+# ============================================================
+# PRUEBAS
+# ============================================================
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    print("=" * 50)
+    print("PRUEBA DE AUTOENCODER")
+    print("=" * 50)
+
+    # "Imágenes" sintéticas uint8 de 64 píxeles generadas desde 4 factores
+    rng = np.random.default_rng(42)
+    factors = rng.random((5000, 4))
+    mixing = rng.random((4, 64))
+    X = (255 * (factors @ mixing) / mixing.sum(axis=0)).astype(np.uint8)
+
+    ae = Autoencoder([64, 32, 4], checkpoint=True, seed=42)
+    ae.fit(X, epochs=5, batch_size=64)
+
+    path = os.path.join(tempfile.mkdtemp(), 'latent.npy')
+    latent = ae.encode_batched(X, path)
+    print(f"\nCódigo latente: {latent.shape} {latent.dtype} en {path}")
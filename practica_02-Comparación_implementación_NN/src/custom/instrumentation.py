@@ -0,0 +1,357 @@
+"""
+instrumentation.py - Comprobación de gradientes y perfilado por capa
+
+¿PARA QUÉ?
+1. check_gradients: el backprop se deriva a mano (ver notebooks). Un
+   error de signo o un /n de más no rompe el entrenamiento, solo lo
+   empeora, y es difícil de ver. Aquí se compara el gradiente analítico
+   con el numérico por diferencias finitas:
+
+       dL/dw ≈ (L(w + ε) - L(w - ε)) / 2ε
+
+2. LayerProfiler: antes de optimizar hay que saber DÓNDE se va el
+   tiempo. Mide tiempo (perf_counter) y, opcionalmente, memoria
+   reservada (tracemalloc) en el forward/backward de cada capa y en el
+   paso del optimizador.
+
+¿POR QUÉ "COSTE CERO" AL DESACTIVAR?
+El perfilador no añade ningún `if profiling:` al código de las capas.
+Al activarlo sustituye layer.forward/backward de ESA instancia por una
+versión medida; al desactivarlo borra la sustitución y vuelve a usarse
+el método normal de la clase. Sin perfilador, el código es el de siempre.
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+
+
+# ============================================================
+# COMPROBACIÓN DE GRADIENTES
+# ============================================================
+def _batch_args(model, X, y):
+    """Argumentos de model.train_step en el dtype de la red."""
+    X = np.asarray(X, dtype=model.dtype)
+    if y is None:
+        return (X,)
+    return (X, model._targets(y))
+
+
+def _loss_and_grads(model, args):
+    """
+    Pérdida y gradientes de un batch SIN actualizar los pesos.
+
+    Usa el train_step del propio modelo (MLP o Autoencoder) con el paso
+    del optimizador anulado, así se comprueba exactamente el código que
+    se usa al entrenar. Si ya había un step propio de la instancia (el
+    de un LayerProfiler activo) se restaura al terminar.
+    """
+    optimizer = model.optimizer
+    missing = object()
+    previous = optimizer.__dict__.get('step', missing)
+    optimizer.step = lambda: None
+    try:
+        return model.train_step(*args)
+    finally:
+        if previous is missing:
+            del optimizer.step
+        else:
+            optimizer.step = previous
+
+
+def check_gradients(model, X, y=None, n_coords=10, n_directions=5, eps=None,
+                    tolerance=None, seed=0, verbose=True):
+    """
+    Compara gradiente analítico y numérico.
+
+    Dos comprobaciones:
+    - Coordenadas: n_coords pesos al azar de cada parámetro (W y b de
+      cada capa), 2 evaluaciones de la pérdida por peso
+    - Direcciones: n_directions direcciones aleatorias d que mueven
+      TODOS los pesos a la vez. La derivada direccional numérica
+          (L(θ + εd) - L(θ - εd)) / 2ε
+      debe coincidir con g · d. Son 2 evaluaciones por dirección y
+      cubren todo el gradiente, incluidos pesos que el muestreo no toca
+
+    Usar dtype=np.float64 para una comprobación fiable: en float32 el
+    redondeo de la pérdida domina con ε pequeños (se usan ε y tolerancia
+    mayores por defecto).
+
+    Args:
+        model: MLP o Autoencoder
+        X, y: Batch pequeño (y=None para el autoencoder)
+
+    Returns:
+        dict con 'coords' (error relativo máximo por parámetro),
+        'directions' (error relativo de cada dirección), 'max_error' y 'passed'
+    """
+    low_precision = np.dtype(model.dtype).itemsize < 8
+    eps = eps or (1e-2 if low_precision else 1e-6)
+    tolerance = tolerance or (1e-2 if low_precision else 1e-5)
+    rng = np.random.default_rng(seed)
+    args = _batch_args(model, X, y)
+
+    _loss_and_grads(model, args)
+    analytic = [g.copy() for g in model.grads]
+    params = model.params
+
+    def loss_at(param, index, delta):
+        """Pérdida con param[index] desplazado delta (y restaurado después)."""
+        original = param[index].copy()
+        param[index] = original + delta
+        loss = _loss_and_grads(model, args)
+        param[index] = original
+        return loss
+
+    def rel_error(numeric, exact):
+        return np.abs(numeric - exact) / np.maximum(np.abs(numeric) + np.abs(exact), 1e-12)
+
+    # --- Coordenadas sueltas ---
+    coords = []
+    for i, (p, g) in enumerate(zip(params, analytic)):
+        flat_idx = rng.choice(p.size, size=min(n_coords, p.size), replace=False)
+        numeric = np.empty(len(flat_idx))
+        for k, j in enumerate(flat_idx):
+            index = np.unravel_index(j, p.shape)
+            numeric[k] = (loss_at(p, index, eps) - loss_at(p, index, -eps)) / (2 * eps)
+        errors = rel_error(numeric, g.ravel()[flat_idx])
+        coords.append(float(errors.max()))
+
+    # --- Direcciones aleatorias (todos los pesos a la vez) ---
+    directions = []
+    for _ in range(n_directions):
+        d = [rng.standard_normal(p.shape).astype(p.dtype) for p in params]
+        norm = np.sqrt(sum(float(np.sum(di * di)) for di in d))
+        d = [di / norm for di in d]
+        exact = sum(float(np.sum(gi * di)) for gi, di in zip(analytic, d))
+
+        losses = []
+        for sign in (1, -1):
+            for p, di in zip(params, d):
+                p += sign * eps * di
+            losses.append(_loss_and_grads(model, args))
+            for p, di in zip(params, d):
+                p -= sign * eps * di
+        numeric = (losses[0] - losses[1]) / (2 * eps)
+        directions.append(float(rel_error(numeric, exact)))
+
+    # Dejar en los gradientes los valores del punto original
+    for g, a in zip(model.grads, analytic):
+        g[...] = a
+
+    max_error = max(coords + directions)
+    report = {
+        'coords': coords,
+        'directions': directions,
+        'max_error': max_error,
+        'passed': max_error < tolerance,
+    }
+
+    if verbose:
+        names = [f"{i // 2}.{'W' if i % 2 == 0 else 'b'}" for i in range(len(params))]
+        for name, err in zip(names, coords):
+            print(f"  capa {name:6} error relativo máx: {err:.2e}")
+        if directions:
+            print(f"  direcciones aleatorias: máx {max(directions):.2e}")
+        print(f"  {'✅ OK' if report['passed'] else '❌ FALLA'} (tolerancia {tolerance:.0e})")
+
+    return report
+
+
+# ============================================================
+# PERFILADO POR CAPA
+# ============================================================
+class LayerProfiler:
+    """
+    Tiempo y memoria de cada capa en forward/backward.
+
+    Ejemplo:
+        with LayerProfiler(mlp, trace_memory=True) as prof:
+            mlp.fit(X, y, epochs=1)
+        prof.print_report()
+
+    Mientras está activo, cada llamada a layer.forward/backward y a
+    optimizer.step se cronometra. trace_memory=True usa tracemalloc
+    (cuenta también las reservas de NumPy) y es bastante más lento:
+    sirve para ver QUIÉN reserva memoria, no para medir tiempos.
+
+    Si tracemalloc ya estaba activo (p. ej. benchmark.measure con
+    trace_allocations=True), el perfilador no reinicia su pico ni lo para
+    al terminar: mide respecto al estado anterior a cada llamada. El pico
+    de una llamada que no supera el pico que ya había es entonces una
+    cota inferior.
+
+    Solo se informa del pico: lo que queda reservado tras una llamada no
+    es su coste real, porque la siguiente libera la caché de la anterior
+    (layer._x del batch previo) y la diferencia sale negativa.
+    """
+
+    PHASES = ('forward', 'backward')
+
+    def __init__(self, model, trace_memory=False):
+        self.model = model
+        self.trace_memory = trace_memory
+        self.enabled = False
+        self._started_tracemalloc = False
+        self.reset()
+
+    def reset(self):
+        """Pone a cero las estadísticas."""
+        self.stats = {}
+
+    def _entry(self, name, phase):
+        key = (name, phase)
+        if key not in self.stats:
+            self.stats[key] = {'calls': 0, 'time': 0.0, 'peak_bytes': 0}
+        return self.stats[key]
+
+    def _wrap(self, func, name, phase):
+        entry = self._entry(name, phase)
+
+        if not self.trace_memory:
+            def timed(*args, **kwargs):
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                entry['time'] += time.perf_counter() - start
+                entry['calls'] += 1
+                return result
+            return timed
+
+        def traced(*args, **kwargs):
+            before, peak_before = tracemalloc.get_traced_memory()
+            if self._started_tracemalloc:
+                # El pico es nuestro: se reinicia para medir solo esta llamada
+                tracemalloc.reset_peak()
+                peak_before = before
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            entry['time'] += time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            entry['calls'] += 1
+            # Si el pico de otro medidor no se supera, el de la llamada no
+            # se conoce: se cuenta lo que sigue reservado (cota inferior)
+            call_peak = peak - before if peak > peak_before else current - before
+            entry['peak_bytes'] = max(entry['peak_bytes'], call_peak)
+            return result
+        return traced
+
+    def _targets(self):
+        """(objeto, atributo, nombre, fase) de cada método a medir."""
+        targets = []
+        for i, layer in enumerate(self.model.layers):
+            name = f"{i}: {layer.n_in}→{layer.n_out} {layer.activation}"
+            for phase in self.PHASES:
+                targets.append((layer, phase, name, phase))
+        targets.append((self.model.optimizer, 'step', 'optimizador', 'step'))
+        return targets
+
+    def enable(self):
+        """Instala los métodos medidos en las instancias."""
+        if self.enabled:
+            return self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        for obj, attr, name, phase in self._targets():
+            setattr(obj, attr, self._wrap(getattr(obj, attr), name, phase))
+        self.enabled = True
+        return self
+
+    def disable(self):
+        """Quita los métodos medidos: vuelven a usarse los de la clase."""
+        if not self.enabled:
+            return
+        for obj, attr, _, _ in self._targets():
+            obj.__dict__.pop(attr, None)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.enabled = False
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def report(self):
+        """
+        Returns:
+            Lista de dicts (layer, phase, calls, total_ms, ms_per_call,
+            time_share, peak_kb), en el orden de la red
+        """
+        total = sum(entry['time'] for entry in self.stats.values()) or 1.0
+        rows = []
+        for (name, phase), entry in self.stats.items():
+            calls = entry['calls']
+            rows.append({
+                'layer': name,
+                'phase': phase,
+                'calls': calls,
+                'total_ms': entry['time'] * 1000,
+                'ms_per_call': entry['time'] * 1000 / calls if calls else 0.0,
+                'time_share': entry['time'] / total,
+                'peak_kb': entry['peak_bytes'] / 1024 if self.trace_memory else None,
+            })
+        return rows
+
+    def print_report(self):
+        """Tabla con el reparto de tiempo (y memoria) por capa y fase."""
+        header = f"{'Capa':24} {'Fase':9} {'Llamadas':>8} {'Total ms':>10} {'ms/llam.':>9} {'%':>6}"
+        if self.trace_memory:
+            header += f" {'Pico KB':>9}"
+        print(header)
+        print("-" * len(header))
+        for row in self.report():
+            line = (f"{row['layer']:24} {row['phase']:9} {row['calls']:8d} "
+                    f"{row['total_ms']:10.1f} {row['ms_per_call']:9.3f} {row['time_share']:6.1%}")
+            if self.trace_memory:
+                line += f" {row['peak_kb']:9.1f}"
+            print(line)
+
+
+# ============================================================
+# PRUEBAS
+# ============================================================
+if __name__ == "__main__":
+    from .autoencoder import Autoencoder
+    from .mlp import MLP
+
+    print("=" * 50)
+    print("COMPROBACIÓN DE GRADIENTES")
+    print("=" * 50)
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(32, 12))
+    y = rng.integers(0, 4, size=32)
+
+    for output in ('softmax', 'sigmoid', 'linear'):
+        print(f"\nMLP con salida {output}:")
+        targets = y if output == 'softmax' else rng.random((32, 4))
+        mlp = MLP([12, 16, 8, 4], activation='tanh', output=output, dtype=np.float64, seed=1)
+        check_gradients(mlp, X, targets)
+
+    print("\nAutoencoder (con checkpointing):")
+    ae = Autoencoder([12, 8, 3], activation='tanh', output='linear',
+                     dtype=np.float64, checkpoint=True, seed=1)
+    check_gradients(ae, X)
+
+    print("\n" + "=" * 50)
+    print("PERFILADO POR CAPA")
+    print("=" * 50)
+
+    X = rng.normal(size=(5000, 784)).astype(np.float32)
+    y = rng.integers(0, 10, size=5000)
+    mlp = MLP([784, 256, 128, 10], seed=1)
+
+    with LayerProfiler(mlp) as prof:
+        mlp.fit(X, y, epochs=1, batch_size=128, verbose=False)
+    print("\nSolo tiempo:")
+    prof.print_report()
+
+    with LayerProfiler(mlp, trace_memory=True) as prof:
+        mlp.fit(X, y, epochs=1, batch_size=128, verbose=False)
+    print("\nCon tracemalloc:")
+    prof.print_report()
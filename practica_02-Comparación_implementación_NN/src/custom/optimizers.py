@@ -0,0 +1,108 @@
+"""
+optimizers.py - Optimizadores con actualización in-place
+
+¿QUÉ HACE UN OPTIMIZADOR?
+Decide cómo mover los pesos a partir del gradiente:
+- SGD:      w ← w - lr · g
+- Momentum: v ← μ·v - lr · g ;  w ← w + v
+            (acumula "inercia": atraviesa mesetas y amortigua zigzags)
+- Adam:     media móvil del gradiente (m) y de su cuadrado (v);
+            cada peso tiene su propio tamaño de paso
+
+Todas las operaciones escriben sobre arrays ya existentes (w, v, m y un
+buffer auxiliar por parámetro), así que un paso no reserva memoria nueva.
+"""
+
+import numpy as np
+
+
+class Optimizer:
+    """Base: guarda la lista de parámetros y sus gradientes (mismos arrays siempre)."""
+
+    def __init__(self, params, grads, learning_rate):
+        self.params = list(params)
+        self.grads = list(grads)
+        self.learning_rate = learning_rate
+        self._scratch = [np.empty_like(p) for p in self.params]
+
+    def rebind(self, params, grads):
+        """
+        Apunta el optimizador a otros arrays con las mismas formas.
+
+        El estado (velocidad, momentos de Adam) se conserva. Se usa cuando
+        los pesos pasan a vivir en memoria compartida (ver parallel.py).
+        """
+        params, grads = list(params), list(grads)
+        if [p.shape for p in params] != [p.shape for p in self.params]:
+            raise ValueError("Los nuevos parámetros no tienen las mismas formas")
+        self.params = params
+        self.grads = grads
+
+    def step(self):
+        raise NotImplementedError
+
+
+class SGD(Optimizer):
+    def step(self):
+        for p, g, tmp in zip(self.params, self.grads, self._scratch):
+            np.multiply(g, self.learning_rate, out=tmp)
+            p -= tmp
+
+
+class Momentum(Optimizer):
+    def __init__(self, params, grads, learning_rate=0.01, momentum=0.9):
+        super().__init__(params, grads, learning_rate)
+        self.momentum = momentum
+        self.velocity = [np.zeros_like(p) for p in self.params]
+
+    def step(self):
+        for p, g, v, tmp in zip(self.params, self.grads, self.velocity, self._scratch):
+            v *= self.momentum
+            np.multiply(g, self.learning_rate, out=tmp)
+            v -= tmp
+            p += v
+
+
+class Adam(Optimizer):
+    def __init__(self, params, grads, learning_rate=0.001, beta1=0.9, beta2=0.999, eps=1e-8):
+        super().__init__(params, grads, learning_rate)
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+        self.t = 0
+        self.m = [np.zeros_like(p) for p in self.params]
+        self.v = [np.zeros_like(p) for p in self.params]
+
+    def step(self):
+        self.t += 1
+        # Corrección de sesgo integrada en el tamaño de paso
+        lr_t = self.learning_rate * np.sqrt(1 - self.beta2 ** self.t) / (1 - self.beta1 ** self.t)
+
+        for p, g, m, v, tmp in zip(self.params, self.grads, self.m, self.v, self._scratch):
+            m *= self.beta1
+            np.multiply(g, 1 - self.beta1, out=tmp)
+            m += tmp
+            v *= self.beta2
+            np.multiply(g, g, out=tmp)
+            tmp *= 1 - self.beta2
+            v += tmp
+
+            np.sqrt(v, out=tmp)
+            tmp += self.eps
+            np.divide(m, tmp, out=tmp)
+            tmp *= lr_t
+            p -= tmp
+
+
+OPTIMIZERS = {
+    'sgd': SGD,
+    'momentum': Momentum,
+    'adam': Adam,
+}
+
+
+def get_optimizer(name, params, grads, learning_rate, **kwargs):
+    """Crea un optimizador por nombre ('sgd', 'momentum', 'adam')."""
+    if name not in OPTIMIZERS:
+        raise ValueError(f"Optimizador desconocido: {name}")
+    return OPTIMIZERS[name](params, grads, learning_rate, **kwargs)
@@ -0,0 +1,423 @@
+"""
+parallel.py - Entrenamiento data-parallel del MLP en varios procesos
+
+¿POR QUÉ?
+Un solo proceso de Python solo aprovecha los núcleos que BLAS decida
+usar dentro de cada multiplicación de matrices. Con batches pequeños
+eso es poco. En data-parallel cada mini-batch se reparte entre N
+procesos:
+
+    batch de 512 → 4 trozos de 128 → 4 procesos calculan su gradiente
+                 → se promedian → un único paso del optimizador
+
+El resultado es el mismo que entrenar con el batch de 512 en un solo
+proceso (salvo redondeo), pero el trabajo se reparte.
+
+¿POR QUÉ MEMORIA COMPARTIDA?
+Enviar los pesos a cada proceso en cada paso (pickle) costaría más que
+el propio cálculo. Con multiprocessing.shared_memory:
+- Los pesos viven en un bloque compartido: el proceso principal los
+  actualiza in-place y los workers ven los valores nuevos sin copiarlos
+- Cada worker escribe su gradiente en su propia fila de otro bloque
+- Por la tubería solo viajan los índices del trozo de batch y la pérdida
+
+¿Y SI UN WORKER FALLA?
+El worker captura la excepción y envía su traceback por la tubería; si
+muere sin poder avisar (señal, falta de memoria), el padre ve EOF en la
+tubería. En ambos casos train_step lanza RuntimeError en vez de quedarse
+esperando para siempre.
+"""
+
+import mmap
+import time
+import traceback
+from multiprocessing import Pipe, Process
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .mlp import MLP
+from ..utils.preprocessing import StandardScaler
+
+
+def _param_arrays(layers, kind):
+    """Arrays de pesos (kind='params') o gradientes (kind='grads') de las capas."""
+    names = ('W', 'b') if kind == 'params' else ('dW', 'db')
+    return [(layer, name) for layer in layers for name in names]
+
+
+def _bind(layers, flat, kind, copy_values):
+    """
+    Sustituye los arrays de las capas por vistas sobre `flat`.
+
+    Args:
+        flat: Array 1D (normalmente sobre memoria compartida)
+        copy_values: Copiar los valores actuales antes de sustituir
+    """
+    offset = 0
+    for layer, name in _param_arrays(layers, kind):
+        array = getattr(layer, name)
+        view = flat[offset:offset + array.size].reshape(array.shape)
+        if copy_values:
+            view[...] = array
+        setattr(layer, name, view)
+        offset += array.size
+
+
+def _attach(spec):
+    """Abre un array compartido descrito por (nombre, forma, dtype)."""
+    name, shape, dtype = spec
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _open_data(spec):
+    """Datos de entrenamiento: memoria compartida o el propio fichero memmap."""
+    if spec[0] == 'memmap':
+        _, filename, dtype, shape, offset = spec
+        return None, np.memmap(filename, dtype=dtype, mode='r', shape=shape, offset=offset)
+    return _attach(spec[1:])
+
+
+def _memmap_file_offset(array):
+    """
+    Posición en el fichero del primer byte de un np.memmap, o None.
+
+    Un trozo de un memmap (X[500:]) conserva el `offset` del original, que
+    es donde empieza el mapeo, no el trozo. La posición real se obtiene
+    sumando la distancia entre el trozo y el inicio del mapeo. Si el array
+    no es un memmap contiguo no se puede reabrir como fichero: None.
+    """
+    mm = getattr(array, '_mmap', None)
+    if not isinstance(array, np.memmap) or array.filename is None or mm is None:
+        return None
+    if not array.flags.c_contiguous:
+        return None
+
+    # np.memmap mapea desde offset redondeado a ALLOCATIONGRANULARITY
+    map_start = array.offset - array.offset % mmap.ALLOCATIONGRANULARITY
+    map_ptr = np.frombuffer(mm, dtype=np.uint8).__array_interface__['data'][0]
+    return map_start + array.__array_interface__['data'][0] - map_ptr
+
+
+def _worker_loop(conn, rank, config, params_spec, grads_spec, X_spec, y_spec, scaler):
+    """Bucle de cada proceso: recibe índices, calcula gradientes, responde."""
+    try:
+        # Cada worker usa un hilo de BLAS: el paralelismo ya son los procesos
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=1)
+    except ImportError:
+        pass
+
+    model = MLP(**config)
+    model.scaler = scaler
+    handles = []
+
+    shm, params = _attach(params_spec)
+    handles.append(shm)
+    shm, grads = _attach(grads_spec)
+    handles.append(shm)
+    shm, X = _open_data(X_spec)
+    handles.append(shm)
+    shm, y = _open_data(y_spec)
+    handles.append(shm)
+
+    _bind(model.layers, params, 'params', copy_values=False)
+    _bind(model.layers, grads[rank], 'grads', copy_values=False)
+
+    while True:
+        idx = conn.recv()
+        if idx is None:
+            break
+
+        try:
+            X_batch = model._prepare(X[idx], model.scaler)
+            Y_batch = model._targets(y[idx])
+            output = model.forward(X_batch)
+            loss = model.loss(output, Y_batch)
+            correct = 0
+            if model.output == 'softmax':
+                correct = int(np.sum(output.argmax(axis=1) == Y_batch.argmax(axis=1)))
+            model.backward(output, Y_batch)
+        except Exception:
+            # El padre está esperando la respuesta: se le envía el error
+            conn.send(('error', traceback.format_exc()))
+            continue
+        conn.send(('ok', loss * len(idx), correct))
+
+    for shm in handles:
+        if shm is not None:
+            shm.close()
+
+
+class DataParallelTrainer:
+    """
+    Entrena un MLP repartiendo cada mini-batch entre n_workers procesos.
+
+    Ejemplo:
+        mlp = MLP([784, 128, 10])
+        with DataParallelTrainer(mlp, n_workers=4) as trainer:
+            history = trainer.fit(X_train, y_train, epochs=5, batch_size=512)
+        mlp.score(X_test, y_test)   # el MLP original queda entrenado
+
+    Los pesos del MLP se mueven a memoria compartida al crear el trainer
+    y vuelven a arrays normales al cerrarlo (close()).
+    """
+
+    def __init__(self, model, n_workers=2):
+        self.model = model
+        self.n_workers = n_workers
+        self._shms = []
+        self._workers = []
+        self._conns = []
+
+        n_params = sum(p.size for p in model.params)
+        dtype = model.dtype
+
+        self._params = self._shared((n_params,), dtype)
+        self._grads = self._shared((n_workers, n_params), dtype)
+        self._reduced = np.zeros(n_params, dtype=dtype)
+
+        # Pesos del modelo → vistas sobre memoria compartida; sus
+        # gradientes → el buffer donde se promedian los de los workers
+        _bind(model.layers, self._params, 'params', copy_values=True)
+        _bind(model.layers, self._reduced, 'grads', copy_values=False)
+        model.optimizer.rebind(model.params, model.grads)
+
+    def _shared(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        shm = SharedMemory(create=True, size=size)
+        self._shms.append(shm)
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        array.fill(0)
+        return array
+
+    def _spec(self, array):
+        """Descripción de un array para que un worker lo abra sin copiarlo."""
+        offset = _memmap_file_offset(array)
+        if offset is not None:
+            return ('memmap', array.filename, array.dtype, array.shape, offset)
+        shared = self._shared(array.shape, array.dtype)
+        shared[...] = array
+        return ('shm', self._shms[-1].name, array.shape, array.dtype)
+
+    def _start_workers(self, X, y):
+        self._stop_workers()
+
+        model = self.model
+        config = {
+            'layer_sizes': model.layer_sizes,
+            'activation': model.layers[0].activation if len(model.layers) > 1 else 'relu',
+            'output': model.output,
+            'optimizer': 'sgd',
+            'dtype': model.dtype,
+        }
+        params_spec = (self._shms[0].name, self._params.shape, self._params.dtype)
+        grads_spec = (self._shms[1].name, self._grads.shape, self._grads.dtype)
+        X_spec = self._spec(X)
+        y_spec = self._spec(np.asarray(y))
+
+        for rank in range(self.n_workers):
+            parent_conn, child_conn = Pipe()
+            worker = Process(
+                target=_worker_loop,
+                args=(child_conn, rank, config, params_spec, grads_spec, X_spec, y_spec, model.scaler),
+                daemon=True
+            )
+            worker.start()
+            # Sin este extremo abierto en el padre, recv() da EOFError si el worker muere
+            child_conn.close()
+            self._workers.append(worker)
+            self._conns.append(parent_conn)
+
+    def _stop_workers(self):
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except OSError:
+                # El worker ya terminó
+                pass
+        for worker in self._workers:
+            worker.join()
+        self._workers, self._conns = [], []
+
+        # Liberar los bloques de datos (los dos primeros son pesos y gradientes)
+        for shm in self._shms[2:]:
+            shm.close()
+            shm.unlink()
+        del self._shms[2:]
+
+    def train_step(self, idx):
+        """
+        Un paso síncrono: reparte idx, espera a todos, promedia y actualiza.
+
+        Si el batch tiene menos muestras que workers (p. ej. el último de
+        la época) se usan solo len(idx) workers: un trozo vacío daría
+        pérdida y gradiente NaN (media de cero muestras).
+
+        Returns:
+            (suma de pérdidas, aciertos) del batch
+        """
+        if len(idx) == 0:
+            raise ValueError("train_step necesita al menos una muestra")
+
+        n_shards = min(self.n_workers, len(idx))
+        shards = np.array_split(idx, n_shards)
+        sent = []
+        for conn, shard in zip(self._conns, shards):
+            try:
+                conn.send(shard)
+                sent.append(True)
+            except OSError:
+                sent.append(False)
+        # Se leen todas las respuestas antes de lanzar un error: así no
+        # quedan respuestas pendientes en las tuberías de los demás
+        replies = [self._receive(rank) if ok else self._dead(rank) for rank, ok in enumerate(sent)]
+        errors = [reply for reply in replies if isinstance(reply, str)]
+        if errors:
+            raise RuntimeError(errors[0])
+
+        # Gradiente del batch completo = media de los de cada trozo
+        # ponderada por su tamaño (cada worker ya divide por su n)
+        weights = np.array([len(s) for s in shards], dtype=self.model.dtype) / len(idx)
+        np.dot(weights, self._grads[:n_shards], out=self._reduced)
+        self.model.optimizer.step()
+
+        return sum(r[0] for r in replies), sum(r[1] for r in replies)
+
+    def _receive(self, rank):
+        """Respuesta (pérdida, aciertos) del worker rank, o el mensaje de su error."""
+        try:
+            reply = self._conns[rank].recv()
+        except EOFError:
+            return self._dead(rank)
+        if reply[0] == 'error':
+            return f"Error en el worker {rank}:\n{reply[1]}"
+        return reply[1:]
+
+    def _dead(self, rank):
+        worker = self._workers[rank]
+        worker.join(timeout=1)
+        return f"El worker {rank} terminó inesperadamente (exitcode {worker.exitcode})"
+
+    def fit(self, X, y, epochs=10, batch_size=256, shuffle=True, verbose=True):
+        """
+        Entrena el modelo. Misma interfaz que MLP.fit (sin scaler: usa el
+        que tenga ya el modelo, ajustado).
+
+        Returns:
+            history: {'loss': [...], 'accuracy': [...]}
+        """
+        self._start_workers(X, y)
+        history = {'loss': [], 'accuracy': []}
+        rng = self.model.rng
+        n = len(X)
+
+        for epoch in range(epochs):
+            order = rng.permutation(n) if shuffle else np.arange(n)
+            total_loss, correct = 0.0, 0
+
+            for start in range(0, n, batch_size):
+                idx = np.sort(order[start:start + batch_size])
+                loss, hits = self.train_step(idx)
+                total_loss += loss
+                correct += hits
+
+            history['loss'].append(total_loss / n)
+            history['accuracy'].append(correct / n)
+            if verbose:
+                print(f"Época {epoch + 1}/{epochs} - loss: {history['loss'][-1]:.4f} "
+                      f"- accuracy: {history['accuracy'][-1]:.4f}")
+
+        return history
+
+    def close(self):
+        """Para los workers y devuelve los pesos del modelo a memoria normal."""
+        self._stop_workers()
+
+        model = self.model
+        _bind(model.layers, self._params.copy(), 'params', copy_values=False)
+        _bind(model.layers, np.zeros_like(self._reduced), 'grads', copy_values=False)
+        model.optimizer.rebind(model.params, model.grads)
+
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._shms = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark_scaling(X, y, layer_sizes, worker_counts=(1, 2, 4), epochs=1,
+                      batch_size=512, verbose=True):
+    """
+    Mide la eficiencia de escalado de 1 a N workers.
+
+    eficiencia = (tiempo con 1 worker / tiempo con N) / N
+    1.0 = escalado lineal perfecto.
+
+    Returns:
+        Lista de dicts con workers, wall_time, samples_per_sec, speedup, efficiency
+    """
+    # Mismo preprocesado que MLP.fit con scaler: con los píxeles en bruto
+    # (0-255) el entrenamiento no representa uno real
+    scaler = StandardScaler()
+    for start in range(0, len(X), 8192):
+        scaler.partial_fit(X[start:start + 8192])
+
+    results = []
+    for n_workers in worker_counts:
+        model = MLP(layer_sizes, seed=42)
+        model.scaler = scaler
+        with DataParallelTrainer(model, n_workers=n_workers) as trainer:
+            start = time.perf_counter()
+            trainer.fit(X, y, epochs=epochs, batch_size=batch_size, verbose=False)
+            wall_time = time.perf_counter() - start
+
+        results.append({
+            'workers': n_workers,
+            'wall_time': wall_time,
+            'samples_per_sec': len(X) * epochs / wall_time,
+        })
+
+    base = results[0]['wall_time'] * results[0]['workers']
+    for row in results:
+        row['speedup'] = base / row['wall_time']
+        row['efficiency'] = row['speedup'] / row['workers']
+        if verbose:
+            print(f"  {row['workers']:2} workers: {row['wall_time']:7.2f}s  "
+                  f"{row['samples_per_sec']:9.0f} muestras/s  "
+                  f"speedup {row['speedup']:.2f}×  eficiencia {row['efficiency']:.0%}")
+
+    return results
+
+
+# ============================================================
+# PRUEBAS
+# ============================================================
+if __name__ == "__main__":
+    import os
+
+    from ..utils.data_loader import load_mnist
+
+    print("=" * 50)
+    print("ENTRENAMIENTO DATA-PARALLEL: ESCALADO")
+    print("=" * 50)
+
+    try:
+        X, y = load_mnist(download=False)
+        print(f"MNIST: {X.shape}")
+    except FileNotFoundError:
+        rng = np.random.default_rng(42)
+        y = rng.integers(0, 10, size=20000)
+        X = (rng.random((20000, 784)) * 255).astype(np.uint8)
+        print(f"MNIST no disponible, datos sintéticos: {X.shape}")
+
+    max_workers = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, max_workers} & set(range(1, max_workers + 1)))
+    benchmark_scaling(X, y, [784, 128, 10], worker_counts=worker_counts)
@@ -0,0 +1,275 @@
+"""
+som.py - Self-Organizing Map (mapa de Kohonen), desde cero
+
+¿QUÉ ES UN SOM?
+Una red NO supervisada: una rejilla 2D de neuronas, cada una con un
+vector de pesos del mismo tamaño que los datos. Al entrenar:
+1. Para cada muestra se busca la neurona más parecida (BMU, Best
+   Matching Unit)
+2. La BMU y sus vecinas en la rejilla se acercan a la muestra
+3. El radio de vecindad (sigma) se va reduciendo
+
+Resultado: datos parecidos activan neuronas cercanas en la rejilla.
+Es una "proyección" de 784 dimensiones (MNIST) a un mapa 2D.
+
+¿CÓMO SE HACE RÁPIDO?
+- BMU de todo un batch con una multiplicación de matrices:
+      ||x - w||² = ||x||² - 2·x·w + ||w||²
+  ||x||² no cambia qué neurona gana, así que basta con ||w||² - 2·x·W
+- Versión "batch" del SOM: en lugar de mover los pesos muestra a muestra,
+  se acumula por neurona la suma de las muestras que ganó y se actualizan
+  todos los pesos a la vez al final de cada época
+- Esas sumas por neurona se hacen ordenando el batch por BMU y sumando
+  tramos contiguos (np.add.reduceat), no con np.add.at, que suma fila a
+  fila y es mucho más lento
+- Las distancias entre neuronas de la rejilla se calculan una sola vez
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class SOM:
+    """
+    Self-Organizing Map con entrenamiento batch.
+
+    Ejemplo (MNIST):
+        som = SOM(rows=20, cols=20, n_features=784)
+        som.fit(X_train / 255.0, epochs=10)
+        fig = plot_som_map(som, X_test / 255.0, y_test)
+    """
+
+    def __init__(self, rows, cols, n_features, sigma=None, sigma_end=0.5,
+                 dtype=np.float32, n_jobs=1, seed=None):
+        """
+        Args:
+            rows, cols: Tamaño de la rejilla
+            n_features: Dimensión de los datos
+            sigma: Radio de vecindad inicial (por defecto, media rejilla)
+            sigma_end: Radio de vecindad final
+            n_jobs: Hilos para calcular las BMU de cada batch
+            seed: Semilla
+        """
+        self.rows = rows
+        self.cols = cols
+        self.n_features = n_features
+        self.sigma = sigma if sigma is not None else max(rows, cols) / 2
+        self.sigma_end = sigma_end
+        self.dtype = np.dtype(dtype)
+        self.n_jobs = n_jobs
+        self.rng = np.random.default_rng(seed)
+
+        self.weights = self.rng.random((rows * cols, n_features)).astype(self.dtype)
+
+        # Coordenadas de cada neurona y distancias² entre todas ellas
+        # (n_units × n_units), calculadas una vez
+        r, c = np.divmod(np.arange(rows * cols), cols)
+        self.grid = np.column_stack([r, c]).astype(self.dtype)
+        diff = self.grid[:, None, :] - self.grid[None, :, :]
+        self._grid_dist2 = np.sum(diff ** 2, axis=2)
+
+    @property
+    def n_units(self):
+        return self.rows * self.cols
+
+    def neighborhood(self, sigma):
+        """Kernel gaussiano (n_units × n_units) para un radio sigma."""
+        return np.exp(-self._grid_dist2 / (2 * sigma ** 2)).astype(self.dtype)
+
+    # ------------------------------------------------------------------
+    # Best Matching Unit
+    # ------------------------------------------------------------------
+    def _bmu_block(self, X, w_norm2):
+        X = np.asarray(X, dtype=self.dtype)
+        # ||w||² - 2·x·W  (||x||² es constante por fila y no cambia el argmin)
+        scores = X @ self.weights.T
+        scores *= -2
+        scores += w_norm2
+        return scores.argmin(axis=1)
+
+    def bmu(self, X, batch_size=4096):
+        """
+        Índice de la neurona ganadora para cada fila de X.
+
+        Se procesa por bloques para acotar la matriz de distancias
+        (batch_size × n_units). Con n_jobs > 1 los bloques se reparten en
+        hilos: la multiplicación de matrices libera el GIL.
+        """
+        w_norm2 = np.sum(self.weights ** 2, axis=1)
+        starts = range(0, len(X), batch_size)
+
+        def work(start):
+            return self._bmu_block(X[start:start + batch_size], w_norm2)
+
+        if self.n_jobs == 1:
+            blocks = [work(start) for start in starts]
+        else:
+            with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+                blocks = list(executor.map(work, starts))
+
+        return np.concatenate(blocks) if blocks else np.empty(0, dtype=int)
+
+    def bmu_coordinates(self, X, batch_size=4096):
+        """(fila, columna) en la rejilla de la BMU de cada muestra."""
+        return np.column_stack(np.divmod(self.bmu(X, batch_size), self.cols))
+
+    # ------------------------------------------------------------------
+    # Entrenamiento
+    # ------------------------------------------------------------------
+    def fit(self, X, epochs=10, batch_size=4096, init='sample', verbose=True):
+        """
+        Entrena el mapa con el algoritmo batch.
+
+        En cada época:
+            sums[j]   = Σ x   de las muestras cuya BMU es j
+            counts[j] = nº de muestras cuya BMU es j
+            W = (H · sums) / (H · counts)
+        donde H es el kernel de vecindad. Equivale a que cada neurona sea
+        la media de los datos ponderada por su cercanía a la BMU.
+
+        Args:
+            X: Datos (array o np.memmap), forma (n, n_features)
+            epochs: Épocas (sigma decrece exponencialmente entre épocas)
+            batch_size: Muestras por bloque al buscar BMUs
+            init: 'sample' (pesos = muestras al azar) o 'random'
+
+        Tras el entrenamiento, quantization_errors_ tiene el error de
+        cuantización del mapa al final de cada época (con o sin verbose).
+        """
+        if init == 'sample':
+            idx = np.sort(self.rng.choice(len(X), size=self.n_units, replace=len(X) < self.n_units))
+            self.weights = np.asarray(X[idx], dtype=self.dtype).copy()
+
+        # Error de cuantización tras cada época. El de la época e sale gratis
+        # de la búsqueda de BMUs de la época e+1 (usa esos mismos pesos);
+        # solo el de la última necesita una pasada extra al final
+        self.quantization_errors_ = []
+        sigmas = []
+
+        # Cada batch se reparte en n_jobs bloques para que bmu() use los hilos
+        bmu_block = -(-batch_size // max(self.n_jobs, 1))
+
+        for epoch in range(epochs):
+            progress = epoch / max(epochs - 1, 1)
+            sigma = self.sigma * (self.sigma_end / self.sigma) ** progress
+            sigmas.append(sigma)
+            H = self.neighborhood(sigma)
+
+            sums = np.zeros((self.n_units, self.n_features), dtype=np.float64)
+            counts = np.zeros(self.n_units, dtype=np.float64)
+            distance = 0.0
+
+            for start in range(0, len(X), batch_size):
+                X_batch = np.asarray(X[start:start + batch_size], dtype=self.dtype)
+                winners = self.bmu(X_batch, batch_size=bmu_block)
+
+                # Suma por neurona: se ordena por BMU y se suman los tramos
+                order = np.argsort(winners, kind='stable')
+                units, first = np.unique(winners[order], return_index=True)
+                sums[units] += np.add.reduceat(X_batch[order], first, axis=0, dtype=np.float64)
+                counts += np.bincount(winners, minlength=self.n_units)
+
+                diff = X_batch - self.weights[winners]
+                distance += np.sqrt(np.sum(diff ** 2, axis=1)).sum()
+
+            if epoch > 0:
+                self._record_quantization_error(distance / len(X), epochs, sigmas, verbose)
+
+            numerator = H @ sums
+            denominator = H @ counts
+            # Neuronas sin ninguna muestra cerca conservan sus pesos
+            active = denominator > 1e-12
+            self.weights[active] = (numerator[active] / denominator[active, None]).astype(self.dtype)
+
+        if epochs > 0:
+            qe = self.quantization_error(X, batch_size=batch_size)
+            self._record_quantization_error(qe, epochs, sigmas, verbose)
+
+        return self
+
+    def _record_quantization_error(self, qe, epochs, sigmas, verbose):
+        self.quantization_errors_.append(qe)
+        if verbose:
+            epoch = len(self.quantization_errors_)
+            print(f"Época {epoch}/{epochs} - sigma: {sigmas[epoch - 1]:.2f} - error de cuantización: {qe:.4f}")
+
+    # ------------------------------------------------------------------
+    # Análisis
+    # ------------------------------------------------------------------
+    def quantization_error(self, X, batch_size=4096):
+        """Distancia media de cada muestra a su BMU."""
+        total = 0.0
+        for start in range(0, len(X), batch_size):
+            X_batch = np.asarray(X[start:start + batch_size], dtype=self.dtype)
+            diff = X_batch - self.weights[self.bmu(X_batch, batch_size)]
+            total += np.sqrt(np.sum(diff ** 2, axis=1)).sum()
+        return total / len(X)
+
+    def hit_map(self, X, batch_size=4096):
+        """Número de muestras que gana cada neurona, forma (rows, cols)."""
+        counts = np.bincount(self.bmu(X, batch_size), minlength=self.n_units)
+        return counts.reshape(self.rows, self.cols)
+
+    def u_matrix(self):
+        """
+        U-Matrix: distancia media de cada neurona a sus 4 vecinas.
+
+        Valores altos = fronteras entre grupos; valores bajos = zonas
+        homogéneas del mapa.
+        """
+        W = self.weights.reshape(self.rows, self.cols, self.n_features)
+        total = np.zeros((self.rows, self.cols))
+        n_neighbors = np.zeros((self.rows, self.cols))
+
+        vertical = np.sqrt(np.sum((W[1:] - W[:-1]) ** 2, axis=2))
+        horizontal = np.sqrt(np.sum((W[:, 1:] - W[:, :-1]) ** 2, axis=2))
+
+        total[1:] += vertical
+        total[:-1] += vertical
+        total[:, 1:] += horizontal
+        total[:, :-1] += horizontal
+        n_neighbors[1:] += 1
+        n_neighbors[:-1] += 1
+        n_neighbors[:, 1:] += 1
+        n_neighbors[:, :-1] += 1
+
+        return total / np.maximum(n_neighbors, 1)
+
+    def label_map(self, X, y, batch_size=4096):
+        """
+        Clase mayoritaria de cada neurona (-1 si no gana ninguna muestra).
+
+        Se cuenta con un solo bincount sobre bmu * n_clases + y.
+        """
+        y = np.asarray(y, dtype=int)
+        n_classes = int(y.max()) + 1
+        winners = self.bmu(X, batch_size)
+        votes = np.bincount(winners * n_classes + y, minlength=self.n_units * n_classes)
+        votes = votes.reshape(self.n_units, n_classes)
+        labels = votes.argmax(axis=1)
+        labels[votes.sum(axis=1) == 0] = -1
+        return labels.reshape(self.rows, self.cols)
+
+
+# ============================================================
+# PRUEBAS
+# ============================================================
+if __name__ == "__main__":
+    import time
+
+    print("=" * 50)
+    print("PRUEBA DE SOM")
+    print("=" * 50)
+
+    # Datos sintéticos: 4 grupos en 50 dimensiones
+    rng = np.random.default_rng(42)
+    centers = rng.random((4, 50))
+    y = rng.integers(0, 4, size=20000)
+    X = (centers[y] + rng.normal(0, 0.05, size=(20000, 50))).astype(np.float32)
+
+    som = SOM(rows=10, cols=10, n_features=50, seed=42)
+    start = time.perf_counter()
+    som.fit(X, epochs=5)
+    print(f"\nTiempo de entrenamiento: {time.perf_counter() - start:.2f}s")
+    print(f"Clases por neurona:\n{som.label_map(X, y)}")
@@ -0,0 +1,55 @@
+"""
+sklearn_models.py - Equivalentes de scikit-learn de los modelos propios
+
+Sirven de referencia para comparar con src/custom/:
+- MLP propio       ↔  sklearn.neural_network.MLPClassifier
+- SOM propio       ↔  sklearn.cluster.MiniBatchKMeans
+  (no hay SOM en sklearn; k-means es lo más parecido: también asigna
+  cada muestra al prototipo más cercano, pero sin rejilla ni vecindad)
+"""
+
+try:
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.neural_network import MLPClassifier
+except ImportError:
+    raise ImportError("Instale scikit-learn: pip install scikit-learn")
+
+
+def build_mlp_classifier(hidden_layers=(128,), epochs=10, batch_size=64,
+                         learning_rate=0.001, seed=42):
+    """MLPClassifier configurado como el MLP propio (ReLU + Adam + mini-batch)."""
+    return MLPClassifier(
+        hidden_layer_sizes=hidden_layers,
+        activation='relu',
+        solver='adam',
+        batch_size=batch_size,
+        learning_rate_init=learning_rate,
+        max_iter=epochs,
+        shuffle=True,
+        random_state=seed,
+    )
+
+
+def build_som_proxy(rows=10, cols=10, batch_size=4096, epochs=None, seed=42):
+    """
+    MiniBatchKMeans con tantos clusters como neuronas tiene el SOM.
+
+    Con epochs se hacen exactamente esas pasadas por los datos (sin parada
+    temprana), como el SOM propio: así los tiempos son comparables.
+    """
+    if epochs is None:
+        return MiniBatchKMeans(
+            n_clusters=rows * cols,
+            batch_size=batch_size,
+            n_init=1,
+            random_state=seed,
+        )
+    return MiniBatchKMeans(
+        n_clusters=rows * cols,
+        batch_size=batch_size,
+        n_init=1,
+        max_iter=epochs,
+        max_no_improvement=None,
+        tol=0.0,
+        random_state=seed,
+    )
@@ -0,0 +1,292 @@
+"""
+data_loader.py - Carga de datos con caché en data/processed/
+
+¿POR QUÉ UNA CACHÉ?
+Decodificar las 60.000 imágenes PNG del parquet de MNIST o parsear el
+CSV meteorológico cuesta segundos o minutos, y los notebooks lo repetían
+en cada ejecución. Aquí se hace UNA vez:
+1. Se lee el fichero crudo (data/raw/...) y se guarda como .npy en
+   data/processed/ con un dtype compacto (uint8 para píxeles,
+   float32 para variables meteorológicas)
+2. Las siguientes cargas abren el .npy con mmap_mode='r': no se lee
+   nada hasta que se usa, así que cargar tarda milisegundos
+3. Un manifiesto .json guarda el checksum (sha256) del fichero crudo.
+   Si el crudo cambia, la caché se regenera sola
+
+¿QUÉ ES mmap_mode='r'?
+El sistema operativo "proyecta" el fichero en memoria: X[i] lee solo
+esa fila de disco. Un dataset de varios GB se usa como un array normal
+sin ocupar RAM.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RAW_DIR = os.path.join(BASE_DIR, 'data', 'raw')
+PROCESSED_DIR = os.path.join(BASE_DIR, 'data', 'processed')
+
+MNIST_RAW = os.path.join(RAW_DIR, 'mnist', 'train-00000-of-00001.parquet')
+WEATHER_RAW = os.path.join(RAW_DIR, 'weather', 'southamerica_weather.csv')
+
+# Cambiar si cambia el formato de los .npy (invalida todas las cachés)
+CACHE_VERSION = 1
+
+
+def _sha256(path, chunk_size=1 << 20):
+    """Checksum de un fichero, leído por bloques."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_info(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _cache_is_valid(manifest, source_path, processed_dir, verify):
+    """
+    Decide si la caché descrita por el manifiesto sigue valiendo.
+
+    Comprobar tamaño y fecha del crudo es instantáneo. Solo si alguno
+    cambia se recalcula el sha256 (p. ej. el fichero se copió de nuevo
+    pero el contenido es el mismo).
+    """
+    if manifest.get('version') != CACHE_VERSION:
+        return False
+
+    for name, info in manifest['files'].items():
+        path = os.path.join(processed_dir, info['file'])
+        if not os.path.exists(path):
+            return False
+        if verify and _sha256(path) != info['sha256']:
+            return False
+
+    if source_path is None or not os.path.exists(source_path):
+        # Sin fichero crudo no hay con qué comparar: se usa la caché
+        return True
+
+    source = manifest['source']
+    current = _source_info(source_path)
+    if current['size'] == source['size'] and current['mtime'] == source['mtime']:
+        return True
+
+    return _sha256(source_path) == source['sha256']
+
+
+def load_cached(name, source_path, builder, processed_dir=None, force=False, verify=False):
+    """
+    Devuelve los arrays de la caché `name`, construyéndolos si hace falta.
+
+    Args:
+        name: Prefijo de los ficheros (p. ej. 'mnist' → mnist_X.npy)
+        source_path: Fichero crudo del que se construyen los arrays
+        builder: Función builder(source_path) → dict {'X': array, ...}
+        processed_dir: Carpeta de la caché (por defecto data/processed/)
+        force: Reconstruir aunque la caché sea válida
+        verify: Comprobar también el sha256 de los .npy (más lento)
+
+    Returns:
+        dict {'X': np.memmap, 'y': np.memmap, ...} en modo solo lectura
+    """
+    processed_dir = processed_dir or PROCESSED_DIR
+    manifest_path = os.path.join(processed_dir, f'{name}.json')
+
+    manifest = None
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if not _cache_is_valid(manifest, source_path, processed_dir, verify):
+            manifest = None
+
+    if manifest is None:
+        if source_path is None or not os.path.exists(source_path):
+            raise FileNotFoundError(f"No hay caché ni datos crudos para '{name}': {source_path}")
+
+        print(f"Procesando {source_path} → {processed_dir} (solo la primera vez)")
+        os.makedirs(processed_dir, exist_ok=True)
+        arrays = builder(source_path)
+
+        manifest = {
+            'version': CACHE_VERSION,
+            'source': dict(_source_info(source_path), sha256=_sha256(source_path)),
+            'files': {},
+            'meta': arrays.pop('meta', {}),
+        }
+        for key, array in arrays.items():
+            filename = f'{name}_{key}.npy'
+            path = os.path.join(processed_dir, filename)
+            np.save(path, array)
+            manifest['files'][key] = {
+                'file': filename,
+                'sha256': _sha256(path),
+                'shape': list(array.shape),
+                'dtype': str(array.dtype),
+            }
+
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    else:
+        # El crudo se tocó pero su contenido es el mismo: actualizar fecha
+        if source_path is not None and os.path.exists(source_path):
+            current = _source_info(source_path)
+            if current['mtime'] != manifest['source']['mtime']:
+                manifest['source'].update(current)
+                with open(manifest_path, 'w') as f:
+                    json.dump(manifest, f, indent=2)
+
+    data = {
+        key: np.load(os.path.join(processed_dir, info['file']), mmap_mode='r')
+        for key, info in manifest['files'].items()
+    }
+    data['meta'] = manifest.get('meta', {})
+    return data
+
+
+# ============================================================
+# MNIST
+# ============================================================
+def _build_mnist(source_path):
+    """Decodifica el parquet de Hugging Face (PNG por fila) a uint8 (n, 784)."""
+    import io
+
+    import pandas as pd
+    from PIL import Image
+
+    df = pd.read_parquet(source_path)
+    X = np.empty((len(df), 784), dtype=np.uint8)
+    for i, img in enumerate(df['image'].values):
+        X[i] = np.asarray(Image.open(io.BytesIO(img['bytes'])), dtype=np.uint8).ravel()
+
+    y = df['label'].to_numpy().astype(np.uint8)
+    return {'X': X, 'y': y}
+
+
+def _download_mnist(path):
+    """Descarga MNIST con la librería `datasets` y lo guarda como parquet."""
+    try:
+        from datasets import load_dataset
+    except ImportError:
+        raise ImportError("Instale datasets: pip install datasets")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    load_dataset('mnist', split='train').to_parquet(path)
+
+
+def load_mnist(raw_path=None, processed_dir=None, download=True, force=False, verify=False):
+    """
+    Carga MNIST como (X, y) en memmap.
+
+    X: uint8 (n, 784), píxeles 0-255. y: uint8 (n,).
+    Para entrenar, escalar por batches (X_batch / 255.0), nunca el
+    dataset entero.
+
+    Args:
+        raw_path: Parquet de Hugging Face (por defecto data/raw/mnist/...)
+        download: Descargarlo si no existe ni el crudo ni la caché
+    """
+    raw_path = raw_path or MNIST_RAW
+    processed_dir = processed_dir or PROCESSED_DIR
+    has_cache = os.path.exists(os.path.join(processed_dir, 'mnist.json'))
+
+    if download and not os.path.exists(raw_path) and (force or not has_cache):
+        _download_mnist(raw_path)
+
+    data = load_cached('mnist', raw_path, _build_mnist, processed_dir, force, verify)
+    return data['X'], data['y']
+
+
+# ============================================================
+# DATOS METEOROLÓGICOS (NASA POWER)
+# ============================================================
+def _build_weather(source_path):
+    """Columnas numéricas del CSV a float32; el resto (texto, fechas) se descarta."""
+    import pandas as pd
+
+    df = pd.read_csv(source_path)
+    numeric = df.select_dtypes(include='number')
+    return {
+        'X': numeric.to_numpy(dtype=np.float32),
+        'meta': {
+            'columns': numeric.columns.tolist(),
+            'dropped_columns': [c for c in df.columns if c not in numeric.columns],
+        },
+    }
+
+
+def load_weather(raw_path=None, processed_dir=None, force=False, verify=False):
+    """
+    Carga los datos meteorológicos como (X, columnas).
+
+    X: float32 (n, n_variables) en memmap, con NaN donde faltan datos
+    (usar SimpleImputer de preprocessing.py).
+    """
+    data = load_cached('weather', raw_path or WEATHER_RAW, _build_weather,
+                       processed_dir, force, verify)
+    return data['X'], data['meta']['columns']
+
+
+# ============================================================
+# MINI-BATCHES
+# ============================================================
+def iter_minibatches(X, y=None, batch_size=64, shuffle=True, rng=None, drop_last=False):
+    """
+    Recorre X (e y) por mini-batches.
+
+    Solo se copia cada batch (X[idx]), nunca el dataset entero, así que
+    funciona igual con arrays en RAM que con np.memmap. Al barajar, los
+    índices de cada batch se ordenan: leer el fichero en orden es mucho
+    más rápido que saltar al azar, y el contenido del batch es el mismo.
+
+    Args:
+        rng: np.random.Generator o semilla (None = aleatorio)
+
+    Yields:
+        X_batch, o (X_batch, y_batch) si se pasa y
+    """
+    n = len(X)
+    if shuffle:
+        rng = rng if isinstance(rng, np.random.Generator) else np.random.default_rng(rng)
+        order = rng.permutation(n)
+    else:
+        order = None
+
+    stop = n - n % batch_size if drop_last else n
+    for start in range(0, stop, batch_size):
+        if order is None:
+            idx = slice(start, min(start + batch_size, n))
+        else:
+            idx = np.sort(order[start:start + batch_size])
+
+        if y is None:
+            yield X[idx]
+        else:
+            yield X[idx], y[idx]
+
+
+# ============================================================
+# PRUEBAS
+# ============================================================
+if __name__ == "__main__":
+    import time
+
+    print("=" * 50)
+    print("PRUEBA DE CARGA DE DATOS")
+    print("=" * 50)
+
+    for loader in (load_mnist, load_weather):
+        try:
+            start = time.perf_counter()
+            X, extra = loader()
+            elapsed = time.perf_counter() - start
+            print(f"{loader.__name__}: {X.shape} {X.dtype} en {elapsed * 1000:.1f} ms")
+        except (FileNotFoundError, ImportError) as e:
+            print(f"{loader.__name__}: no disponible ({e})")
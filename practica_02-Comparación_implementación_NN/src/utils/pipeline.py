@@ -0,0 +1,223 @@
+"""
+pipeline.py - Preprocesamiento por bloques sobre arrays en disco
+
+¿POR QUÉ UN PIPELINE POR BLOQUES?
+Las utilidades de preprocessing.py trabajan con arrays NumPy en RAM.
+El dataset meteorológico completo o MNIST en float64 no caben en la
+memoria de un portátil pequeño. La solución:
+1. Los datos viven en disco (.npy abierto con np.memmap)
+2. Se procesan por bloques de filas (chunk_size)
+3. El resultado se escribe directamente en otro .npy en disco
+
+¿POR QUÉ HILOS Y NO PROCESOS?
+Las operaciones de NumPy (restar, dividir, comparar) liberan el GIL,
+así que varios hilos pueden transformar bloques distintos a la vez sin
+copiar los datos entre procesos.
+"""
+
+import inspect
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .preprocessing import SimpleImputer
+
+
+def _as_array(X):
+    """Abre un .npy con mmap si X es una ruta (str o os.PathLike); si no, lo deja como está."""
+    if isinstance(X, (str, os.PathLike)):
+        return np.load(X, mmap_mode='r')
+    return X
+
+
+def _clone(step):
+    """
+    Copia sin ajustar de un transformador, con los mismos parámetros.
+
+    Como sklearn.base.clone: get_params() si existe; si no, los argumentos
+    de __init__ que el objeto guarda con el mismo nombre.
+    """
+    if hasattr(step, 'get_params'):
+        return type(step)(**step.get_params(deep=False))
+
+    params = inspect.signature(type(step).__init__).parameters
+    kwargs = {name: getattr(step, name) for name in params
+              if name != 'self' and hasattr(step, name)}
+    return type(step)(**kwargs)
+
+
+class ChunkedPipeline:
+    """
+    Encadena pasos de preprocesamiento y los aplica bloque a bloque.
+
+    Cada paso es un par (nombre, transformador). Un transformador necesita
+    transform() y, para poder ajustarse por bloques, partial_fit():
+    StandardScaler, MinMaxScaler, SimpleImputer y OneHotEncoder lo cumplen.
+    SimpleImputer('median') no: la mediana no se puede acumular por
+    bloques, y se rechaza al crear el pipeline.
+
+    fit() ajusta copias nuevas de los pasos (volver a llamarlo no acumula
+    las estadísticas del ajuste anterior): los pasos ajustados están en
+    pipeline.steps / pipeline.named_steps, no en los objetos originales.
+
+    Ejemplo:
+        pipeline = ChunkedPipeline([
+            ('imputer', SimpleImputer('mean')),
+            ('scaler', StandardScaler()),
+        ], chunk_size=10000)
+        pipeline.fit('data/processed/weather_X.npy')
+        pipeline.transform('data/processed/weather_X.npy',
+                           output_path='data/processed/weather_X_scaled.npy')
+    """
+
+    def __init__(self, steps, chunk_size=8192, n_jobs=None, dtype=None):
+        """
+        Args:
+            steps: Lista de pares (nombre, transformador)
+            chunk_size: Filas por bloque
+            n_jobs: Hilos para transform (None = los que decida ThreadPoolExecutor)
+            dtype: Tipo de la salida (None = el que devuelva el último paso)
+        """
+        for name, step in steps:
+            if not hasattr(step, 'partial_fit'):
+                raise TypeError(f"El paso '{name}' no tiene partial_fit()")
+            if isinstance(step, SimpleImputer) and step.strategy == 'median':
+                raise ValueError(f"El paso '{name}': la mediana no se puede calcular por bloques; "
+                                 "usa strategy='mean' o 'zero'")
+
+        self.steps = list(steps)
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs
+        self.dtype = dtype
+        self.is_fitted = False
+
+    @property
+    def named_steps(self):
+        return dict(self.steps)
+
+    def _chunks(self, n_rows):
+        for start in range(0, n_rows, self.chunk_size):
+            yield slice(start, min(start + self.chunk_size, n_rows))
+
+    def _transform_chunk(self, X_chunk, n_steps=None):
+        """Aplica los primeros n_steps pasos (todos si es None) a un bloque."""
+        for _, step in self.steps[:n_steps]:
+            X_chunk = step.transform(X_chunk)
+        return X_chunk
+
+    def fit(self, X):
+        """
+        Ajusta cada paso con la salida de los anteriores.
+
+        Se hace una pasada por los datos por cada paso: el paso i necesita
+        ver los datos ya transformados por los pasos 0..i-1, y esos solo
+        se conocen cuando los pasos anteriores han terminado de ajustarse.
+
+        Cada paso se sustituye antes por una copia sin ajustar: partial_fit
+        acumula, y un segundo fit() mezclaría los datos de los dos.
+        """
+        X = _as_array(X)
+        self.steps = [(name, _clone(step)) for name, step in self.steps]
+        self.is_fitted = False
+
+        for i, (name, step) in enumerate(self.steps):
+            for rows in self._chunks(len(X)):
+                step.partial_fit(self._transform_chunk(X[rows], n_steps=i))
+
+        self.is_fitted = True
+        return self
+
+    def transform(self, X, output_path=None):
+        """
+        Transforma X bloque a bloque en un pool de hilos.
+
+        Args:
+            X: Array, np.memmap o ruta a un .npy
+            output_path: Ruta del .npy de salida. Si se indica, la salida
+                         es un np.memmap y nunca está entera en RAM.
+
+        Returns:
+            Array (o np.memmap) con los datos transformados
+        """
+        if not self.is_fitted:
+            raise ValueError("Debes llamar a fit() primero")
+
+        X = _as_array(X)
+        n_rows = len(X)
+
+        # La forma y el tipo de la salida se deducen transformando una fila
+        sample = np.asarray(self._transform_chunk(X[:1]))
+        dtype = self.dtype or sample.dtype
+        shape = (n_rows,) + sample.shape[1:]
+
+        if output_path is not None:
+            out = np.lib.format.open_memmap(output_path, mode='w+', dtype=dtype, shape=shape)
+        else:
+            out = np.empty(shape, dtype=dtype)
+
+        def work(rows):
+            out[rows] = self._transform_chunk(X[rows])
+
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+            # list() para que se propaguen las excepciones de los hilos
+            list(executor.map(work, self._chunks(n_rows)))
+
+        if isinstance(out, np.memmap):
+            out.flush()
+
+        return out
+
+    def fit_transform(self, X, output_path=None):
+        """Fit y transform en un solo paso."""
+        return self.fit(X).transform(X, output_path=output_path)
+
+    def save(self, path):
+        """Guarda el pipeline ajustado (todos los pasos) en un único fichero."""
+        if not self.is_fitted:
+            raise ValueError("Debes llamar a fit() primero")
+
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        """Carga un pipeline guardado con save()."""
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+# ============================================================
+# PRUEBAS
+# ============================================================
+if __name__ == "__main__":
+    import tempfile
+
+    from src.utils.preprocessing import SimpleImputer, StandardScaler
+
+    print("=" * 50)
+    print("PRUEBA DE PIPELINE POR BLOQUES")
+    print("=" * 50)
+
+    rng = np.random.default_rng(42)
+    tmp_dir = tempfile.mkdtemp()
+    input_path = os.path.join(tmp_dir, 'X.npy')
+    output_path = os.path.join(tmp_dir, 'X_scaled.npy')
+
+    X = rng.normal(20, 5, size=(100_000, 8))
+    X[rng.random(X.shape) < 0.05] = np.nan
+    np.save(input_path, X)
+
+    pipeline = ChunkedPipeline([
+        ('imputer', SimpleImputer('mean')),
+        ('scaler', StandardScaler()),
+    ], chunk_size=10_000, dtype=np.float32)
+
+    X_out = pipeline.fit_transform(input_path, output_path=output_path)
+    print(f"Salida: {X_out.shape} {X_out.dtype} en {output_path}")
+    print(f"Media por columna: {X_out.mean(axis=0).round(3)}")
+    print(f"Std por columna: {X_out.std(axis=0).round(3)}")
+
+    pipeline.save(os.path.join(tmp_dir, 'pipeline.pkl'))
+    print("✓ Pipeline guardado en pipeline.pkl")
@@ -13,6 +13,8 @@ Sin preprocesamiento, la red puede:
 - Producir resultados inconsistentes
 """
 
+import warnings
+
 import numpy as np
 
 
@@ -34,6 +36,8 @@ class StandardScaler:
     def __init__(self):
         self.mean_ = None
         self.std_ = None
+        self.var_ = None
+        self.n_samples_seen_ = 0
         self.is_fitted = False
     
     def fit(self, X):
@@ -50,7 +54,9 @@ class StandardScaler:
         """
         X = np.array(X)
         self.mean_ = np.mean(X, axis=0)
+        self.var_ = np.var(X, axis=0)
         self.std_ = np.std(X, axis=0)
+        self.n_samples_seen_ = X.shape[0]
         
         # Evitar división por cero
         self.std_[self.std_ == 0] = 1.0
@@ -58,6 +64,35 @@ class StandardScaler:
         self.is_fitted = True
         return self
     
+    def partial_fit(self, X):
+        """
+        Actualiza media y varianza con un nuevo bloque de filas.
+        
+        Combina las estadísticas acumuladas con las del bloque
+        (fórmula de Chan et al.), así que el resultado es el mismo que
+        hacer fit con todos los datos juntos, pero sin tenerlos en memoria.
+        """
+        X = np.asarray(X, dtype=float)
+        n_b = X.shape[0]
+        mean_b = np.mean(X, axis=0)
+        var_b = np.var(X, axis=0)
+        
+        if self.n_samples_seen_ == 0:
+            self.mean_, self.var_ = mean_b, var_b
+        else:
+            n_a = self.n_samples_seen_
+            n = n_a + n_b
+            delta = mean_b - self.mean_
+            self.mean_ = self.mean_ + delta * n_b / n
+            self.var_ = (self.var_ * n_a + var_b * n_b + delta ** 2 * n_a * n_b / n) / n
+        
+        self.n_samples_seen_ += n_b
+        self.std_ = np.sqrt(self.var_)
+        self.std_[self.std_ == 0] = 1.0
+        
+        self.is_fitted = True
+        return self
+    
     def transform(self, X):
         """Aplica la estandarización."""
         if not self.is_fitted:
@@ -116,6 +151,24 @@ class MinMaxScaler:
         self.is_fitted = True
         return self
     
+    def partial_fit(self, X):
+        """Actualiza mínimo y máximo con un nuevo bloque de filas."""
+        X = np.asarray(X)
+        min_b = np.min(X, axis=0)
+        max_b = np.max(X, axis=0)
+        
+        if self.is_fitted:
+            min_b = np.minimum(self.min_, min_b)
+            max_b = np.maximum(self.max_, max_b)
+        
+        self.min_, self.max_ = min_b, max_b
+        range_ = self.max_ - self.min_
+        range_[range_ == 0] = 1.0
+        self.range_ = range_
+        
+        self.is_fitted = True
+        return self
+    
     def transform(self, X):
         """Aplica la normalización."""
         if not self.is_fitted:
@@ -143,40 +196,181 @@ class MinMaxScaler:
         return X * self.range_ + self.min_
 
 
-def handle_missing_values(X, strategy='mean'):
+class SimpleImputer:
     """
-    Maneja valores faltantes (NaN).
+    Imputación de valores faltantes (NaN) con estadísticas aprendidas.
     
     Estrategias:
     - 'mean': reemplaza NaN con la media de la columna
     - 'median': reemplaza con la mediana (más robusto a outliers)
     - 'zero': reemplaza con 0
     
+    Con 'mean' y 'median', una columna sin ningún valor observado no tiene
+    estadística: sus NaN se quedan como NaN (y fit avisa con un
+    RuntimeWarning), igual que con np.nanmean.
+    
+    ¿POR QUÉ UN OBJETO CON fit/transform?
+    Igual que con los scalers: las estadísticas de relleno se aprenden
+    con los datos de entrenamiento y se reutilizan tal cual en test y en
+    producción. Si recalculáramos la media con cada lote nuevo, el mismo
+    NaN se rellenaría con valores distintos según el lote.
+    
+    ¿POR QUÉ VECTORIZADO?
+    Todas las columnas se procesan a la vez (una pasada por bloque de filas)
+    y el relleno es una única asignación con máscara. Con `chunk_size`
+    se recorren los datos por bloques, así que funciona con np.memmap
+    sin cargar la tabla entera en memoria.
+    
+    Esta es una implementación propia para entender qué hace
+    sklearn.impute.SimpleImputer
+    """
+    
+    STRATEGIES = ('mean', 'median', 'zero')
+    
+    def __init__(self, strategy='mean', chunk_size=None):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Estrategia desconocida: {strategy}")
+        
+        self.strategy = strategy
+        self.chunk_size = chunk_size
+        self.statistics_ = None
+        self.n_missing_ = None
+        self.n_samples_seen_ = 0
+        self.is_fitted = False
+        self._sum = None
+        self._count = None
+    
+    def _chunks(self, n_rows):
+        """Genera slices de filas de tamaño chunk_size (o uno solo si es None)."""
+        step = self.chunk_size or max(n_rows, 1)
+        for start in range(0, n_rows, step):
+            yield slice(start, min(start + step, n_rows))
+    
+    def _reset(self):
+        self.statistics_ = None
+        self.n_missing_ = None
+        self.n_samples_seen_ = 0
+        self.is_fitted = False
+        self._sum = None
+        self._count = None
+    
+    def fit(self, X):
+        """
+        Aprende el valor de relleno de cada columna.
+        
+        Con 'mean' y 'zero' se recorre X por bloques (partial_fit), así
+        que X puede ser un np.memmap más grande que la RAM. La mediana
+        no se puede acumular por bloques y necesita las columnas completas.
+        """
+        self._reset()
+        if len(X) == 0:
+            raise ValueError("X está vacío: no hay filas de las que aprender")
+        
+        if self.strategy == 'median':
+            X = np.asarray(X, dtype=float)
+            mask = np.isnan(X)
+            with warnings.catch_warnings():
+                # Columnas sin ningún valor: nanmedian devuelve NaN (se avisa abajo)
+                warnings.simplefilter('ignore', RuntimeWarning)
+                self.statistics_ = np.nanmedian(X, axis=0)
+            self.n_missing_ = mask.sum(axis=0)
+            self.n_samples_seen_ = X.shape[0]
+            self.is_fitted = True
+        else:
+            for rows in self._chunks(len(X)):
+                self.partial_fit(X[rows])
+        
+        empty = np.flatnonzero(np.isnan(self.statistics_))
+        if len(empty):
+            warnings.warn(f"Columnas sin ningún valor observado {empty.tolist()}: "
+                          f"sus NaN no se rellenan", RuntimeWarning, stacklevel=2)
+        return self
+    
+    def partial_fit(self, X):
+        """
+        Actualiza las estadísticas con un nuevo bloque de filas.
+        
+        Útil cuando los datos llegan por partes (lotes, ficheros, memmap).
+        Solo acumula sumas y conteos por columna, no guarda los datos.
+        """
+        if self.strategy == 'median':
+            raise ValueError("La mediana no se puede calcular por bloques; usa fit()")
+        
+        X = np.asarray(X, dtype=float)
+        mask = np.isnan(X)
+        
+        if self._sum is None:
+            self._sum = np.zeros(X.shape[1])
+            self._count = np.zeros(X.shape[1], dtype=np.int64)
+            self.n_missing_ = np.zeros(X.shape[1], dtype=np.int64)
+        
+        self._sum += np.where(mask, 0.0, X).sum(axis=0)
+        self._count += X.shape[0] - mask.sum(axis=0)
+        self.n_missing_ += mask.sum(axis=0)
+        self.n_samples_seen_ += X.shape[0]
+        
+        if self.strategy == 'mean':
+            # Columnas sin ningún valor observado: NaN, como np.nanmean
+            self.statistics_ = np.where(self._count > 0, self._sum / np.maximum(self._count, 1), np.nan)
+        else:
+            self.statistics_ = np.zeros(X.shape[1])
+        
+        self.is_fitted = True
+        return self
+    
+    def transform(self, X, out=None):
+        """
+        Rellena los NaN con las estadísticas aprendidas.
+        
+        Args:
+            X: Datos con NaN (array o np.memmap)
+            out: Array de salida opcional (por ejemplo otro np.memmap).
+                 Puede ser el propio X para imputar in-place.
+        """
+        if not self.is_fitted:
+            raise ValueError("Debes llamar a fit() primero")
+        
+        if out is None:
+            out = np.array(X, dtype=float)
+            np.copyto(out, self.statistics_, where=np.isnan(out))
+            return out
+        
+        for rows in self._chunks(len(X)):
+            block = out[rows]
+            if out is not X:
+                block[...] = X[rows]
+            np.copyto(block, self.statistics_, where=np.isnan(block))
+        
+        return out
+    
+    def fit_transform(self, X):
+        """Fit y transform en un solo paso."""
+        return self.fit(X).transform(X)
+
+
+def handle_missing_values(X, strategy='mean', verbose=False):
+    """
+    Maneja valores faltantes (NaN).
+    
+    Atajo de SimpleImputer(strategy).fit_transform(X). Para reutilizar las
+    estadísticas con datos de test o producción, usa SimpleImputer directamente.
+    
     ¿POR QUÉ NO SIMPLEMENTE ELIMINAR FILAS CON NaN?
     - Perderíamos demasiados datos
     - En producción, no podemos rechazar datos incompletos
     """
-    X = np.array(X, dtype=float)
+    imputer = SimpleImputer(strategy)
+    X_filled = imputer.fit_transform(X)
     
-    for col in range(X.shape[1]):
-        mask = np.isnan(X[:, col])
-        if mask.any():
-            if strategy == 'mean':
-                fill_value = np.nanmean(X[:, col])
-            elif strategy == 'median':
-                fill_value = np.nanmedian(X[:, col])
-            elif strategy == 'zero':
-                fill_value = 0
-            else:
-                raise ValueError(f"Estrategia desconocida: {strategy}")
-            
-            X[mask, col] = fill_value
-            print(f"  Columna {col}: {mask.sum()} NaN reemplazados con {strategy}")
+    if verbose:
+        n_cols = int((imputer.n_missing_ > 0).sum())
+        print(f"  {int(imputer.n_missing_.sum())} NaN reemplazados con {strategy} "
+              f"en {n_cols} columnas")
     
-    return X
+    return X_filled
 
 
-def one_hot_encode(y, num_classes=None):
+def one_hot_encode(y, num_classes=None, dtype=np.float64, output='dense'):
     """
     Convierte etiquetas a one-hot encoding.
     
@@ -189,23 +383,150 @@ def one_hot_encode(y, num_classes=None):
     Las etiquetas 0, 1, 2 implican un orden (2 > 1 > 0).
     Pero para clasificación, las clases no tienen orden.
     One-hot trata cada clase como igual de diferente de las demás.
+    
+    ¿Y LA MEMORIA?
+    Una matriz densa float64 gasta 8 bytes por celda para guardar un solo
+    índice por fila. Alternativas:
+    - dtype=np.uint8 / bool (1 byte) o np.float32 (4 bytes)
+    - output='sparse': matriz CSR de scipy (un valor + un índice por fila)
+    - output='lazy': OneHotView, guarda solo las etiquetas y genera el
+      one-hot denso del lote que se pida (X_batch = view[i:i+64])
+    
+    Args:
+        y: Etiquetas enteras
+        num_classes: Número de clases (por defecto max(y) + 1)
+        dtype: Tipo de los valores one-hot
+        output: 'dense', 'sparse' o 'lazy'
     """
     y = np.array(y, dtype=int)
     
     if num_classes is None:
         num_classes = np.max(y) + 1
     
-    one_hot = np.zeros((len(y), num_classes))
+    if output == 'lazy':
+        return OneHotView(y, num_classes, dtype=dtype)
+    
+    if output == 'sparse':
+        try:
+            from scipy.sparse import csr_matrix
+        except ImportError:
+            raise ImportError("Instale scipy: pip install scipy")
+        
+        data = np.ones(len(y), dtype=dtype)
+        indptr = np.arange(len(y) + 1)
+        return csr_matrix((data, y, indptr), shape=(len(y), num_classes))
+    
+    if output != 'dense':
+        raise ValueError(f"Formato de salida desconocido: {output}")
+    
+    one_hot = np.zeros((len(y), num_classes), dtype=dtype)
     one_hot[np.arange(len(y)), y] = 1
     
     return one_hot
 
 
+class OneHotView:
+    """
+    One-hot "perezoso": guarda solo el índice de clase de cada fila.
+    
+    Se comporta como una matriz (n, num_classes) de solo lectura: al
+    indexar filas (view[10:74], view[indices]) devuelve el bloque denso
+    correspondiente, que es lo que necesita un bucle de entrenamiento
+    por mini-batches. La matriz completa nunca llega a existir.
+    """
+    
+    def __init__(self, labels, num_classes, dtype=np.float64):
+        # El tipo entero más pequeño que admite todas las clases
+        self.labels = np.asarray(labels).astype(np.min_scalar_type(max(num_classes - 1, 0)))
+        self.num_classes = int(num_classes)
+        self.dtype = np.dtype(dtype)
+    
+    @property
+    def shape(self):
+        return (len(self.labels), self.num_classes)
+    
+    @property
+    def nbytes(self):
+        return self.labels.nbytes
+    
+    def __len__(self):
+        return len(self.labels)
+    
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            rows, cols = key
+            return self[rows][..., cols]
+        if np.isscalar(key):
+            return one_hot_encode([self.labels[key]], self.num_classes, self.dtype)[0]
+        return one_hot_encode(self.labels[key], self.num_classes, self.dtype)
+    
+    def __array__(self, dtype=None, copy=None):
+        return self.toarray().astype(dtype or self.dtype, copy=False)
+    
+    def toarray(self):
+        """Materializa la matriz one-hot densa completa."""
+        return one_hot_encode(self.labels, self.num_classes, self.dtype)
+
+
 def decode_one_hot(y_one_hot):
-    """Convierte one-hot de vuelta a etiquetas."""
+    """
+    Convierte one-hot de vuelta a etiquetas.
+    
+    Acepta matrices densas de cualquier dtype, matrices dispersas de
+    scipy y OneHotView.
+    """
+    if isinstance(y_one_hot, OneHotView):
+        return y_one_hot.labels.astype(int)
+    
+    if hasattr(y_one_hot, 'tocsr'):
+        # Matriz dispersa de scipy: argmax devuelve una np.matrix (n, 1)
+        return np.asarray(y_one_hot.argmax(axis=1)).ravel()
+    
     return np.argmax(y_one_hot, axis=1)
 
 
+class OneHotEncoder:
+    """
+    Versión con fit/transform de one_hot_encode.
+    
+    Aprende el número de clases con los datos de entrenamiento, así que un
+    lote de test donde no aparece la última clase sigue produciendo el
+    mismo número de columnas. Permite usar el one-hot como un paso más
+    de un pipeline.
+    """
+    
+    def __init__(self, num_classes=None, dtype=np.float64, output='dense'):
+        self.num_classes = num_classes
+        self.dtype = dtype
+        self.output = output
+        self.num_classes_ = num_classes
+        self.is_fitted = num_classes is not None
+    
+    def fit(self, y):
+        """Aprende el número de clases (máxima etiqueta + 1)."""
+        self.num_classes_ = self.num_classes
+        self.is_fitted = self.num_classes is not None
+        return self.partial_fit(y)
+    
+    def partial_fit(self, y):
+        """Actualiza el número de clases con un nuevo bloque de etiquetas."""
+        if self.num_classes is None:
+            n = int(np.max(y)) + 1
+            self.num_classes_ = n if self.num_classes_ is None else max(self.num_classes_, n)
+        self.is_fitted = True
+        return self
+    
+    def transform(self, y):
+        """Aplica el one-hot encoding."""
+        if not self.is_fitted:
+            raise ValueError("Debes llamar a fit() primero")
+        return one_hot_encode(y, num_classes=self.num_classes_, dtype=self.dtype, output=self.output)
+    
+    def fit_transform(self, y):
+        """Fit y transform en un solo paso."""
+        return self.fit(y).transform(y)
+
+
 # ============================================================
 # PRUEBAS
 # ============================================================
@@ -240,3 +561,21 @@ if __name__ == "__main__":
     print(f"Etiquetas originales: {y}")
     print(f"One-hot:\n{y_one_hot}")
     print(f"Decodificado: {decode_one_hot(y_one_hot)}")
+    
+    y_big = np.random.randint(0, 10, size=60000)
+    dense = one_hot_encode(y_big)
+    compact = one_hot_encode(y_big, dtype=np.uint8)
+    lazy = one_hot_encode(y_big, output='lazy')
+    print(f"Memoria float64: {dense.nbytes / 1024:.0f} KB, "
+          f"uint8: {compact.nbytes / 1024:.0f} KB, lazy: {lazy.nbytes / 1024:.0f} KB")
+    print(f"Primer lote lazy:\n{lazy[:3]}")
+    
+    print("\n--- SimpleImputer ---")
+    X_nan = np.array([
+        [1.0, np.nan, 3.0],
+        [np.nan, 5.0, 6.0],
+        [7.0, 8.0, np.nan]
+    ])
+    imputer = SimpleImputer(strategy='mean').fit(X_nan)
+    print(f"Medias aprendidas: {imputer.statistics_}")
+    print(f"Imputado:\n{imputer.transform(X_nan)}")
@@ -0,0 +1,152 @@
+"""
+training_log.py - Registro de métricas durante el entrenamiento
+
+¿POR QUÉ UN REGISTRO APARTE DEL history?
+Un diccionario {'loss': [...]} solo está completo cuando termina el
+entrenamiento. Para entrenamientos largos queremos ver las métricas
+mientras ocurren, sin que registrarlas ralentice cada paso:
+1. Cada métrica vive en un buffer circular de tamaño fijo (memoria constante)
+2. Opcionalmente se añaden a un CSV que solo crece (se puede leer en vivo
+   desde otro proceso o recuperar si el entrenamiento se corta)
+3. Las escrituras a disco se agrupan: se vuelcan cada N valores o cada
+   pocos segundos, nunca en cada paso
+"""
+
+import csv
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Buffer circular de pares (paso, valor) con capacidad fija.
+
+    Cuando se llena, los valores nuevos sobrescriben a los más antiguos.
+    `total` cuenta todos los valores añadidos, así un lector sabe si hay
+    puntos nuevos desde la última vez que miró.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.steps = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.total = 0
+
+    def append(self, step, value):
+        i = self.total % self.capacity
+        self.steps[i] = step
+        self.values[i] = value
+        self.total += 1
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def data(self):
+        """Devuelve (pasos, valores) en orden cronológico."""
+        n = len(self)
+        if self.total <= self.capacity:
+            return self.steps[:n], self.values[:n]
+
+        start = self.total % self.capacity
+        order = np.r_[start:self.capacity, 0:start]
+        return self.steps[order], self.values[order]
+
+
+class MetricsRecorder:
+    """
+    Registra métricas por época o por batch.
+
+    Ejemplo:
+        recorder = MetricsRecorder(path='results/train_log.csv')
+        for epoch in range(epochs):
+            ...
+            recorder.log(epoch, loss=loss, accuracy=acc, val_loss=val_loss)
+        recorder.close()
+        plot_training_history(recorder.history())
+    """
+
+    def __init__(self, capacity=10000, path=None, flush_every=200, flush_interval=5.0):
+        """
+        Args:
+            capacity: Valores que se guardan en memoria por métrica
+            path: CSV opcional donde añadir cada valor (paso, métrica, valor)
+            flush_every: Valores pendientes que fuerzan una escritura
+            flush_interval: Segundos máximos entre escrituras
+        """
+        self.capacity = capacity
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self.buffers = defaultdict(lambda: RingBuffer(self.capacity))
+        self._pending = []
+        self._last_flush = time.perf_counter()
+        self._step = 0
+        self._file = None
+
+        if path is not None:
+            new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+            self._file = open(path, 'a', newline='')
+            self._writer = csv.writer(self._file)
+            if new_file:
+                self._writer.writerow(['step', 'metric', 'value'])
+
+    def log(self, step=None, **metrics):
+        """
+        Añade un valor por métrica.
+
+        Args:
+            step: Época o batch (por defecto, un contador interno)
+            **metrics: nombre=valor, por ejemplo loss=0.31, val_accuracy=0.92
+        """
+        if step is None:
+            step = self._step
+        self._step = step + 1
+
+        for name, value in metrics.items():
+            value = float(value)
+            self.buffers[name].append(step, value)
+            if self._file is not None:
+                self._pending.append((step, name, value))
+
+        if self._pending and (
+            len(self._pending) >= self.flush_every
+            or time.perf_counter() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """Escribe en el CSV los valores pendientes."""
+        if self._file is not None and self._pending:
+            self._writer.writerows(self._pending)
+            self._file.flush()
+            self._pending.clear()
+        self._last_flush = time.perf_counter()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def history(self):
+        """Devuelve {'métrica': array de valores} compatible con plot_training_history."""
+        return {name: buffer.data()[1].copy() for name, buffer in self.buffers.items()}
+
+    @staticmethod
+    def load(path):
+        """Lee un CSV escrito por MetricsRecorder y devuelve el history."""
+        history = defaultdict(list)
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                history[row['metric']].append(float(row['value']))
+        return {name: np.array(values) for name, values in history.items()}
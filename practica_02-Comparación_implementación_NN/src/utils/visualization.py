@@ -8,11 +8,16 @@ visualization.py - Visualización de datos y resultados
 4. Comunicar resultados
 """
 
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
 
 
-def plot_mnist_samples(X, y, n_samples=10, figsize=(15, 3)):
+def plot_mnist_samples(X, y, n_samples=10, figsize=(15, 3), gallery=False, n_cols=None):
     """
     Muestra ejemplos de dígitos MNIST.
     
@@ -20,7 +25,14 @@ def plot_mnist_samples(X, y, n_samples=10, figsize=(15, 3)):
         X: Imágenes (puede ser plano 784 o 28x28)
         y: Etiquetas
         n_samples: Número de ejemplos a mostrar
+        gallery: Si es True, todas las imágenes van en un único imshow
+                 (ver render_gallery); útil para cientos de ejemplos
+        n_cols: Columnas de la galería
     """
+    if gallery:
+        return render_gallery(X[:n_samples], n_cols=n_cols or n_samples,
+                              title='Ejemplos de MNIST', figsize=figsize)
+    
     fig, axes = plt.subplots(1, n_samples, figsize=figsize)
     
     for i, ax in enumerate(axes):
@@ -78,7 +90,176 @@ def plot_training_history(history, metrics=['loss', 'accuracy'], figsize=(12, 4)
     return fig
 
 
-def plot_confusion_matrix(y_true, y_pred, class_names=None, figsize=(8, 6)):
+class LiveHistoryPlot:
+    """
+    Gráfica de entrenamiento que se actualiza en vivo.
+    
+    Lee los puntos de un MetricsRecorder (src/utils/training_log.py) y
+    solo redibuja las líneas, sin rehacer la figura:
+    - Line2D.set_data cambia los datos de cada línea
+    - Blitting: se guarda el fondo (ejes, rejilla, etiquetas) una vez y en
+      cada actualización solo se pintan las líneas encima
+    - Throttling: update() no hace nada si no ha pasado min_interval desde
+      el último dibujo. Además el intervalo se ajusta a 100 × lo que tardó
+      el último dibujo, así dibujar cuesta < 1% del tiempo de entrenamiento
+    
+    Ejemplo:
+        live = LiveHistoryPlot(metrics=['loss', 'accuracy'])
+        for step in range(steps):
+            ...
+            recorder.log(step, loss=loss)
+            live.update(recorder)
+    """
+    
+    def __init__(self, metrics=('loss', 'accuracy'), min_interval=0.5, figsize=(12, 4)):
+        self.metrics = list(metrics)
+        self.min_interval = min_interval
+        self._interval = min_interval
+        self._last_draw = float('-inf')
+        self._background = None
+        self._seen = {}
+        
+        self.fig, axes = plt.subplots(1, len(self.metrics), figsize=figsize)
+        self.axes = np.atleast_1d(axes)
+        self.lines = {}
+        
+        for ax, metric in zip(self.axes, self.metrics):
+            for name, label in ((metric, f'Train {metric}'), (f'val_{metric}', f'Validation {metric}')):
+                line, = ax.plot([], [], label=label, animated=True)
+                self.lines[name] = (ax, line)
+            ax.set_xlabel('Paso')
+            ax.set_ylabel(metric.capitalize())
+            ax.set_title(f'{metric.capitalize()} durante entrenamiento')
+            ax.set_xlim(0, 1)
+            ax.set_ylim(0, 1)
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+        
+        self.fig.tight_layout()
+    
+    def _full_redraw(self):
+        """Redibuja toda la figura y guarda el fondo para el blitting."""
+        canvas = self.fig.canvas
+        canvas.draw()
+        self._background = canvas.copy_from_bbox(self.fig.bbox)
+    
+    def update(self, recorder, force=False):
+        """
+        Actualiza las líneas con los puntos nuevos del recorder.
+        
+        Returns:
+            True si se ha dibujado, False si se ha saltado por throttling
+        """
+        now = time.perf_counter()
+        if not force and now - self._last_draw < self._interval:
+            return False
+        
+        changed = False
+        needs_full_redraw = self._background is None
+        
+        for name, (ax, line) in self.lines.items():
+            buffer = recorder.buffers.get(name)
+            if buffer is None or self._seen.get(name) == buffer.total:
+                continue
+            
+            self._seen[name] = buffer.total
+            steps, values = buffer.data()
+            line.set_data(steps, values)
+            changed = True
+            
+            # Si los datos se salen de los ejes, se amplían con margen
+            # (duplicando) para que los redibujados completos sean raros
+            x_lo, x_hi = ax.get_xlim()
+            y_lo, y_hi = ax.get_ylim()
+            if steps[-1] > x_hi or steps[0] < x_lo:
+                ax.set_xlim(min(x_lo, steps[0]), max(2 * x_hi, steps[-1] + 1))
+                needs_full_redraw = True
+            v_min, v_max = np.nanmin(values), np.nanmax(values)
+            if v_min < y_lo or v_max > y_hi:
+                margin = 0.1 * max(v_max - v_min, 1e-12)
+                ax.set_ylim(min(y_lo, v_min - margin), max(y_hi, v_max + margin))
+                needs_full_redraw = True
+        
+        if not changed and not force:
+            self._last_draw = now
+            return False
+        
+        if needs_full_redraw:
+            self._full_redraw()
+        
+        canvas = self.fig.canvas
+        canvas.restore_region(self._background)
+        for ax, line in self.lines.values():
+            ax.draw_artist(line)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+        
+        self._last_draw = time.perf_counter()
+        self._interval = max(self.min_interval, 100 * (self._last_draw - now))
+        return True
+
+
+def confusion_matrix(y_true, y_pred, labels=None, out=None):
+    """
+    Calcula la matriz de confusión de forma vectorizada.
+    
+    Cada par (real, predicho) se convierte en un índice único
+    real * n_clases + predicho, y np.bincount cuenta todos los pares de una
+    vez. Coste O(n) en lugar de buscar la clase de cada muestra en un bucle.
+    
+    Para acumular por lotes (predicciones que no caben en memoria), pasa
+    las mismas `labels` en todas las llamadas y la matriz en `out`:
+    
+        matrix, classes = confusion_matrix(y1, p1, labels=range(10))
+        confusion_matrix(y2, p2, labels=classes, out=matrix)
+    
+    Args:
+        y_true: Etiquetas reales
+        y_pred: Etiquetas predichas
+        labels: Clases en el orden de filas/columnas. Por defecto, las que
+                aparecen en y_true o y_pred (ordenadas)
+        out: Matriz donde sumar los conteos (requiere labels)
+    
+    Returns:
+        (matrix, classes): matriz (n_clases, n_clases) y las clases
+    """
+    y_true = np.asarray(y_true).ravel()
+    y_pred = np.asarray(y_pred).ravel()
+    
+    if len(y_true) != len(y_pred):
+        raise ValueError("y_true e y_pred deben tener la misma longitud")
+    
+    if labels is None:
+        if out is not None:
+            raise ValueError("Para acumular en 'out' hay que fijar 'labels'")
+        classes, inverse = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+        true_idx, pred_idx = inverse[:len(y_true)], inverse[len(y_true):]
+    else:
+        classes = np.asarray(labels)
+        order = np.argsort(classes)
+        sorted_classes = classes[order]
+        
+        idx = []
+        for values in (y_true, y_pred):
+            pos = np.searchsorted(sorted_classes, values).clip(max=len(classes) - 1)
+            if not np.array_equal(sorted_classes[pos], values):
+                raise ValueError("Hay etiquetas que no están en 'labels'")
+            idx.append(order[pos])
+        true_idx, pred_idx = idx
+    
+    n_classes = len(classes)
+    counts = np.bincount(
+        true_idx * n_classes + pred_idx, minlength=n_classes * n_classes
+    ).reshape(n_classes, n_classes)
+    
+    if out is None:
+        return counts, classes
+    
+    out += counts
+    return out, classes
+
+
+def plot_confusion_matrix(y_true, y_pred, class_names=None, figsize=(8, 6), labels=None):
     """
     Grafica matriz de confusión.
     
@@ -91,19 +272,10 @@ def plot_confusion_matrix(y_true, y_pred, class_names=None, figsize=(8, 6)):
     Ejemplo para MNIST:
     Si muchos 4 se predicen como 9, hay algo parecido entre ellos.
     """
-    from collections import Counter
-    
     # Calcular matriz
-    classes = np.unique(np.concatenate([y_true, y_pred]))
+    matrix, classes = confusion_matrix(y_true, y_pred, labels=labels)
     n_classes = len(classes)
     
-    matrix = np.zeros((n_classes, n_classes), dtype=int)
-    
-    for true, pred in zip(y_true, y_pred):
-        true_idx = np.where(classes == true)[0][0]
-        pred_idx = np.where(classes == pred)[0][0]
-        matrix[true_idx, pred_idx] += 1
-    
     # Graficar
     fig, ax = plt.subplots(figsize=figsize)
     
@@ -133,29 +305,158 @@ def plot_confusion_matrix(y_true, y_pred, class_names=None, figsize=(8, 6)):
     return fig
 
 
-def plot_decision_regions(X, y, model, resolution=0.02, figsize=(10, 8)):
+# Modelo de cada proceso del pool (se envía una sola vez, en el initializer)
+_WORKER_MODEL = None
+
+
+def _init_predict_worker(model):
+    global _WORKER_MODEL
+    _WORKER_MODEL = model
+
+
+def _predict_in_worker(points):
+    return _WORKER_MODEL.predict(points)
+
+
+def predict_grid(model, xs, ys, mask=None, out=None, batch_size=65536, n_jobs=1, backend='thread'):
+    """
+    Predice el modelo sobre la malla xs × ys por lotes.
+    
+    Nunca se construye np.meshgrid completo: las coordenadas de cada lote
+    se calculan a partir de sus índices planos, así que la memoria extra
+    es O(batch_size) y no O(número de puntos).
+    
+    Args:
+        model: Objeto con predict(points)
+        xs, ys: Coordenadas 1D de la malla
+        mask: Array bool (len(ys), len(xs)) opcional; solo se predicen
+              los puntos True (el resto de `out` no se toca)
+        out: Array plano de tamaño len(ys) * len(xs) donde escribir
+        batch_size: Puntos por llamada a predict
+        n_jobs: Lotes en paralelo (1 = secuencial)
+        backend: 'thread' o 'process' (el modelo debe poder serializarse)
+    
+    Returns:
+        Array plano de tamaño len(ys) * len(xs) con las predicciones
+    """
+    nx = len(xs)
+    n_points = len(xs) * len(ys)
+    
+    if mask is None:
+        index_batches = (
+            np.arange(start, min(start + batch_size, n_points))
+            for start in range(0, n_points, batch_size)
+        )
+    else:
+        flat = np.flatnonzero(mask)
+        index_batches = (flat[start:start + batch_size] for start in range(0, len(flat), batch_size))
+    
+    def points_of(idx):
+        return np.column_stack([xs[idx % nx], ys[idx // nx]])
+    
+    def store(idx, pred):
+        nonlocal out
+        pred = np.asarray(pred).ravel()
+        if out is None:
+            out = np.zeros(n_points, dtype=pred.dtype)
+        out[idx] = pred
+    
+    if n_jobs == 1:
+        for idx in index_batches:
+            store(idx, model.predict(points_of(idx)))
+        return out
+    
+    if backend == 'process':
+        executor = ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_predict_worker, initargs=(model,)
+        )
+        predict = _predict_in_worker
+    elif backend == 'thread':
+        executor = ThreadPoolExecutor(max_workers=n_jobs)
+        predict = model.predict
+    else:
+        raise ValueError(f"Backend desconocido: {backend}")
+    
+    # Como mucho 2 lotes en vuelo por worker: la memoria no crece con la malla
+    with executor:
+        pending = deque()
+        for idx in index_batches:
+            pending.append((idx, executor.submit(predict, points_of(idx))))
+            if len(pending) >= 2 * n_jobs:
+                idx_done, future = pending.popleft()
+                store(idx_done, future.result())
+        for idx_done, future in pending:
+            store(idx_done, future.result())
+    
+    return out
+
+
+def _boundary_cells(Zc):
+    """Marca las celdas de la malla gruesa cuyas 4 esquinas no coinciden."""
+    diff = np.zeros(Zc.shape, dtype=bool)
+    horizontal = Zc[:, 1:] != Zc[:, :-1]
+    vertical = Zc[1:, :] != Zc[:-1, :]
+    diff[:, 1:] |= horizontal
+    diff[:, :-1] |= horizontal
+    diff[1:, :] |= vertical
+    diff[:-1, :] |= vertical
+    
+    d = np.pad(diff, ((0, 1), (0, 1)), mode='edge')
+    return d[:-1, :-1] | d[1:, :-1] | d[:-1, 1:] | d[1:, 1:]
+
+
+def plot_decision_regions(X, y, model, resolution=0.02, figsize=(10, 8),
+                          batch_size=65536, max_grid_points=4_000_000,
+                          adaptive=False, coarse_factor=8, n_jobs=1, backend='thread'):
     """
     Visualiza las regiones de decisión de un modelo 2D.
     
     Solo funciona con datos de 2 dimensiones.
     Útil para entender cómo el modelo separa las clases.
+    
+    ¿CÓMO SE LIMITA LA MEMORIA?
+    - La malla se predice por lotes de batch_size puntos (predict_grid)
+    - Si la malla supera max_grid_points, se aumenta el paso (resolution)
+    - adaptive=True predice primero una malla coarse_factor veces más
+      gruesa y solo refina las celdas donde cambia la clase: lejos de la
+      frontera todos los puntos tienen la misma predicción
+    - n_jobs > 1 reparte los lotes en hilos o procesos (backend)
     """
     x_min, x_max = X[:, 0].min() - 1, X[:, 0].max() + 1
     y_min, y_max = X[:, 1].min() - 1, X[:, 1].max() + 1
     
-    xx, yy = np.meshgrid(
-        np.arange(x_min, x_max, resolution),
-        np.arange(y_min, y_max, resolution)
-    )
+    n_points = ((x_max - x_min) / resolution) * ((y_max - y_min) / resolution)
+    if n_points > max_grid_points:
+        resolution *= np.sqrt(n_points / max_grid_points)
+        warnings.warn(f"Malla demasiado grande; resolution ajustada a {resolution:.4g}")
+    
+    xs = np.arange(x_min, x_max, resolution)
+    ys = np.arange(y_min, y_max, resolution)
+    options = dict(batch_size=batch_size, n_jobs=n_jobs, backend=backend)
     
     # Predecir para cada punto del grid
-    Z = model.predict(np.c_[xx.ravel(), yy.ravel()])
-    Z = Z.reshape(xx.shape)
+    if adaptive and coarse_factor > 1:
+        f = coarse_factor
+        Zc = predict_grid(model, xs[::f], ys[::f], **options)
+        Zc = Zc.reshape(len(ys[::f]), len(xs[::f]))
+        
+        iy = np.arange(len(ys)) // f
+        ix = np.arange(len(xs)) // f
+        # Contiguo en C para que Z.ravel() sea una vista y no una copia
+        Z = np.ascontiguousarray(Zc[np.ix_(iy, ix)])
+        
+        # Refinar solo las celdas de frontera (los nodos gruesos ya se conocen)
+        refine = _boundary_cells(Zc)[np.ix_(iy, ix)]
+        refine[::f, ::f] = False
+        predict_grid(model, xs, ys, mask=refine, out=Z.ravel(), **options)
+    else:
+        Z = predict_grid(model, xs, ys, **options)
+        Z = Z.reshape(len(ys), len(xs))
     
     fig, ax = plt.subplots(figsize=figsize)
     
     # Regiones
-    ax.contourf(xx, yy, Z, alpha=0.3, cmap='viridis')
+    ax.contourf(xs, ys, Z, alpha=0.3, cmap='viridis')
     
     # Puntos reales
     scatter = ax.scatter(X[:, 0], X[:, 1], c=y, cmap='viridis', edgecolor='black')
@@ -168,31 +469,63 @@ def plot_decision_regions(X, y, model, resolution=0.02, figsize=(10, 8)):
     return fig
 
 
-def plot_som_map(som, X, y=None, figsize=(10, 10)):
+def plot_som_map(som, X, y=None, figsize=(14, 6)):
     """
-    Visualiza un Self-Organizing Map entrenado.
+    Visualiza un Self-Organizing Map entrenado (src/custom/som.py).
     
     Muestra:
-    - La distribución de neuronas
-    - Qué datos activan cada neurona
+    - U-Matrix: distancia de cada neurona a sus vecinas. Las zonas
+      oscuras son grupos homogéneos; las claras, fronteras entre grupos
+    - Hit map: cuántas muestras activa cada neurona (qué datos activan
+      cada neurona). Si se pasa y, se escribe la clase mayoritaria
     """
-    fig, ax = plt.subplots(figsize=figsize)
+    fig, (ax_u, ax_hits) = plt.subplots(1, 2, figsize=figsize)
+    
+    im = ax_u.imshow(som.u_matrix(), cmap='bone_r')
+    fig.colorbar(im, ax=ax_u)
+    ax_u.set_title('U-Matrix')
+    
+    hits = som.hit_map(X)
+    im = ax_hits.imshow(hits, cmap='Blues')
+    fig.colorbar(im, ax=ax_hits)
+    ax_hits.set_title('Hit map' + (' (clase mayoritaria)' if y is not None else ''))
     
-    # Esto se completará cuando implementemos SOM
-    ax.text(0.5, 0.5, 'SOM Visualization\n(Coming soon)', 
-            ha='center', va='center', transform=ax.transAxes, fontsize=14)
+    if y is not None:
+        labels = som.label_map(X, y)
+        for (i, j), label in np.ndenumerate(labels):
+            if label >= 0:
+                color = 'white' if hits[i, j] > hits.max() / 2 else 'black'
+                ax_hits.text(j, i, str(label), ha='center', va='center', color=color, fontsize=8)
     
+    for ax in (ax_u, ax_hits):
+        ax.set_xticks([])
+        ax.set_yticks([])
+    
+    plt.suptitle(f'Self-Organizing Map ({som.rows}×{som.cols})', fontsize=14)
+    plt.tight_layout()
     return fig
 
 
-def plot_autoencoder_reconstruction(original, reconstructed, n_samples=10, figsize=(15, 3)):
+def plot_autoencoder_reconstruction(original, reconstructed, n_samples=10, figsize=(15, 3),
+                                    gallery=False):
     """
     Compara imágenes originales vs reconstruidas por autoencoder.
     
     ¿POR QUÉ ESTA VISUALIZACIÓN?
     Para ver qué tan bien el autoencoder captura la información esencial.
     Una buena reconstrucción significa que el código latente es informativo.
+    
+    Con gallery=True la fila de originales y la de reconstrucciones se
+    pintan como una sola imagen (ver render_gallery).
     """
+    if gallery:
+        images = np.concatenate([
+            _as_image_stack(original[:n_samples]),
+            _as_image_stack(reconstructed[:n_samples]),
+        ])
+        return render_gallery(images, n_cols=n_samples,
+                              title='Original vs Reconstruido (Autoencoder)', figsize=figsize)
+    
     fig, axes = plt.subplots(2, n_samples, figsize=figsize)
     
     for i in range(n_samples):
@@ -219,6 +552,160 @@ def plot_autoencoder_reconstruction(original, reconstructed, n_samples=10, figsi
     return fig
 
 
+def plot_benchmark_scaling(results, x='n_samples', metrics=('samples_per_sec', 'peak_rss_mb', 'accuracy'),
+                           figsize=(15, 4)):
+    """
+    Curvas de escalado de un benchmark (ver src/benchmark.py).
+    
+    Una línea por modelo (propio vs librería) y un gráfico por métrica.
+    Las ejecuciones con varios números de hilos se separan en líneas
+    distintas si x no es 'threads'.
+    
+    Args:
+        results: Lista de dicts devuelta por run_benchmark
+        x: Eje horizontal ('n_samples' o 'threads')
+        metrics: Columnas a graficar
+    """
+    fig, axes = plt.subplots(1, len(metrics), figsize=figsize)
+    axes = np.atleast_1d(axes)
+    
+    def series_key(row):
+        key = f"{row['model']} ({row['family']})"
+        if x != 'threads' and row.get('threads'):
+            key += f" {row['threads']} hilos"
+        return key
+    
+    series = {}
+    for row in results:
+        series.setdefault(series_key(row), []).append(row)
+    
+    for ax, metric in zip(axes, metrics):
+        for key, rows in series.items():
+            rows = sorted(rows, key=lambda r: r[x])
+            linestyle = '-' if 'custom' in key else '--'
+            ax.plot([r[x] for r in rows], [r[metric] for r in rows], marker='o',
+                    linestyle=linestyle, label=key)
+        ax.set_xlabel(x)
+        ax.set_ylabel(metric)
+        ax.set_title(metric)
+        ax.grid(True, alpha=0.3)
+        if x == 'n_samples':
+            ax.set_xscale('log')
+    
+    axes[0].legend(fontsize=8)
+    plt.suptitle('Propio vs librería: escalado', fontsize=14)
+    plt.tight_layout()
+    return fig
+
+
+def _as_image_stack(images, image_shape=(28, 28)):
+    """Convierte (n, 784) o (n, 28, 28) en un array (n, alto, ancho)."""
+    images = np.asarray(images)
+    if images.ndim == 2:
+        images = images.reshape((len(images),) + tuple(image_shape))
+    return images
+
+
+def tile_images(images, n_cols=None, pad=1, pad_value=0, image_shape=(28, 28)):
+    """
+    Junta muchas imágenes en un único array (mosaico).
+    
+    Sin bucles: las imágenes se colocan en una rejilla (filas, columnas) con
+    reshape/transpose, así que cuesta lo mismo que copiar los píxeles.
+    
+    Args:
+        images: Array (n, 784) o (n, alto, ancho)
+        n_cols: Columnas del mosaico (por defecto, el más cuadrado posible)
+        pad: Píxeles de separación entre imágenes
+        pad_value: Valor de la separación
+    
+    Returns:
+        Array 2D listo para un solo imshow
+    """
+    images = _as_image_stack(images, image_shape)
+    n, h, w = images.shape
+    n_cols = n_cols or int(np.ceil(np.sqrt(n)))
+    n_rows = int(np.ceil(n / n_cols))
+    
+    grid = np.full((n_rows * n_cols, h + pad, w + pad), pad_value, dtype=images.dtype)
+    grid[:n, :h, :w] = images
+    
+    tiled = grid.reshape(n_rows, n_cols, h + pad, w + pad).transpose(0, 2, 1, 3)
+    tiled = tiled.reshape(n_rows * (h + pad), n_cols * (w + pad))
+    
+    # Quitar la separación sobrante del borde derecho/inferior
+    return tiled[:tiled.shape[0] - pad, :tiled.shape[1] - pad] if pad else tiled
+
+
+def render_gallery(images, path=None, n_cols=None, title=None, figsize=None,
+                   cmap='gray', dpi=100, pad=1):
+    """
+    Dibuja una galería de imágenes con un único imshow.
+    
+    ¿POR QUÉ ASÍ?
+    Un Axes con su propio imshow, título y axis('off') por imagen es lento
+    cuando hay cientos. Aquí el mosaico se construye con NumPy (tile_images)
+    y se dibuja una sola vez.
+    
+    La figura se crea con matplotlib.figure.Figure y el canvas Agg, sin
+    pasar por pyplot: no depende del backend interactivo ni deja figuras
+    abiertas, así que es seguro en servidores y en procesos paralelos.
+    
+    Args:
+        images: Array (n, 784) o (n, alto, ancho)
+        path: Si se indica, guarda la figura en ese fichero
+        n_cols: Columnas del mosaico
+        title: Título opcional
+    
+    Returns:
+        Figure de matplotlib
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    
+    tiled = tile_images(images, n_cols=n_cols, pad=pad)
+    if figsize is None:
+        # Un píxel del mosaico ≈ un píxel de la imagen final (mínimo 2")
+        figsize = (max(tiled.shape[1] / dpi, 2), max(tiled.shape[0] / dpi, 2))
+    
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 0.93 if title else 1])
+    ax.imshow(tiled, cmap=cmap, interpolation='nearest')
+    ax.axis('off')
+    if title:
+        fig.suptitle(title, fontsize=14)
+    
+    if path is not None:
+        fig.savefig(path, dpi=dpi)
+    
+    return fig
+
+
+def _render_gallery_job(job):
+    render_gallery(**job)
+    return job['path']
+
+
+def export_galleries(jobs, n_workers=None):
+    """
+    Exporta muchas galerías en paralelo, una por proceso.
+    
+    Dibujar con Agg es CPU puro y mantiene el GIL, así que se usan
+    procesos en lugar de hilos.
+    
+    Args:
+        jobs: Lista de diccionarios con los argumentos de render_gallery
+              (al menos 'images' y 'path')
+        n_workers: Procesos (None = número de CPUs)
+    
+    Returns:
+        Lista de rutas escritas
+    """
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(_render_gallery_job, jobs))
+
+
 # ============================================================
 # PRUEBAS
 # ============================================================
@@ -243,3 +730,16 @@ if __name__ == "__main__":
     plt.savefig('results/training_history_example.png', dpi=100, bbox_inches='tight')
     print("✓ Gráfico de ejemplo guardado en results/training_history_example.png")
     plt.close()
+    
+    # Galerías: 4 paneles de 400 imágenes cada uno, en paralelo
+    jobs = [
+        {
+            'images': np.random.rand(400, 28, 28),
+            'path': f'results/gallery_example_{i}.png',
+            'n_cols': 20,
+            'title': f'Galería {i}',
+        }
+        for i in range(4)
+    ]
+    for path in export_galleries(jobs):
+        print(f"✓ Galería guardada en {path}")
@@ -0,0 +1,15 @@
+"""
+conftest.py - Configuración común de las pruebas
+
+Las pruebas importan el código como `src....`, igual que la aplicación
+de consola, así que la raíz de la práctica tiene que estar en sys.path.
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT_DIR, 'tests', 'fixtures')
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
@@ -0,0 +1,263 @@
+"""
+test_data_loader.py - Pruebas de la caché .npy + memmap de data_loader.py
+
+Sin red ni datos reales: se usa un CSV meteorológico pequeño
+(fixtures/weather_small.csv) copiado a un directorio temporal, y un
+parquet de MNIST de pocas imágenes generado en la propia prueba.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from conftest import FIXTURES_DIR
+from src.utils import data_loader
+from src.utils.data_loader import iter_minibatches, load_cached, load_mnist, load_weather
+
+
+@pytest.fixture
+def weather_csv(tmp_path):
+    """Copia del CSV de prueba: las pruebas pueden modificarlo."""
+    path = tmp_path / 'raw' / 'weather.csv'
+    path.parent.mkdir()
+    shutil.copy(os.path.join(FIXTURES_DIR, 'weather_small.csv'), path)
+    return str(path)
+
+
+@pytest.fixture
+def processed_dir(tmp_path):
+    return str(tmp_path / 'processed')
+
+
+@pytest.fixture
+def counting_builder():
+    """_build_weather que cuenta cuántas veces se reconstruye la caché."""
+    calls = []
+
+    def builder(source_path):
+        calls.append(source_path)
+        return data_loader._build_weather(source_path)
+
+    builder.calls = calls
+    return builder
+
+
+def _read_manifest(processed_dir, name='weather'):
+    with open(os.path.join(processed_dir, f'{name}.json')) as f:
+        return json.load(f)
+
+
+# ============================================================
+# CONSTRUCCIÓN DE LA CACHÉ
+# ============================================================
+def test_build_cache_writes_npy_and_manifest(weather_csv, processed_dir):
+    X, columns = load_weather(raw_path=weather_csv, processed_dir=processed_dir)
+
+    assert columns == ['T2M', 'PRECTOT', 'RH2M']
+    assert X.shape == (8, 3)
+    assert X.dtype == np.float32
+    assert np.isnan(X[1, 1]) and np.isnan(X[5, 2])
+    np.testing.assert_allclose(X[0], [14.2, 0.5, 81.3], rtol=1e-6)
+
+    manifest = _read_manifest(processed_dir)
+    assert manifest['version'] == data_loader.CACHE_VERSION
+    assert manifest['source']['sha256'] == data_loader._sha256(weather_csv)
+    assert manifest['meta']['dropped_columns'] == ['date', 'city']
+
+    info = manifest['files']['X']
+    path = os.path.join(processed_dir, info['file'])
+    assert os.path.exists(path)
+    assert info['sha256'] == data_loader._sha256(path)
+    assert info['shape'] == [8, 3] and info['dtype'] == 'float32'
+
+
+def test_reload_is_memmap_and_does_not_rebuild(weather_csv, processed_dir, counting_builder):
+    first = load_cached('weather', weather_csv, counting_builder, processed_dir)
+    second = load_cached('weather', weather_csv, counting_builder, processed_dir)
+
+    assert len(counting_builder.calls) == 1
+    assert isinstance(second['X'], np.memmap)
+    assert not second['X'].flags.writeable
+    np.testing.assert_array_equal(first['X'], second['X'])
+    assert second['meta']['columns'] == ['T2M', 'PRECTOT', 'RH2M']
+
+
+def test_cache_is_used_without_source(weather_csv, processed_dir, counting_builder):
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+    os.remove(weather_csv)
+
+    data = load_cached('weather', weather_csv, counting_builder, processed_dir)
+
+    assert len(counting_builder.calls) == 1
+    assert data['X'].shape == (8, 3)
+
+
+def test_no_cache_and_no_source_raises(tmp_path, processed_dir):
+    with pytest.raises(FileNotFoundError):
+        load_weather(raw_path=str(tmp_path / 'missing.csv'), processed_dir=processed_dir)
+
+
+def test_force_rebuilds(weather_csv, processed_dir, counting_builder):
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+    load_cached('weather', weather_csv, counting_builder, processed_dir, force=True)
+
+    assert len(counting_builder.calls) == 2
+
+
+# ============================================================
+# INVALIDACIÓN (MANIFIESTO + SHA256)
+# ============================================================
+def test_changed_source_invalidates_cache(weather_csv, processed_dir, counting_builder):
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+
+    with open(weather_csv, 'a') as f:
+        f.write("2020-01-03,Quito,12.9,1.5,87.0\n")
+    data = load_cached('weather', weather_csv, counting_builder, processed_dir)
+
+    assert len(counting_builder.calls) == 2
+    assert data['X'].shape == (9, 3)
+    assert _read_manifest(processed_dir)['source']['sha256'] == data_loader._sha256(weather_csv)
+
+
+def test_same_size_edit_is_detected_by_sha256(weather_csv, processed_dir, counting_builder):
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+
+    # Mismo tamaño y otra fecha: el sha256 decide si el contenido cambió
+    stat = os.stat(weather_csv)
+    with open(weather_csv) as f:
+        content = f.read()
+    with open(weather_csv, 'w') as f:
+        f.write(content.replace('14.2', '99.9'))
+    os.utime(weather_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    data = load_cached('weather', weather_csv, counting_builder, processed_dir)
+
+    assert len(counting_builder.calls) == 2
+    np.testing.assert_allclose(data['X'][0, 0], 99.9, rtol=1e-6)
+
+
+def test_touched_source_with_same_content_keeps_cache(weather_csv, processed_dir, counting_builder):
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+    stat = os.stat(weather_csv)
+    os.utime(weather_csv, (stat.st_atime + 100, stat.st_mtime + 100))
+
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+
+    assert len(counting_builder.calls) == 1
+    # La fecha nueva queda en el manifiesto: la próxima vez no se recalcula el sha256
+    assert _read_manifest(processed_dir)['source']['mtime'] == os.stat(weather_csv).st_mtime
+
+
+def test_missing_npy_rebuilds(weather_csv, processed_dir, counting_builder):
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+    os.remove(os.path.join(processed_dir, 'weather_X.npy'))
+
+    data = load_cached('weather', weather_csv, counting_builder, processed_dir)
+
+    assert len(counting_builder.calls) == 2
+    assert data['X'].shape == (8, 3)
+
+
+def test_verify_detects_corrupted_npy(weather_csv, processed_dir, counting_builder):
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+    path = os.path.join(processed_dir, 'weather_X.npy')
+    with open(path, 'r+b') as f:
+        f.seek(-4, os.SEEK_END)
+        f.write(b'\x00\x00\x00\x00')
+
+    # Sin verify la caché se da por buena; con verify se reconstruye
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+    assert len(counting_builder.calls) == 1
+    data = load_cached('weather', weather_csv, counting_builder, processed_dir, verify=True)
+    assert len(counting_builder.calls) == 2
+    np.testing.assert_allclose(data['X'][-1], [12.3, 4.0, 90.2], rtol=1e-6)
+
+
+def test_cache_version_change_rebuilds(weather_csv, processed_dir, counting_builder, monkeypatch):
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+    monkeypatch.setattr(data_loader, 'CACHE_VERSION', data_loader.CACHE_VERSION + 1)
+
+    load_cached('weather', weather_csv, counting_builder, processed_dir)
+
+    assert len(counting_builder.calls) == 2
+
+
+# ============================================================
+# MNIST (parquet con imágenes PNG)
+# ============================================================
+def test_load_mnist_from_small_parquet(tmp_path, processed_dir):
+    pd = pytest.importorskip('pandas')
+    Image = pytest.importorskip('PIL.Image')
+    pytest.importorskip('pyarrow')
+    import io
+
+    rng = np.random.default_rng(0)
+    images = rng.integers(0, 256, size=(5, 28, 28), dtype=np.uint8)
+    rows = []
+    for image in images:
+        buffer = io.BytesIO()
+        Image.fromarray(image).save(buffer, format='PNG')
+        rows.append({'bytes': buffer.getvalue(), 'path': None})
+    raw_path = tmp_path / 'mnist.parquet'
+    pd.DataFrame({'image': rows, 'label': [3, 1, 4, 1, 5]}).to_parquet(raw_path)
+
+    X, y = load_mnist(raw_path=str(raw_path), processed_dir=processed_dir, download=False)
+
+    assert X.shape == (5, 784) and X.dtype == np.uint8
+    assert isinstance(X, np.memmap)
+    np.testing.assert_array_equal(X, images.reshape(5, -1))
+    np.testing.assert_array_equal(y, [3, 1, 4, 1, 5])
+
+
+# ============================================================
+# MINI-BATCHES
+# ============================================================
+def test_iter_minibatches_covers_every_row_once():
+    X = np.arange(103 * 2).reshape(103, 2)
+    y = np.arange(103)
+
+    batches = list(iter_minibatches(X, y, batch_size=10, shuffle=True, rng=0))
+
+    assert [len(xb) for xb, _ in batches] == [10] * 10 + [3]
+    seen = np.concatenate([yb for _, yb in batches])
+    np.testing.assert_array_equal(np.sort(seen), y)
+    for xb, yb in batches:
+        # X e y siguen alineados y cada batch está ordenado (lectura secuencial)
+        np.testing.assert_array_equal(xb[:, 0], yb * 2)
+        assert np.all(np.diff(yb) > 0)
+
+
+def test_iter_minibatches_shuffle_is_seeded():
+    X = np.arange(100)
+
+    order_a = np.concatenate(list(iter_minibatches(X, batch_size=10, rng=1)))
+    order_b = np.concatenate(list(iter_minibatches(X, batch_size=10, rng=1)))
+    order_c = np.concatenate(list(iter_minibatches(X, batch_size=10, rng=2)))
+
+    np.testing.assert_array_equal(order_a, order_b)
+    assert not np.array_equal(order_a, order_c)
+    # Barajado: el primer batch no son las 10 primeras filas
+    assert not np.array_equal(order_a[:10], np.arange(10))
+
+
+def test_iter_minibatches_without_shuffle_and_drop_last():
+    X = np.arange(25)
+
+    batches = list(iter_minibatches(X, batch_size=10, shuffle=False, drop_last=True))
+
+    assert len(batches) == 2
+    np.testing.assert_array_equal(np.concatenate(batches), np.arange(20))
+
+
+def test_iter_minibatches_over_memmap(weather_csv, processed_dir):
+    X, _ = load_weather(raw_path=weather_csv, processed_dir=processed_dir)
+
+    batches = list(iter_minibatches(X, batch_size=3, rng=0))
+
+    assert sum(len(b) for b in batches) == len(X)
+    # Cada batch es una copia en RAM, no una vista del fichero
+    assert not any(np.may_share_memory(b, X) for b in batches)
+    np.testing.assert_array_equal(np.sort(np.concatenate(batches)[:, 0]), np.sort(X[:, 0]))
@@ -1,67 +1,190 @@
-import requests
 import datetime
+import logging
 import os
+import requests
 from dotenv import load_dotenv
 
+from clu_cache import CacheCLU
+from clu_client import CLUClient, ErrorCLU, extraer_prediccion
+from date_parser import formatear_fecha, parsear_fecha
+from intent_classifier import IntentClassifier, extraer_entidades, registrar_frase
+from order_store import AlmacenPedidos
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # 1. Configuración de la API
 # Configura las variables de entorno: AZURE_ENDPOINT, AZURE_API_KEY en un archivo .env
 ENDPOINT = os.getenv("AZURE_ENDPOINT", "https://your-resource.cognitiveservices.azure.com/language/:analyze-conversations?api-version=2024-11-15-preview")
 API_KEY = os.getenv("AZURE_API_KEY", "your-api-key-here")
-HEADERS = {"Ocp-Apim-Subscription-Key": API_KEY}
 PROJECT_NAME = "RestauranteTakeAway"
 DEPLOYMENT_NAME = "v1" 
 
+# Caché de respuestas de CLU: CLU_CACHE_DB para guardarla en disco (SQLite)
+CACHE_TTL = int(os.getenv("CLU_CACHE_TTL", "3600"))
+CACHE_DB = os.getenv("CLU_CACHE_DB")
+
+# 2. Modelo local de intenciones (intent_classifier.py)
+# - Si está seguro (confianza >= BOT_UMBRAL_LOCAL) responde sin llamar a CLU
+# - BOT_OFFLINE=1: no se llama nunca a CLU
+# - Las respuestas de CLU se registran para reentrenarlo (python intent_classifier.py)
+MODO_OFFLINE = os.getenv("BOT_OFFLINE", "0") == "1"
+UMBRAL_LOCAL = float(os.getenv("BOT_UMBRAL_LOCAL", "0.6"))
+MODELO_LOCAL = os.path.join(BASE_DIR, "models", "intenciones.pkl")
+REGISTRO_FRASES = os.getenv("BOT_REGISTRO_FRASES", os.path.join(BASE_DIR, "data", "frases_clu.jsonl"))
+
+# Entidades sin las que el modelo local no basta (las busca CLU)
+ENTIDADES_NECESARIAS = {"RealizarPedido": ["plato", "cliente", "direccion", "FechaEntrega"]}
+
+# 3. Reglas del restaurante y pedidos en memoria (order_store.py)
+MAX_ANTELACION_PEDIDO = datetime.timedelta(hours=48)
+MIN_ANTELACION_CANCELACION = datetime.timedelta(hours=24)
+PEDIDOS = AlmacenPedidos()
+
+# Un único cliente para todo el bot: reutiliza las conexiones con Azure
+_cliente = None
+_clasificador = None
+
+def obtener_cliente():
+    global _cliente
+    if _cliente is None:
+        cache = CacheCLU(ttl=CACHE_TTL, ruta_sqlite=CACHE_DB)
+        _cliente = CLUClient(ENDPOINT, API_KEY, PROJECT_NAME, DEPLOYMENT_NAME, cache=cache)
+    return _cliente
+
+def obtener_clasificador():
+    global _clasificador
+    if _clasificador is None:
+        _clasificador = IntentClassifier(umbral=UMBRAL_LOCAL, model_path=MODELO_LOCAL)
+        if not _clasificador.is_fitted:
+            # Sin modelo guardado: se entrena al vuelo (frases semilla + registro)
+            _clasificador.entrenar(ruta_registro=REGISTRO_FRASES)
+    return _clasificador
+
+def basta_modelo_local(intent, confianza, entities):
+    if MODO_OFFLINE:
+        return True
+    if not obtener_clasificador().es_seguro(confianza):
+        return False
+    return all(e in entities for e in ENTIDADES_NECESARIAS.get(intent, []))
+
+def analizar_mensajes(textos_usuario, max_concurrencia=8):
+    """
+    Intención y entidades de cada mensaje: [(intent, entities, origen), ...]
+    origen es "local", "clu" o "fallback" (CLU falló y se usó el modelo local).
+    """
+    clasificador = obtener_clasificador()
+    resultados = []
+    dudosos = []
+    for i, texto in enumerate(textos_usuario):
+        intent, confianza = clasificador.predecir(texto)
+        entities = extraer_entidades(texto)
+        resultados.append((intent, entities, "local"))
+        if not basta_modelo_local(intent, confianza, entities):
+            dudosos.append(i)
+
+    if not dudosos:
+        return resultados
+
+    # Llamada a la API de Azure CLU solo para los mensajes dudosos
+    responses = obtener_cliente().analizar_lote(
+        [textos_usuario[i] for i in dudosos], max_concurrencia=max_concurrencia,
+        devolver_excepciones=True
+    )
+    for i, response in zip(dudosos, responses):
+        try:
+            if isinstance(response, Exception):
+                raise response
+            intent, entities = extraer_prediccion(response)
+        except (requests.RequestException, ErrorCLU) as e:
+            # CLU no disponible: se queda la predicción local
+            logger.warning("CLU no disponible, se usa el modelo local: %s", e)
+            intent, entities, _ = resultados[i]
+            resultados[i] = (intent, entities, "fallback")
+            continue
+        registrar_frase(REGISTRO_FRASES, textos_usuario[i], intent)
+        resultados[i] = (intent, entities, "clu")
+
+    return resultados
+
 def procesar_mensaje_restaurante(texto_usuario):
-    # Llamada a la API de Azure CLU
-    payload = {
-        "kind": "Conversation",
-        "analysisInput": {
-            "conversationItem": {
-                "id": "1",
-                "text": texto_usuario,
-                "participantId": "user1"
-            }
-        },
-        "parameters": {
-            "projectName": PROJECT_NAME,
-            "deploymentName": DEPLOYMENT_NAME
-        }
-    }
-
-    response = requests.post(ENDPOINT, headers=HEADERS, json=payload).json()
-    prediction = response["result"]["prediction"]
-    
-    intent = prediction["topIntent"]
-    # Convertimos la lista de entidades en un diccionario para fácil acceso
-    entities = {e["category"]: e["text"] for e in prediction["entities"]}
-    
+    intent, entities, _ = analizar_mensajes([texto_usuario])[0]
     return validar_y_responder(intent, entities)
 
-def validar_y_responder(intent, entities):
-    ahora = datetime.datetime.now()
+def procesar_mensajes_restaurante(textos_usuario, max_concurrencia=8):
+    # Varios mensajes a la vez (p. ej. una cola de mensajes pendientes)
+    return [validar_y_responder(intent, entities)
+            for intent, entities, _ in analizar_mensajes(textos_usuario, max_concurrencia)]
+
+def validar_y_responder(intent, entities, ahora=None):
+    ahora = ahora or datetime.datetime.now()
+    cliente = entities.get("cliente")
     
-    # Extraer y validar fecha si existe (Simulación de parseo de fecha)
-    fecha_entrega_str = entities.get("FechaEntrega")
+    # Extraer y validar fecha si existe ("22 de enero a las 14:00", "mañana"...)
+    fecha_entrega = parsear_fecha(entities.get("FechaEntrega"), ahora)
     
     if intent == "RealizarPedido":
+        if not entities.get("plato"):
+            return "¿Qué plato quieres pedir?"
+        if not cliente:
+            return "¿A nombre de quién hacemos el pedido?"
+        if not entities.get("direccion"):
+            return "¿A qué dirección enviamos el pedido?"
+
         # REGLA: Pedidos con hasta 48 horas de antelación
-        # (Aquí se compararía la fecha de la entidad con 'ahora')
-        return f"¡Pedido recibido para {entities.get('cliente')}! Enviaremos su {entities.get('plato')} a {entities.get('direccion')}. (Validado: menos de 48h)."
+        if fecha_entrega is None:
+            return "¿Para qué día y hora quieres el pedido?"
+        if fecha_entrega <= ahora:
+            return f"El {formatear_fecha(fecha_entrega)} ya ha pasado. ¿Para cuándo quieres el pedido?"
+        if fecha_entrega - ahora > MAX_ANTELACION_PEDIDO:
+            return (f"Solo aceptamos pedidos con hasta 48 horas de antelación "
+                    f"y el {formatear_fecha(fecha_entrega)} queda más lejos.")
+
+        pedido = PEDIDOS.crear(cliente, entities.get("plato"), entities.get("direccion"), fecha_entrega)
+        return (f"¡Pedido recibido para {pedido.cliente}! Enviaremos su {pedido.plato} a {pedido.direccion} "
+                f"el {formatear_fecha(pedido.entrega)}. (Validado: menos de 48h).")
 
     elif intent == "CancelarPedido":
         # REGLA: Cancelación permitida con al menos 24 horas de antelación
-        return "Pedido cancelado con éxito. (Validado: faltan más de 24h para la entrega)."
+        if not cliente:
+            return "¿A nombre de quién está el pedido que quieres cancelar?"
+
+        pedido = buscar_pedido(cliente, fecha_entrega, ahora)
+        if pedido is None:
+            return f"No encuentro ningún pedido pendiente a nombre de {cliente}."
+        if pedido.entrega - ahora < MIN_ANTELACION_CANCELACION:
+            return (f"No se puede cancelar el pedido del {formatear_fecha(pedido.entrega)}: "
+                    f"faltan menos de 24h para la entrega.")
+
+        PEDIDOS.cancelar(pedido.id)
+        return (f"Pedido de {pedido.plato} del {formatear_fecha(pedido.entrega)} cancelado con éxito. "
+                f"(Validado: faltan más de 24h para la entrega).")
 
     elif intent == "PedirRecomendacion":
         return "Hoy te recomendamos nuestra Paella Valenciana, ¡es la especialidad del chef!"
 
     elif intent == "ConsultarEstado":
-        return "Tu pedido está siendo preparado y llegará a la hora acordada."
+        if not cliente:
+            return "Tu pedido está siendo preparado y llegará a la hora acordada."
+        pedido = buscar_pedido(cliente, fecha_entrega, ahora)
+        if pedido is None:
+            return f"No encuentro ningún pedido pendiente a nombre de {cliente}."
+        return f"Tu pedido de {pedido.plato} está confirmado para el {formatear_fecha(pedido.entrega)}."
 
     return "Lo siento, no he entendido tu solicitud. ¿Deseas realizar un pedido?"
 
+def buscar_pedido(cliente, fecha_entrega, ahora):
+    # Con fecha: el pedido pendiente de ese día. Sin fecha: el próximo
+    if fecha_entrega is None:
+        return PEDIDOS.proximo_pedido(cliente, ahora)
+    inicio_dia = datetime.datetime.combine(fecha_entrega.date(), datetime.time.min)
+    pedidos = PEDIDOS.pedidos_cliente(cliente, desde=max(inicio_dia, ahora),
+                                      hasta=inicio_dia + datetime.timedelta(days=1))
+    return pedidos[0] if pedidos else None
+
 # Ejemplo de uso:
 # print(procesar_mensaje_restaurante("Quiero una paella para mañana, soy Sergio"))
 
@@ -0,0 +1,170 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# Caché de respuestas de CLU.
+#
+# Muchos mensajes del restaurante se repiten ("quiero una paella", "estado
+# de mi pedido"). Si la respuesta de CLU para ese texto ya se conoce, no hace
+# falta volver a llamar a Azure: se ahorra la latencia y el coste por petición.
+#
+# - Clave: texto normalizado + proyecto + despliegue. Al cambiar de
+#   despliegue (v1 → v2) las respuestas antiguas dejan de usarse.
+# - TTL: cada respuesta caduca a los `ttl` segundos (por si se reentrena el modelo).
+# - LRU: con más de `max_entradas`, se descarta la usada hace más tiempo.
+#   OrderedDict mantiene el orden de uso: move_to_end al leer, popitem(last=False)
+#   para expulsar la más antigua, ambas O(1).
+# - Persistencia opcional en SQLite: la caché sobrevive a reinicios del bot.
+
+_PUNTUACION = re.compile(r"[^\w\s]")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar_texto(texto):
+    """
+    "¡Quiero  una PAELLA!" y "quiero una paella" dan la misma clave:
+    minúsculas, sin tildes, sin signos de puntuación y con espacios simples.
+    """
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    texto = _PUNTUACION.sub(" ", texto)
+    return _ESPACIOS.sub(" ", texto).strip()
+
+
+def crear_clave(texto, proyecto, despliegue):
+    return f"{proyecto}|{despliegue}|{normalizar_texto(texto)}"
+
+
+class CacheCLU:
+    def __init__(self, max_entradas=1000, ttl=3600, ruta_sqlite=None):
+        """
+        max_entradas: tamaño máximo en memoria (LRU)
+        ttl: segundos que vale una respuesta (None = no caduca)
+        ruta_sqlite: fichero para persistir la caché (None = solo memoria)
+        """
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # clave -> (caduca_en, respuesta)
+        # Los lotes del cliente usan varios hilos a la vez
+        self._lock = threading.Lock()
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.caducados = 0
+        self.expulsados = 0
+
+        self._db = None
+        if ruta_sqlite:
+            self._db = sqlite3.connect(ruta_sqlite, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(clave TEXT PRIMARY KEY, caduca_en REAL, respuesta TEXT)"
+            )
+            self._db.execute("DELETE FROM cache WHERE caduca_en < ?", (time.time(),))
+            self._db.commit()
+
+    def obtener(self, clave):
+        """Respuesta guardada para la clave, o None si no está o ha caducado."""
+        ahora = time.time()
+        with self._lock:
+            entrada = self._entradas.get(clave)
+
+            if entrada is None and self._db is not None:
+                fila = self._db.execute(
+                    "SELECT caduca_en, respuesta FROM cache WHERE clave = ?", (clave,)
+                ).fetchone()
+                if fila is not None:
+                    entrada = (fila[0], json.loads(fila[1]))
+                    self._guardar_en_memoria(clave, entrada)
+
+            if entrada is not None and entrada[0] < ahora:
+                self.caducados += 1
+                self._borrar(clave)
+                entrada = None
+
+            if entrada is None:
+                self.fallos += 1
+                return None
+
+            self.aciertos += 1
+            self._entradas.move_to_end(clave)
+            return entrada[1]
+
+    def guardar(self, clave, respuesta):
+        caduca_en = time.time() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._guardar_en_memoria(clave, (caduca_en, respuesta))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                    (clave, caduca_en, json.dumps(respuesta))
+                )
+                self._db.commit()
+
+    def _guardar_en_memoria(self, clave, entrada):
+        self._entradas[clave] = entrada
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+            self.expulsados += 1
+
+    def _borrar(self, clave):
+        self._entradas.pop(clave, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM cache WHERE clave = ?", (clave,))
+            self._db.commit()
+
+    def vaciar(self):
+        with self._lock:
+            self._entradas.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+                self._db.commit()
+
+    def tasa_aciertos(self):
+        consultas = self.aciertos + self.fallos
+        return self.aciertos / consultas if consultas else 0.0
+
+    def metricas(self):
+        return {
+            "entradas": len(self._entradas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "caducados": self.caducados,
+            "expulsados": self.expulsados,
+            "tasa_aciertos": self.tasa_aciertos(),
+        }
+
+    def cerrar(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    print("\n--- PRUEBA CACHÉ CLU ---")
+    print(normalizar_texto("¡Quiero  una PAELLA, por favor!"))
+
+    ruta = os.path.join(tempfile.mkdtemp(), "cache_clu.sqlite")
+    cache = CacheCLU(max_entradas=2, ttl=60, ruta_sqlite=ruta)
+    for texto in ["Quiero una paella", "¿Estado de mi pedido?", "quiero una PAELLA"]:
+        clave = crear_clave(texto, "RestauranteTakeAway", "v1")
+        if cache.obtener(clave) is None:
+            cache.guardar(clave, {"result": {"query": texto}})
+    print(cache.metricas())
+    cache.cerrar()
+
+    # Tras un "reinicio" la respuesta sigue en SQLite
+    cache = CacheCLU(ttl=60, ruta_sqlite=ruta)
+    print(cache.obtener(crear_clave("quiero una paella", "RestauranteTakeAway", "v1")))
+    print(cache.metricas())
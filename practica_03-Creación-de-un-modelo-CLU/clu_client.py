@@ -0,0 +1,208 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from clu_cache import crear_clave
+
+# Cliente para la API analyze-conversations de Azure CLU.
+#
+# ¿Por qué no un requests.post por mensaje?
+# - requests.post abre una conexión TCP + TLS nueva cada vez (cientos de ms
+#   con Azure). Una Session reutiliza las conexiones abiertas (keep-alive).
+# - Sin timeout, una petición colgada bloquea el bot para siempre.
+# - Los 429 (límite de peticiones) y 5xx son normales en servicios en la nube:
+#   se reintentan con espera exponencial (0.5s, 1s, 2s...), respetando Retry-After.
+# - Para varios mensajes a la vez, un pool de hilos lanza las peticiones en
+#   paralelo con un máximo de peticiones simultáneas (max_concurrencia).
+# - Con una CacheCLU (clu_cache.py), los mensajes ya vistos no llegan a la red.
+
+# Códigos que merece la pena reintentar
+ESTADOS_REINTENTABLES = (429, 500, 502, 503, 504)
+
+
+class ErrorCLU(Exception):
+    """CLU respondió, pero sin una predicción válida (p. ej. {"error": {...}})."""
+
+
+def extraer_prediccion(respuesta):
+    """JSON de CLU → (intención, {categoría: texto}). Lanza ErrorCLU si no hay predicción."""
+    try:
+        prediccion = respuesta["result"]["prediction"]
+        intencion = prediccion["topIntent"]
+        entidades = {e["category"]: e["text"] for e in prediccion.get("entities", [])}
+    except (KeyError, TypeError):
+        detalle = respuesta.get("error", respuesta) if isinstance(respuesta, dict) else respuesta
+        raise ErrorCLU(f"Respuesta de CLU sin predicción: {detalle}")
+    return intencion, entidades
+
+
+class CLUClient:
+    def __init__(self, endpoint, api_key, project_name, deployment_name,
+                 timeout=(3.05, 10), max_reintentos=3, backoff=0.5, max_conexiones=10,
+                 cache=None):
+        """
+        timeout: (segundos para conectar, segundos para recibir la respuesta)
+        max_reintentos: reintentos ante errores de conexión, 429 y 5xx
+        backoff: espera base entre reintentos (se duplica en cada intento)
+        max_conexiones: conexiones que se mantienen abiertas con el servidor
+        cache: CacheCLU opcional delante de la API
+        """
+        self.endpoint = endpoint
+        self.project_name = project_name
+        self.deployment_name = deployment_name
+        self.timeout = timeout
+        self.cache = cache
+
+        reintentos = Retry(
+            total=max_reintentos,
+            backoff_factor=backoff,
+            status_forcelist=ESTADOS_REINTENTABLES,
+            # analyze-conversations solo lee: repetir el POST no tiene efectos
+            allowed_methods=frozenset(["POST"]),
+            respect_retry_after_header=True,
+        )
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexiones,
+                                max_retries=reintentos)
+
+        self.session = requests.Session()
+        self.session.headers.update({"Ocp-Apim-Subscription-Key": api_key})
+        self.session.mount("https://", adaptador)
+        self.session.mount("http://", adaptador)
+
+    def crear_payload(self, texto, id_conversacion="1"):
+        return {
+            "kind": "Conversation",
+            "analysisInput": {
+                "conversationItem": {
+                    "id": id_conversacion,
+                    "text": texto,
+                    "participantId": "user1"
+                }
+            },
+            "parameters": {
+                "projectName": self.project_name,
+                "deploymentName": self.deployment_name
+            }
+        }
+
+    def clave(self, texto):
+        return crear_clave(texto, self.project_name, self.deployment_name)
+
+    def analizar(self, texto):
+        """Envía un mensaje a CLU (o lo busca en la caché) y devuelve el JSON de respuesta."""
+        if self.cache is not None:
+            guardada = self.cache.obtener(self.clave(texto))
+            if guardada is not None:
+                return guardada
+
+        respuesta = self.session.post(self.endpoint, json=self.crear_payload(texto),
+                                      timeout=self.timeout)
+        respuesta.raise_for_status()
+        resultado = respuesta.json()
+        # Comprobar antes de guardar: una respuesta de error no debe quedarse en la caché
+        extraer_prediccion(resultado)
+
+        if self.cache is not None:
+            self.cache.guardar(self.clave(texto), resultado)
+        return resultado
+
+    def analizar_lote(self, textos, max_concurrencia=8, devolver_excepciones=False):
+        """
+        Analiza varios mensajes en paralelo. Devuelve las respuestas en el
+        mismo orden que los textos.
+
+        devolver_excepciones=True: un fallo no detiene el lote; en su
+        posición se devuelve la excepción en lugar de la respuesta.
+        """
+        def analizar_seguro(texto):
+            try:
+                return self.analizar(texto)
+            except (requests.RequestException, ErrorCLU) as e:
+                if devolver_excepciones:
+                    return e
+                raise
+
+        if len(textos) == 1 or max_concurrencia == 1:
+            # Sin paralelismo posible: no merece la pena crear hilos
+            return [analizar_seguro(texto) for texto in textos]
+
+        if self.cache is None:
+            with ThreadPoolExecutor(max_workers=max_concurrencia) as pool:
+                return list(pool.map(analizar_seguro, textos))
+
+        # Textos que dan la misma clave se piden una sola vez
+        claves = [self.clave(texto) for texto in textos]
+        unicos = {}
+        for clave, texto in zip(claves, textos):
+            unicos.setdefault(clave, texto)
+
+        with ThreadPoolExecutor(max_workers=max_concurrencia) as pool:
+            resultados = dict(zip(unicos, pool.map(analizar_seguro, unicos.values())))
+        return [resultados[clave] for clave in claves]
+
+    def cerrar(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def medir_rendimiento(cliente, textos, concurrencias=(1, 2, 4, 8, 16)):
+    """Mensajes por segundo de analizar_lote con cada nivel de concurrencia."""
+    resultados = []
+    for concurrencia in concurrencias:
+        inicio = time.perf_counter()
+        cliente.analizar_lote(textos, max_concurrencia=concurrencia)
+        segundos = time.perf_counter() - inicio
+        resultados.append({
+            "concurrencia": concurrencia,
+            "segundos": segundos,
+            "mensajes_por_segundo": len(textos) / segundos,
+        })
+    return resultados
+
+
+if __name__ == "__main__":
+    from clu_cache import CacheCLU
+    from mock_clu_server import iniciar_servidor
+
+    # Servidor local con 50 ms de latencia por petición (parecido a una API real)
+    servidor, url = iniciar_servidor(latencia=0.05)
+    textos = [
+        "Quiero pedir una paella para mañana, soy Sergio",
+        "¿Me recomiendas algo?",
+        "Cancela mi pedido",
+        "¿Cuál es el estado de mi pedido?",
+    ] * 25
+
+    print("\n--- BENCHMARK CLIENTE CLU (servidor local, 50 ms/petición) ---")
+
+    # Referencia: lo que hacía el bot (requests.post suelto, una conexión por mensaje)
+    with CLUClient(url, "clave-local", "RestauranteTakeAway", "v1") as cliente:
+        inicio = time.perf_counter()
+        for texto in textos:
+            requests.post(url, json=cliente.crear_payload(texto), timeout=10).json()
+        segundos = time.perf_counter() - inicio
+        print(f"requests.post secuencial : {len(textos) / segundos:7.1f} mensajes/s")
+
+    with CLUClient(url, "clave-local", "RestauranteTakeAway", "v1", max_conexiones=16) as cliente:
+        for fila in medir_rendimiento(cliente, textos):
+            print(f"Sesión, concurrencia {fila['concurrencia']:2d} : "
+                  f"{fila['mensajes_por_segundo']:7.1f} mensajes/s")
+
+    # Con caché solo llegan a la red los 4 textos distintos
+    cache = CacheCLU()
+    with CLUClient(url, "clave-local", "RestauranteTakeAway", "v1", cache=cache) as cliente:
+        for texto in textos:
+            cliente.analizar(texto)
+        fila = medir_rendimiento(cliente, textos, concurrencias=(1,))[0]
+        print(f"Sesión + caché           : {fila['mensajes_por_segundo']:7.1f} mensajes/s")
+    print(f"Caché: {cache.metricas()}")
+
+    servidor.shutdown()
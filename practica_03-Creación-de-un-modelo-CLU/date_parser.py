@@ -0,0 +1,239 @@
+import re
+import unicodedata
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+
+# Convierte la entidad FechaEntrega de CLU ("22 de enero a las 14:00",
+# "mañana", "el viernes a las 9 de la noche") en un datetime.
+#
+# ¿Por qué rápido?
+# - Las expresiones regulares se compilan una vez, al importar el módulo.
+# - Los resultados se memorizan (lru_cache): los clientes repiten mucho las
+#   mismas expresiones ("mañana a las 14:00"). La clave incluye la fecha de
+#   referencia (el día de hoy), porque "mañana" cambia cada día. La hora
+#   actual solo cuenta para "el viernes" dicho el mismo viernes con una hora
+#   ya pasada (es el de la semana siguiente), y eso se resuelve fuera de la
+#   caché, así que no forma parte de la clave.
+
+HORA_POR_DEFECTO = time(14, 0)   # Si solo se dice el día: a la hora de comer
+HORA_MEDIODIA = time(14, 0)
+HORA_NOCHE = time(21, 0)
+# Hora si solo se dice la parte del día ("por la noche", "esta tarde")
+HORAS_PERIODO = {"manana": time(11, 0), "tarde": time(18, 0), "noche": HORA_NOCHE}
+
+MESES = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7,
+    "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12,
+}
+DIAS_SEMANA = {
+    "lunes": 0, "martes": 1, "miercoles": 2, "jueves": 3, "viernes": 4, "sabado": 5, "domingo": 6,
+}
+
+_RE_ESPACIOS = re.compile(r"\s+")
+_RE_FECHA_TEXTO = re.compile(
+    r"\b(\d{1,2})\s+de\s+(" + "|".join(MESES) + r")(?:\s+(?:de|del)\s+(\d{4}))?\b"
+)
+_RE_FECHA_NUMERICA = re.compile(r"\b(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2}|\d{4}))?\b")
+_RE_RELATIVA = re.compile(r"\b(pasado manana|manana|hoy|esta noche|esta tarde)\b")
+_RE_DIA_SEMANA = re.compile(r"\b(" + "|".join(DIAS_SEMANA) + r")\b")
+# "a las 14:00", "a la 1", "a las 9 de la noche", "a las 2 y media"
+_RE_HORA_LAS = re.compile(
+    r"\ba\s+las?\s+(\d{1,2})(?:[:.](\d{2})|\s+y\s+(media|cuarto))?(?:\s*h(?:oras?)?\b)?"
+    r"(?:\s+(?:de|en|por)\s+la\s+(manana|tarde|noche))?"
+)
+# "14:00", "14.30", "21h"
+_RE_HORA_SUELTA = re.compile(r"\b(\d{1,2})(?:[:.](\d{2})|\s*h)\b")
+_RE_MEDIODIA = re.compile(r"\b(?:al\s+)?mediodia\b")
+# "por la mañana", "de la noche"... sin "a las N" delante
+_RE_PERIODO = re.compile(r"\b(?:por|de|en)\s+la\s+(manana|tarde|noche)\b")
+
+
+def _normalizar(texto):
+    """Minúsculas y sin tildes; se conservan ':' '/' '.' para horas y fechas."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return _RE_ESPACIOS.sub(" ", texto).strip()
+
+
+def _extraer_hora(texto):
+    """
+    Devuelve (hora, minutos, periodo, texto sin la hora ni el periodo).
+
+    hora es None si no se dice ninguna; periodo es 'manana', 'tarde',
+    'noche' o None. El periodo se quita del texto aunque no haya hora: si
+    no, "el viernes por la mañana" se leería como "mañana".
+    """
+    periodo = None
+    hora = minutos = None
+    encontrado = _RE_HORA_LAS.search(texto)
+    if encontrado:
+        hora = int(encontrado.group(1))
+        minutos = int(encontrado.group(2) or 0)
+        if encontrado.group(3):
+            minutos = 30 if encontrado.group(3) == "media" else 15
+        periodo = encontrado.group(4)
+    else:
+        encontrado = _RE_HORA_SUELTA.search(texto)
+        if encontrado:
+            hora = int(encontrado.group(1))
+            minutos = int(encontrado.group(2) or 0)
+
+    if encontrado:
+        if hora > 23 or minutos > 59:
+            hora = minutos = None
+        else:
+            texto = texto[:encontrado.start()] + " " + texto[encontrado.end():]
+
+    suelto = _RE_PERIODO.search(texto)
+    if suelto:
+        periodo = periodo or suelto.group(1)
+        texto = texto[:suelto.start()] + " " + texto[suelto.end():]
+
+    if hora is None and periodo is None and _RE_MEDIODIA.search(texto):
+        hora, minutos = HORA_MEDIODIA.hour, HORA_MEDIODIA.minute
+    return hora, minutos, periodo, texto
+
+
+def _aplicar_periodo(hora, minutos, periodo):
+    """
+    (time, días a sumar) de una hora dicha con su parte del día.
+
+    "las 9 de la noche" son las 21:00; "las 12 de la noche" y "la 1 de la
+    noche" son ya del día siguiente (00:00 y 01:00).
+    """
+    if periodo == "tarde" and hora < 12:
+        hora += 12
+    elif periodo == "noche":
+        if hora == 12:
+            return time(0, minutos), 1
+        if hora < 6:
+            return time(hora, minutos), 1
+        if hora < 12:
+            hora += 12
+    return time(hora, minutos), 0
+
+
+def _extraer_dia(texto, hoy):
+    """
+    Devuelve (date, periodo implícito o None, True si es un día de la semana)
+    a partir de la fecha de referencia.
+    date es None si no hay fecha y False si la hay pero no existe (31 de febrero).
+    """
+    encontrado = _RE_FECHA_TEXTO.search(texto)
+    if encontrado:
+        dia, mes = int(encontrado.group(1)), MESES[encontrado.group(2)]
+        anio = int(encontrado.group(3)) if encontrado.group(3) else None
+        return _construir_fecha(dia, mes, anio, hoy), None, False
+
+    encontrado = _RE_FECHA_NUMERICA.search(texto)
+    if encontrado:
+        dia, mes = int(encontrado.group(1)), int(encontrado.group(2))
+        anio = encontrado.group(3)
+        if anio is not None:
+            anio = int(anio) + (2000 if len(anio) == 2 else 0)
+        return _construir_fecha(dia, mes, anio, hoy), None, False
+
+    encontrado = _RE_RELATIVA.search(texto)
+    if encontrado:
+        palabra = encontrado.group(1)
+        if palabra == "pasado manana":
+            return hoy + timedelta(days=2), None, False
+        if palabra == "manana":
+            return hoy + timedelta(days=1), None, False
+        if palabra == "esta noche":
+            return hoy, "noche", False
+        if palabra == "esta tarde":
+            return hoy, "tarde", False
+        return hoy, None, False
+
+    encontrado = _RE_DIA_SEMANA.search(texto)
+    if encontrado:
+        # El próximo día con ese nombre (hoy incluido; parsear_fecha pasa a
+        # la semana siguiente si hoy ya ha pasado la hora)
+        dias = (DIAS_SEMANA[encontrado.group(1)] - hoy.weekday()) % 7
+        return hoy + timedelta(days=dias), None, True
+
+    return None, None, False
+
+
+def _construir_fecha(dia, mes, anio, hoy):
+    """Sin año: la próxima vez que llegue ese día (el 3 de enero dicho en diciembre es del año siguiente)."""
+    try:
+        if anio is not None:
+            return date(anio, mes, dia)
+        fecha = date(hoy.year, mes, dia)
+        if fecha < hoy:
+            fecha = date(hoy.year + 1, mes, dia)
+        return fecha
+    except ValueError:
+        # 31 de febrero, 45/13...
+        return False
+
+
+@lru_cache(maxsize=4096)
+def _parsear(texto, hoy):
+    """(datetime, True si se nombró un día de la semana) o None."""
+    texto = _normalizar(texto)
+    hora, minutos, periodo, resto = _extraer_hora(texto)
+    dia, periodo_dia, dia_semana = _extraer_dia(resto, hoy)
+    periodo = periodo or periodo_dia
+
+    if dia is False or (dia is None and hora is None and periodo is None):
+        return None
+
+    dia = dia or hoy
+    if hora is not None:
+        hora, dias_extra = _aplicar_periodo(hora, minutos, periodo)
+        dia += timedelta(days=dias_extra)
+    elif periodo is not None:
+        hora = HORAS_PERIODO[periodo]
+    else:
+        hora = HORA_POR_DEFECTO
+    return datetime.combine(dia, hora), dia_semana
+
+
+def parsear_fecha(texto, ahora=None):
+    """
+    Texto en español → datetime, o None si no se reconoce ninguna fecha ni hora.
+
+    Sin hora se usa la de la parte del día ("por la noche") o
+    HORA_POR_DEFECTO; sin día, hoy. Un día de la semana que cae hoy a una
+    hora ya pasada es el de la semana siguiente.
+    """
+    if not texto:
+        return None
+    ahora = ahora or datetime.now()
+    resultado = _parsear(texto, ahora.date())
+    if resultado is None:
+        return None
+    fecha, dia_semana = resultado
+    if dia_semana and fecha < ahora:
+        fecha += timedelta(days=7)
+    return fecha
+
+
+def formatear_fecha(fecha):
+    return fecha.strftime("%d/%m/%Y a las %H:%M")
+
+
+if __name__ == "__main__":
+    import time as reloj
+
+    ahora = datetime(2026, 1, 20, 12, 0)
+    print(f"\n--- PARSER DE FECHAS (referencia: {formatear_fecha(ahora)}, martes) ---")
+    ejemplos = [
+        "22 de enero a las 14:00", "mañana", "pasado mañana a las 9 de la noche",
+        "el viernes a las 21h", "3 de enero", "25/01 a las 13.30", "esta noche",
+        "mañana al mediodía", "a las 2 y media de la tarde", "31 de febrero", "cuando puedas",
+        "el viernes por la mañana", "mañana por la noche", "a las 12 de la noche", "el martes a las 10",
+    ]
+    for texto in ejemplos:
+        fecha = parsear_fecha(texto, ahora)
+        print(f"{texto:35} → {formatear_fecha(fecha) if fecha else None}")
+
+    n = 100_000
+    inicio = reloj.perf_counter()
+    for i in range(n):
+        parsear_fecha(ejemplos[i % len(ejemplos)], ahora)
+    por_llamada = (reloj.perf_counter() - inicio) / n
+    print(f"\n{n} llamadas: {por_llamada * 1e6:.2f} µs/llamada ({_parsear.cache_info()})")
@@ -0,0 +1,272 @@
+import json
+import os
+import re
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from clu_cache import normalizar_texto
+
+# Clasificador de intenciones local (sin red), al estilo del MultiLabelClassifier
+# de la práctica 04: TF-IDF + regresión logística.
+#
+# ¿Para qué, si ya está CLU?
+# - "¿Qué me recomiendas?" no necesita un viaje a Azure: el modelo local lo
+#   reconoce en microsegundos. Solo los mensajes dudosos (confianza baja) van a CLU.
+# - Si Azure no responde, el bot sigue funcionando (modo offline).
+# - Cada respuesta segura de CLU se guarda en un registro (JSONL) y sirve para
+#   reentrenar el modelo local: cuanto más se usa el bot, menos depende de CLU.
+#
+# Se usan n-gramas de caracteres (char_wb): con frases cortas y faltas de
+# ortografía ("kiero una paeya") funcionan mejor que las palabras completas.
+
+INTENCIONES = ["RealizarPedido", "CancelarPedido", "PedirRecomendacion", "ConsultarEstado", "None"]
+
+FRASES_SEMILLA = {
+    "RealizarPedido": [
+        "Quiero pedir una paella para mañana",
+        "Quiero una pizza para esta noche",
+        "Me gustaría encargar una paella para el sábado",
+        "Quiero hacer un pedido",
+        "Pon una lasaña a nombre de Sergio",
+        "Mándame una ensalada a la calle Mayor 5",
+        "Quisiera pedir dos raciones de croquetas",
+        "Hazme un pedido de paella para el 22 de enero a las 14:00",
+        "Encargo una tortilla para recoger mañana",
+        "Quiero pedir comida a domicilio",
+        "Me apetece pedir una hamburguesa para cenar",
+        "Reserva una paella para cuatro personas el domingo",
+    ],
+    "CancelarPedido": [
+        "Quiero cancelar mi pedido",
+        "Cancela el pedido de mañana",
+        "Anula mi pedido por favor",
+        "Ya no quiero la paella, cancélala",
+        "Me gustaría anular el encargo del sábado",
+        "Cancelar pedido",
+        "No voy a estar, anula el pedido",
+        "Borra mi pedido de la pizza",
+        "Quiero anular la reserva de comida",
+        "Cancela lo que pedí ayer",
+    ],
+    "PedirRecomendacion": [
+        "¿Qué me recomiendas?",
+        "¿Cuál es la especialidad de la casa?",
+        "Recomiéndame algo para cenar",
+        "¿Qué plato está más rico hoy?",
+        "No sé qué pedir, ¿alguna sugerencia?",
+        "¿Qué me aconsejas para dos personas?",
+        "¿Cuál es el plato del día?",
+        "Sugiéreme un postre",
+        "¿Qué es lo más pedido?",
+        "¿Tenéis algo vegetariano que me recomendéis?",
+    ],
+    "ConsultarEstado": [
+        "¿Cuál es el estado de mi pedido?",
+        "¿Dónde está mi pedido?",
+        "¿Cuánto falta para que llegue mi comida?",
+        "¿Ya ha salido mi pedido?",
+        "¿Cuándo llega la paella?",
+        "Estado del pedido",
+        "¿Está preparado mi encargo?",
+        "Mi pedido no ha llegado todavía",
+        "¿Por dónde va el repartidor?",
+        "¿Cómo va mi pedido?",
+    ],
+    "None": [
+        "Hola",
+        "Buenos días",
+        "Gracias",
+        "¿Qué tiempo hace hoy?",
+        "Adiós",
+        "¿Cuál es vuestro horario?",
+        "Vale",
+        "Cuéntame un chiste",
+    ],
+}
+
+
+class IntentClassifier:
+    def __init__(self, umbral=0.6, model_path=None):
+        """
+        umbral: confianza mínima para responder sin consultar a CLU
+        model_path: modelo guardado (joblib) que se carga si existe
+        """
+        self.umbral = umbral
+        self.vectorizer = TfidfVectorizer(
+            preprocessor=normalizar_texto,
+            analyzer="char_wb",
+            ngram_range=(2, 4),
+            sublinear_tf=True,
+        )
+        self.classifier = LogisticRegression(max_iter=1000, C=10, random_state=42)
+        self.is_fitted = False
+
+        if model_path and os.path.exists(model_path):
+            self.cargar(model_path)
+
+    def entrenar(self, ruta_registro=None, frases_extra=None):
+        """
+        Entrena con las frases semilla + las registradas de CLU (JSONL con
+        {"texto", "intencion"}) + frases_extra [(texto, intención), ...].
+        """
+        textos, etiquetas = [], []
+        for intencion, frases in FRASES_SEMILLA.items():
+            textos += frases
+            etiquetas += [intencion] * len(frases)
+
+        for texto, intencion in cargar_registro(ruta_registro) + list(frases_extra or []):
+            if intencion in INTENCIONES:
+                textos.append(texto)
+                etiquetas.append(intencion)
+
+        X = self.vectorizer.fit_transform(textos)
+        self.classifier.fit(X, etiquetas)
+        self._preparar_prediccion()
+        self.is_fitted = True
+        return len(textos)
+
+    def _preparar_prediccion(self):
+        # vectorizer.transform + predict_proba tardan ~800 µs por frase, casi
+        # todo en validaciones y matrices dispersas de una fila. Se hace lo
+        # mismo a mano: n-gramas → índices del vocabulario → TF-IDF → pesos
+        self._analizador = self.vectorizer.build_analyzer()
+        self._vocabulario = self.vectorizer.vocabulary_
+        self._idf = self.vectorizer.idf_
+        self._coef = np.ascontiguousarray(self.classifier.coef_.T)
+        self._intercept = self.classifier.intercept_
+        self._clases = [str(c) for c in self.classifier.classes_]
+
+    def predecir(self, texto):
+        """Devuelve (intención, confianza entre 0 y 1) en ~100 µs."""
+        if not self.is_fitted:
+            raise ValueError("El modelo no ha sido entrenado. Ejecute entrenar() primero.")
+
+        indices = [self._vocabulario[g] for g in self._analizador(texto) if g in self._vocabulario]
+        if indices:
+            indices, repeticiones = np.unique(indices, return_counts=True)
+            # sublinear_tf + idf + normalización L2, como TfidfVectorizer
+            pesos = (1 + np.log(repeticiones)) * self._idf[indices]
+            pesos /= np.sqrt(pesos @ pesos)
+            puntuaciones = pesos @ self._coef[indices] + self._intercept
+        else:
+            puntuaciones = self._intercept.copy()
+
+        # Softmax (multinomial, igual que predict_proba)
+        probabilidades = np.exp(puntuaciones - puntuaciones.max())
+        probabilidades /= probabilidades.sum()
+
+        mejor = int(np.argmax(probabilidades))
+        return self._clases[mejor], float(probabilidades[mejor])
+
+    def es_seguro(self, confianza):
+        return confianza >= self.umbral
+
+    def guardar(self, path):
+        if not self.is_fitted:
+            raise ValueError("El modelo no ha sido entrenado.")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        joblib.dump({"vectorizer": self.vectorizer, "classifier": self.classifier}, path)
+
+    def cargar(self, path):
+        datos = joblib.load(path)
+        self.vectorizer = datos["vectorizer"]
+        self.classifier = datos["classifier"]
+        self._preparar_prediccion()
+        self.is_fitted = True
+
+
+# ============================================================
+# REGISTRO DE FRASES (datos de entrenamiento que genera el bot)
+# ============================================================
+def registrar_frase(ruta, texto, intencion):
+    """Añade una frase etiquetada (normalmente por CLU) al registro JSONL."""
+    if not ruta:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"texto": texto, "intencion": intencion}, ensure_ascii=False) + "\n")
+
+
+def cargar_registro(ruta):
+    if not ruta or not os.path.exists(ruta):
+        return []
+    # Una frase repetida cuenta una vez (vale la última etiqueta registrada)
+    frases = {}
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            if linea.strip():
+                fila = json.loads(linea)
+                frases[fila["texto"]] = fila["intencion"]
+    return list(frases.items())
+
+
+# ============================================================
+# ENTIDADES (extracción local sencilla)
+# ============================================================
+PLATOS = ["paella", "pizza", "lasaña", "ensalada", "croquetas", "tortilla",
+          "hamburguesa", "postre", "fideuá", "gazpacho"]
+
+# Solo el disparador ignora mayúsculas: el nombre tiene que empezar por una
+# ("soy alérgico", "soy de Madrid" no son nombres)
+_RE_CLIENTE = re.compile(r"\b(?i:soy|me llamo|a nombre de)\s+([A-ZÁÉÍÓÚÑ][\wáéíóúñ]+)")
+_RE_PLATO = re.compile(r"\b(" + "|".join(PLATOS) + r")s?\b", re.IGNORECASE)
+_RE_DIRECCION = re.compile(r"\b((?:calle|c/|avenida|avda\.?|plaza|paseo)\s+[^,.;]+?)(?=[,.;]|\s+para\b|$)",
+                           re.IGNORECASE)
+_RE_FECHA = re.compile(r"\b((?:para\s+)?(?:el\s+)?(?:hoy|mañana|pasado mañana|esta noche|esta tarde|lunes|martes|miércoles|"
+                       r"jueves|viernes|sábado|domingo|\d{1,2}(?:\s+de\s+\w+|/\d{1,2}(?:/\d{2,4})?))"
+                       r"(?:\s+a\s+las\s+\d{1,2}(?::\d{2})?)?)", re.IGNORECASE)
+
+
+def extraer_entidades(texto):
+    """
+    Entidades con las mismas categorías que el modelo CLU (cliente, plato,
+    direccion, FechaEntrega). Solo cubre los casos sencillos: los mensajes
+    complicados se siguen enviando a CLU.
+    """
+    entidades = {}
+    for categoria, patron in (("cliente", _RE_CLIENTE), ("plato", _RE_PLATO),
+                              ("direccion", _RE_DIRECCION), ("FechaEntrega", _RE_FECHA)):
+        encontrado = patron.search(texto)
+        if encontrado:
+            entidades[categoria] = encontrado.group(1).strip()
+    if "FechaEntrega" in entidades:
+        entidades["FechaEntrega"] = re.sub(r"^(para\s+)?(el\s+)?", "", entidades["FechaEntrega"],
+                                           flags=re.IGNORECASE)
+    return entidades
+
+
+if __name__ == "__main__":
+    import time
+
+    # Reentrenar con las frases registradas por el bot y guardar el modelo
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    ruta_registro = os.path.join(base_dir, "data", "frases_clu.jsonl")
+    model_path = os.path.join(base_dir, "models", "intenciones.pkl")
+
+    clasificador = IntentClassifier()
+    n = clasificador.entrenar(ruta_registro=ruta_registro)
+    clasificador.guardar(model_path)
+    print(f"\n--- CLASIFICADOR LOCAL ({n} frases) → {model_path} ---")
+
+    pruebas = [
+        "Quiero pedir una paella para el 22 de enero a las 14:00, soy Sergio",
+        "kiero kancelar el pedido",
+        "¿qué me recomiendas hoy?",
+        "¿dónde está mi comida?",
+        "¿Aceptáis pagos con tarjeta?",
+    ]
+    for texto in pruebas:
+        intencion, confianza = clasificador.predecir(texto)
+        origen = "local" if clasificador.es_seguro(confianza) else "→ CLU"
+        print(f"{texto[:45]:45} {intencion:20} {confianza:.2f} {origen}")
+        print(f"{'':45} {extraer_entidades(texto)}")
+
+    repeticiones = 2000
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        clasificador.predecir(pruebas[i % len(pruebas)])
+    por_frase = (time.perf_counter() - inicio) / repeticiones
+    print(f"\nTiempo por frase: {por_frase * 1e6:.0f} µs")
@@ -0,0 +1,170 @@
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import bot_restaurante as bot
+from clu_cache import CacheCLU
+from clu_client import CLUClient
+from mock_clu_server import iniciar_servidor
+
+# Prueba de carga del bot contra el servidor CLU local (mock_clu_server.py).
+# Funciona sin conexión, así que puede ejecutarse en CI:
+#
+#   python load_test.py --tasa 50 --duracion 10 --tasa-errores 0.05 --max-p99 0.5
+#
+# Carga "en bucle abierto": los mensajes se lanzan a la tasa pedida (mensajes/s)
+# aunque el bot vaya con retraso, como hacen los usuarios reales. La latencia de
+# cada mensaje se mide desde el momento en que DEBÍA enviarse, así que el tiempo
+# esperando en cola cuenta (si no, un bot saturado parecería rápido).
+#
+# Se considera error un mensaje que lanza una excepción o que CLU no pudo
+# responder (el bot contestó con el modelo local de respaldo: origen "fallback").
+
+MENSAJES = [
+    "Quiero pedir una paella para mañana, soy Sergio",
+    "Quiero una pizza para el viernes a las 21:00 a la calle Mayor 5",
+    "Cancela mi pedido de mañana",
+    "¿Qué me recomiendas?",
+    "¿Cuál es el estado de mi pedido?",
+    "¿Dónde está mi comida?",
+    "Me gustaría encargar algo para cenar",
+    "¿Aceptáis pagos con tarjeta?",
+    "Anula el encargo del sábado, por favor",
+    "Hola, ¿qué tal?",
+]
+
+
+def configurar_bot(url, modo, concurrencia, cache=False, max_reintentos=2):
+    """
+    Apunta el bot al servidor local.
+
+    modo: "clu" (todo a CLU), "mixto" (modelo local si está seguro) u "offline"
+    """
+    bot.ENDPOINT = url
+    bot.MODO_OFFLINE = modo == "offline"
+    bot.REGISTRO_FRASES = None  # no registrar frases durante la prueba
+    bot._cliente = CLUClient(url, "clave-local", bot.PROJECT_NAME, bot.DEPLOYMENT_NAME,
+                             max_reintentos=max_reintentos, backoff=0.05,
+                             max_conexiones=concurrencia,
+                             cache=CacheCLU() if cache else None)
+    clasificador = bot.obtener_clasificador()
+    clasificador.umbral = float("inf") if modo == "clu" else bot.UMBRAL_LOCAL
+
+
+def atender(texto):
+    """Un mensaje de principio a fin, como procesar_mensaje_restaurante. Devuelve el origen."""
+    intent, entities, origen = bot.analizar_mensajes([texto])[0]
+    bot.validar_y_responder(intent, entities)
+    return origen
+
+
+def generar_carga(tasa, duracion, concurrencia=32, mensajes=MENSAJES):
+    """
+    Lanza tasa × duracion mensajes a ritmo constante.
+
+    Returns:
+        Informe con latencias (p50/p95/p99, s), tasa de errores y mensajes/s
+    """
+    n = int(tasa * duracion)
+    intervalo = 1.0 / tasa
+    latencias = np.empty(n)
+    origenes = Counter()
+    lock = threading.Lock()
+
+    def tarea(i, programado):
+        try:
+            origen = atender(mensajes[i % len(mensajes)])
+        except Exception:
+            origen = "excepcion"
+        latencias[i] = time.perf_counter() - programado
+        with lock:
+            origenes[origen] += 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as pool:
+        for i in range(n):
+            programado = inicio + i * intervalo
+            espera = programado - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            pool.submit(tarea, i, programado)
+    total = time.perf_counter() - inicio
+
+    errores = origenes["fallback"] + origenes["excepcion"]
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+    return {
+        "tasa_objetivo": tasa,
+        "mensajes": n,
+        "segundos": total,
+        "mensajes_por_segundo": n / total,
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(latencias.max()),
+        "errores": errores,
+        "tasa_errores": errores / n,
+        "origenes": dict(origenes),
+    }
+
+
+def imprimir_informe(informe):
+    print(f"Mensajes: {informe['mensajes']} en {informe['segundos']:.2f}s "
+          f"({informe['mensajes_por_segundo']:.1f}/s, objetivo {informe['tasa_objetivo']}/s)")
+    print(f"Latencia  p50: {informe['p50'] * 1000:7.1f} ms  p95: {informe['p95'] * 1000:7.1f} ms  "
+          f"p99: {informe['p99'] * 1000:7.1f} ms  máx: {informe['max'] * 1000:7.1f} ms")
+    print(f"Errores: {informe['errores']} ({informe['tasa_errores']:.1%})  Origen: {informe['origenes']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del bot contra un CLU local")
+    parser.add_argument("--tasa", type=float, default=50, help="Mensajes por segundo")
+    parser.add_argument("--duracion", type=float, default=5, help="Segundos de prueba")
+    parser.add_argument("--concurrencia", type=int, default=32, help="Mensajes simultáneos máximos")
+    parser.add_argument("--modo", choices=["clu", "mixto", "offline"], default="clu")
+    parser.add_argument("--cache", action="store_true", help="Activar la caché de CLU")
+    parser.add_argument("--latencia", type=float, default=0.05, help="Mediana del servidor (s)")
+    parser.add_argument("--dispersion", type=float, default=0.3, help="Sigma log-normal del servidor")
+    parser.add_argument("--tasa-errores", type=float, default=0.0, help="Fracción de errores del servidor")
+    parser.add_argument("--codigo-error", type=int, default=503)
+    parser.add_argument("--max-p99", type=float, help="Falla (código 1) si p99 supera estos segundos")
+    parser.add_argument("--max-errores", type=float, help="Falla (código 1) si la tasa de errores lo supera")
+    parser.add_argument("--json", help="Guardar el informe en este fichero")
+    args = parser.parse_args()
+
+    # Los avisos de "CLU no disponible" ya se cuentan en el informe
+    logging.getLogger(bot.__name__).setLevel(logging.ERROR)
+
+    servidor, url = iniciar_servidor(latencia=args.latencia, dispersion=args.dispersion,
+                                     tasa_errores=args.tasa_errores, codigo_error=args.codigo_error)
+    configurar_bot(url, args.modo, args.concurrencia, cache=args.cache)
+
+    print(f"\n--- PRUEBA DE CARGA ({args.modo}, servidor local {args.latencia * 1000:.0f} ms, "
+          f"{args.tasa_errores:.0%} errores) ---")
+    informe = generar_carga(args.tasa, args.duracion, args.concurrencia)
+    informe["peticiones_servidor"] = servidor.peticiones
+    servidor.shutdown()
+    imprimir_informe(informe)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+
+    fallos = []
+    if args.max_p99 is not None and informe["p99"] > args.max_p99:
+        fallos.append(f"p99 {informe['p99']:.3f}s > {args.max_p99}s")
+    if args.max_errores is not None and informe["tasa_errores"] > args.max_errores:
+        fallos.append(f"errores {informe['tasa_errores']:.1%} > {args.max_errores:.1%}")
+    if fallos:
+        print(f"❌ Umbrales superados: {', '.join(fallos)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
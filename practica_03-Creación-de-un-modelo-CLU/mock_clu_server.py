@@ -0,0 +1,153 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from intent_classifier import extraer_entidades
+
+# Servidor local que imita el endpoint analyze-conversations de Azure CLU.
+# Sirve para probar y medir el bot sin conexión ni coste de API (p. ej. en CI).
+# Devuelve respuestas con la misma forma que la real:
+#   {"kind": "ConversationResult",
+#    "result": {"query": ..., "prediction": {"topIntent": ..., "intents": [...],
+#                                            "entities": [...]}}}
+#
+# Configurable:
+# - latencia: mediana del tiempo de respuesta (segundos)
+# - dispersion: sigma de una log-normal alrededor de la mediana. Las APIs
+#   reales tienen "cola larga": la mayoría responde rápido y unas pocas tardan
+#   mucho. 0 = latencia fija
+# - tasa_errores: fracción de peticiones que fallan con codigo_error
+#   (503 o 429, que el cliente reintenta; 401 o 400, que no)
+
+# Palabras clave → intención (un "modelo" de juguete para que las respuestas varíen)
+PALABRAS_INTENCION = [
+    ("cancel", "CancelarPedido"),
+    ("anul", "CancelarPedido"),
+    ("recomi", "PedirRecomendacion"),
+    ("especialidad", "PedirRecomendacion"),
+    ("estado", "ConsultarEstado"),
+    ("dónde está", "ConsultarEstado"),
+    ("pedir", "RealizarPedido"),
+    ("quiero", "RealizarPedido"),
+    ("encarg", "RealizarPedido"),
+]
+INTENCIONES = ["RealizarPedido", "CancelarPedido", "PedirRecomendacion", "ConsultarEstado", "None"]
+
+
+def predecir(texto):
+    texto_min = texto.lower()
+    intent = next((i for palabra, i in PALABRAS_INTENCION if palabra in texto_min), "None")
+
+    # Entidades con el formato de CLU: categoría, texto, posición y confianza
+    entidades = []
+    for categoria, valor in extraer_entidades(texto).items():
+        offset = texto.find(valor)
+        entidades.append({
+            "category": categoria,
+            "text": valor,
+            "offset": max(offset, 0),
+            "length": len(valor),
+            "confidenceScore": 1,
+        })
+
+    intents = [{"category": intent, "confidenceScore": 0.92}]
+    intents += [{"category": otra, "confidenceScore": 0.02} for otra in INTENCIONES if otra != intent]
+    return {
+        "topIntent": intent,
+        "projectKind": "Conversation",
+        "intents": intents,
+        "entities": entidades,
+    }
+
+
+class ManejadorCLU(BaseHTTPRequestHandler):
+    # HTTP/1.1 para que el cliente pueda reutilizar la conexión (keep-alive)
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo se envían por separado: sin esto, Nagle + ACK
+    # retardado añaden ~40 ms a cada respuesta en una conexión reutilizada
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        longitud = int(self.headers.get("Content-Length", 0))
+        peticion = json.loads(self.rfile.read(longitud) or b"{}")
+        texto = peticion.get("analysisInput", {}).get("conversationItem", {}).get("text", "")
+
+        servidor = self.server
+        if servidor.latencia:
+            time.sleep(servidor.latencia * random.lognormvariate(0, servidor.dispersion))
+
+        with servidor.lock:
+            servidor.peticiones += 1
+
+        if random.random() < servidor.tasa_errores:
+            with servidor.lock:
+                servidor.errores += 1
+            self._responder(servidor.codigo_error, {
+                "error": {"code": "MockError", "message": f"Error simulado ({servidor.codigo_error})"}
+            })
+            return
+
+        self._responder(200, {
+            "kind": "ConversationResult",
+            "result": {"query": texto, "prediction": predecir(texto)},
+        })
+
+    def _responder(self, codigo, datos):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        if codigo == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        # Sin una línea por petición en la consola
+        pass
+
+
+def iniciar_servidor(host="127.0.0.1", puerto=0, latencia=0.05, dispersion=0.0,
+                     tasa_errores=0.0, codigo_error=503):
+    """Arranca el servidor en un hilo. puerto=0 elige uno libre. Devuelve (servidor, url)."""
+    servidor = ThreadingHTTPServer((host, puerto), ManejadorCLU)
+    servidor.daemon_threads = True
+    servidor.latencia = latencia
+    servidor.dispersion = dispersion
+    servidor.tasa_errores = tasa_errores
+    servidor.codigo_error = codigo_error
+    # Contadores (el servidor atiende cada petición en un hilo)
+    servidor.lock = threading.Lock()
+    servidor.peticiones = 0
+    servidor.errores = 0
+
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+
+    host, puerto = servidor.server_address[:2]
+    url = f"http://{host}:{puerto}/language/:analyze-conversations?api-version=2024-11-15-preview"
+    return servidor, url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor CLU local (analyze-conversations)")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--latencia", type=float, default=0.05, help="Mediana en segundos")
+    parser.add_argument("--dispersion", type=float, default=0.3, help="Sigma log-normal (0 = fija)")
+    parser.add_argument("--tasa-errores", type=float, default=0.0, help="Fracción de peticiones con error")
+    parser.add_argument("--codigo-error", type=int, default=503)
+    args = parser.parse_args()
+
+    servidor, url = iniciar_servidor(puerto=args.puerto, latencia=args.latencia,
+                                     dispersion=args.dispersion, tasa_errores=args.tasa_errores,
+                                     codigo_error=args.codigo_error)
+    print(f"Servidor CLU local en {url}")
+    print("Use AZURE_ENDPOINT con esta URL para probar el bot. Ctrl+C para salir.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,121 @@
+import bisect
+import itertools
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+from clu_cache import normalizar_texto
+
+# Almacén de pedidos en memoria para validar las reglas del restaurante
+# sin llamadas de red:
+# - Pedidos con hasta 48 horas de antelación
+# - Cancelación con al menos 24 horas de antelación
+#
+# Índices:
+# - Por cliente: lista ORDENADA de (hora de entrega, id). Con bisect, el
+#   próximo pedido de un cliente o el de un día concreto se encuentra en
+#   O(log n), sin recorrer todos sus pedidos.
+# - Global por hora de entrega: la misma idea, para consultar todos los
+#   pedidos de una franja (p. ej. cuántas paellas hay que preparar a las 14:00).
+
+
+@dataclass
+class Pedido:
+    id: int
+    cliente: str
+    plato: str
+    direccion: str
+    entrega: datetime
+    estado: str = "confirmado"   # confirmado | cancelado
+
+
+class AlmacenPedidos:
+    def __init__(self):
+        self._pedidos = {}            # id -> Pedido
+        self._por_cliente = {}        # cliente normalizado -> [(entrega, id), ...] ordenada
+        self._por_entrega = []        # [(entrega, id), ...] ordenada
+        self._ids = itertools.count(1)
+        # El bot puede atender varios mensajes a la vez (analizar_lote)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _clave_cliente(cliente):
+        return normalizar_texto(cliente or "")
+
+    def crear(self, cliente, plato, direccion, entrega):
+        with self._lock:
+            pedido = Pedido(next(self._ids), cliente, plato, direccion, entrega)
+            self._pedidos[pedido.id] = pedido
+            clave = (entrega, pedido.id)
+            bisect.insort(self._por_cliente.setdefault(self._clave_cliente(cliente), []), clave)
+            bisect.insort(self._por_entrega, clave)
+            return pedido
+
+    def cancelar(self, pedido_id):
+        with self._lock:
+            pedido = self._pedidos[pedido_id]
+            pedido.estado = "cancelado"
+            return pedido
+
+    def obtener(self, pedido_id):
+        return self._pedidos.get(pedido_id)
+
+    def pedidos_cliente(self, cliente, desde=None, hasta=None, solo_activos=True):
+        """Pedidos del cliente con entrega en [desde, hasta), ordenados por hora de entrega."""
+        with self._lock:
+            indice = self._por_cliente.get(self._clave_cliente(cliente), [])
+            return self._rango(indice, desde, hasta, solo_activos)
+
+    def pedidos_entre(self, desde, hasta, solo_activos=True):
+        """Todos los pedidos con entrega en [desde, hasta)."""
+        with self._lock:
+            return self._rango(self._por_entrega, desde, hasta, solo_activos)
+
+    def proximo_pedido(self, cliente, ahora=None):
+        """Primer pedido activo del cliente cuya entrega aún no ha pasado."""
+        ahora = ahora or datetime.now()
+        with self._lock:
+            indice = self._por_cliente.get(self._clave_cliente(cliente), [])
+            inicio = bisect.bisect_left(indice, (ahora, 0))
+            for _, pedido_id in indice[inicio:]:
+                pedido = self._pedidos[pedido_id]
+                if pedido.estado != "cancelado":
+                    return pedido
+        return None
+
+    def _rango(self, indice, desde, hasta, solo_activos):
+        inicio = 0 if desde is None else bisect.bisect_left(indice, (desde, 0))
+        fin = len(indice) if hasta is None else bisect.bisect_left(indice, (hasta, 0))
+        pedidos = (self._pedidos[pedido_id] for _, pedido_id in indice[inicio:fin])
+        return [p for p in pedidos if not solo_activos or p.estado != "cancelado"]
+
+    def __len__(self):
+        return len(self._pedidos)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+    from datetime import timedelta
+
+    almacen = AlmacenPedidos()
+    ahora = datetime(2026, 1, 20, 12, 0)
+    clientes = [f"cliente{i}" for i in range(1000)]
+    rng = random.Random(0)
+
+    n = 100_000
+    inicio = time.perf_counter()
+    for _ in range(n):
+        entrega = ahora + timedelta(minutes=rng.randrange(0, 60 * 48))
+        almacen.crear(rng.choice(clientes), "paella", "calle Mayor 5", entrega)
+    print("\n--- ALMACÉN DE PEDIDOS ---")
+    print(f"{n} pedidos creados en {time.perf_counter() - inicio:.2f}s")
+
+    inicio = time.perf_counter()
+    for _ in range(n):
+        almacen.proximo_pedido(rng.choice(clientes), ahora + timedelta(hours=24))
+    por_consulta = (time.perf_counter() - inicio) / n
+    print(f"proximo_pedido: {por_consulta * 1e6:.1f} µs/consulta ({1 / por_consulta:,.0f}/s)")
+
+    franja = almacen.pedidos_entre(ahora + timedelta(hours=2), ahora + timedelta(hours=3))
+    print(f"Pedidos entre las 14:00 y las 15:00: {len(franja)}")
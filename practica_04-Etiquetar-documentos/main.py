@@ -10,6 +10,9 @@ Uso:
     python main.py train                     # Entrenar modelo
     python main.py classify --text "..."     # Clasificar texto
     python main.py classify --file doc.txt   # Clasificar archivo
+    python main.py classify --batch a.txt b.pdf  # Clasificar varios archivos en micro-lotes
+    python main.py compress                  # Comprimir modelo entrenado
+    python main.py serve --workers 4         # Servidor multi-proceso (pre-fork)
     python main.py email-daemon              # Iniciar servidor de email
 """
 
@@ -23,12 +26,16 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from src.model import MultiLabelClassifier
 from src.document_handler import extract_text_from_file
 from src.email_handler import EmailHandler
+from src.serving import PreforkServer
+from src.batching import MicroBatchScheduler
+from src import metrics
 
 
 # Rutas por defecto
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, "data", "documents.csv")
 MODEL_PATH = os.path.join(BASE_DIR, "models", "multilabel_classifier.pkl")
+COMPRESSED_MODEL_PATH = os.path.join(BASE_DIR, "models", "multilabel_classifier_compressed.pkl")
 
 
 def train_model(args):
@@ -45,15 +52,16 @@ def train_model(args):
     
     # Crear clasificador y entrenar
     classifier = MultiLabelClassifier()
-    metrics = classifier.train(data_path, test_size=args.test_size)
+    with metrics.timer('model_train_seconds'):
+        results = classifier.train(data_path, test_size=args.test_size)
     
     print("\n📊 MÉTRICAS DE EVALUACIÓN:")
     print("-" * 40)
-    print(f"  Hamming Loss: {metrics['hamming_loss']:.4f} (menor es mejor)")
-    print(f"  F1 Micro:     {metrics['f1_micro']:.4f}")
-    print(f"  F1 Macro:     {metrics['f1_macro']:.4f}")
+    print(f"  Hamming Loss: {results['hamming_loss']:.4f} (menor es mejor)")
+    print(f"  F1 Micro:     {results['f1_micro']:.4f}")
+    print(f"  F1 Macro:     {results['f1_macro']:.4f}")
     print("\n📋 Reporte de Clasificación:")
-    print(metrics['classification_report'])
+    print(results['classification_report'])
     
     # Guardar modelo
     classifier.save(model_path)
@@ -77,6 +85,10 @@ def classify_text(args):
     
     classifier = MultiLabelClassifier(model_path)
     
+    if args.batch:
+        classify_files(classifier, args)
+        return
+    
     # Obtener texto
     if args.text:
         text = args.text
@@ -85,10 +97,10 @@ def classify_text(args):
         if not os.path.exists(args.file):
             print(f"\n❌ Error: Archivo no encontrado: {args.file}")
             return
-        text = extract_text_from_file(args.file)
+        text = extract_text_from_file(args.file, max_chars=args.max_chars)
         source = args.file
     else:
-        print("\n❌ Error: Debe proporcionar --text o --file")
+        print("\n❌ Error: Debe proporcionar --text, --file o --batch")
         return
     
     print(f"\n📄 Fuente: {source}")
@@ -98,7 +110,8 @@ def classify_text(args):
     print("-" * 40)
     
     # Clasificar
-    result = classifier.predict(text)
+    with metrics.profile_request('classify'), metrics.timer('cli_classify_seconds'):
+        result = classifier.predict(text)
     
     print("\n🏷️ ETIQUETAS PREDICHAS:")
     if result['labels']:
@@ -115,6 +128,123 @@ def classify_text(args):
     print("\n✅ Clasificación completada!")
 
 
+def classify_files(classifier: MultiLabelClassifier, args):
+    """Clasifica varios archivos pasando por un MicroBatchScheduler."""
+    missing = [path for path in args.batch if not os.path.exists(path)]
+    if missing:
+        print(f"\n❌ Error: Archivos no encontrados: {', '.join(missing)}")
+        return
+    
+    # El modelo se ejecuta en el hilo del planificador: ahí se perfila cada lote
+    with MicroBatchScheduler(classifier, args.max_batch_size, args.max_delay,
+                             profile_name='classify') as scheduler:
+        # Cada archivo se encola en cuanto se extrae su texto: la extracción
+        # del siguiente se solapa con la espera del lote
+        futures = []
+        for path in args.batch:
+            text = extract_text_from_file(path, max_chars=args.max_chars)
+            futures.append(scheduler.submit(text))
+        
+        with metrics.timer('cli_classify_seconds'):
+            results = [future.result() for future in futures]
+        stats = scheduler.metrics()
+    
+    print(f"\n📦 {len(results)} archivos en {stats['batches']} lotes "
+          f"(tamaño medio {stats['mean_batch_size']:.1f})")
+    print("-" * 40)
+    width = max(len(path) for path in args.batch)
+    for path, result in zip(args.batch, results):
+        labels = ', '.join(result['labels']) or '(ninguna etiqueta detectada)'
+        print(f"   {path:{width}}  🏷️ {labels}")
+    
+    print("\n✅ Clasificación completada!")
+
+
+def compress_model(args):
+    """Comprime un modelo entrenado y compara su calidad con el original."""
+    print("=" * 50)
+    print("COMPRESIÓN DEL MODELO")
+    print("=" * 50)
+    
+    model_path = args.model or MODEL_PATH
+    output_path = args.output or COMPRESSED_MODEL_PATH
+    data_path = args.data or DATA_PATH
+    
+    if not os.path.exists(model_path):
+        print(f"\n❌ Error: No se encontró el modelo en {model_path}")
+        print("   Ejecute primero: python main.py train")
+        return
+    
+    full = MultiLabelClassifier(model_path)
+    compressed = full.compress(prune_ratio=args.prune_ratio, dtype=args.dtype)
+    compressed.save(output_path)
+    
+    n_full = len(full.vectorizer.vocabulary_)
+    n_compressed = len(compressed.vectorizer.vocabulary_)
+    size_full = os.path.getsize(model_path) / 1024
+    size_compressed = os.path.getsize(output_path) / 1024
+    
+    print(f"\n🗜️ Pesos: {args.dtype}, poda < {args.prune_ratio:.1%} del peso máximo")
+    print(f"   Características: {n_full} → {n_compressed} ({n_compressed / n_full:.1%})")
+    print(f"   Tamaño:          {size_full:.1f} KB → {size_compressed:.1f} KB "
+          f"({size_compressed / size_full:.1%})")
+    
+    # Misma división train/test que en el entrenamiento
+    if not os.path.exists(data_path):
+        print(f"\n⚠️ No se encontró el dataset en {data_path}: no se mide la pérdida de calidad")
+        return
+    
+    _, X_test, _, y_test = full.load_split(data_path, test_size=args.test_size)
+    metrics_full = full.evaluate(X_test, y_test, preprocessed=True)
+    metrics_compressed = compressed.evaluate(X_test, y_test, preprocessed=True)
+    
+    print("\n📊 MÉTRICAS (test):")
+    print("-" * 40)
+    print(f"  {'':14} {'Original':>9} {'Comprimido':>11} {'Δ':>8}")
+    for key, name in [('hamming_loss', 'Hamming Loss'), ('f1_micro', 'F1 Micro'), ('f1_macro', 'F1 Macro')]:
+        delta = metrics_compressed[key] - metrics_full[key]
+        print(f"  {name:14} {metrics_full[key]:9.4f} {metrics_compressed[key]:11.4f} {delta:+8.4f}")
+    
+    agreement = (metrics_full['y_pred'] == metrics_compressed['y_pred']).mean()
+    print(f"  Predicciones idénticas: {agreement:.1%}")
+    
+    print("\n✅ Compresión completada!")
+
+
+def run_server(args):
+    """Sirve el modelo con varios procesos worker (pre-fork)."""
+    print("=" * 50)
+    print("SERVIDOR DE CLASIFICACIÓN (PRE-FORK)")
+    print("=" * 50)
+    
+    model_path = args.model or MODEL_PATH
+    
+    if not os.path.exists(model_path):
+        print(f"\n❌ Error: No se encontró el modelo en {model_path}")
+        print("   Ejecute primero: python main.py train")
+        return
+    
+    # El modelo se carga una sola vez: los workers lo comparten tras el fork
+    classifier = MultiLabelClassifier(model_path)
+    server = PreforkServer(
+        classifier,
+        host=args.host,
+        port=args.port,
+        n_workers=args.workers,
+        max_batch_size=args.max_batch_size,
+        max_delay=args.max_delay
+    )
+    host, port = server.start()
+    
+    print(f"\n🖥️ Escuchando en {host}:{port}")
+    print(f"👷 Workers: {server.n_workers}")
+    print(f"📦 Micro-lotes: hasta {args.max_batch_size} textos o {args.max_delay * 1000:.1f} ms")
+    print('\n📨 Una petición JSON por línea: {"id": 1, "text": "..."}')
+    print("   Presione Ctrl+C para detener\n")
+    
+    server.serve_forever()
+
+
 def run_email_daemon(args):
     """Ejecuta el servidor de email para clasificación automática."""
     print("=" * 50)
@@ -138,8 +268,11 @@ def run_email_daemon(args):
         print("   3. Use esa contraseña con este script")
         return
     
-    # Cargar modelo
+    # Cargar modelo: los adjuntos de los emails procesados a la vez se
+    # clasifican juntos en micro-lotes
     classifier = MultiLabelClassifier(model_path)
+    scheduler = MicroBatchScheduler(classifier, args.max_batch_size, args.max_delay,
+                                    profile_name='email-batch')
     
     # Configurar handler de email
     handler = EmailHandler(
@@ -148,18 +281,37 @@ def run_email_daemon(args):
         imap_server=args.imap_server,
         smtp_server=args.smtp_server
     )
-    handler.set_classifier(classifier)
+    handler.set_classifier(scheduler)
     
     print(f"\n📧 Email: {args.email}")
     print(f"🖥️ IMAP: {args.imap_server}")
     print(f"📤 SMTP: {args.smtp_server}")
     print(f"⏱️ Intervalo: {args.interval}s")
+    print(f"📦 Micro-lotes: hasta {args.max_batch_size} textos o {args.max_delay * 1000:.1f} ms, "
+          f"{args.concurrency} emails a la vez")
     
     print("\n📨 Envíe un email con un documento adjunto (.txt, .pdf, .docx)")
     print("   a esta dirección para recibir la clasificación automática.\n")
     
     # Ejecutar daemon
-    handler.run_daemon(check_interval=args.interval)
+    try:
+        handler.run_daemon(check_interval=args.interval, concurrency=args.concurrency)
+    finally:
+        scheduler.close()
+
+
+def setup_instrumentation(args):
+    """Activa métricas y perfiles según las opciones globales (desactivados por defecto)."""
+    if args.metrics_port is not None or args.metrics_json:
+        metrics.enable()
+    if args.metrics_port is not None:
+        server = metrics.start_http_server(args.metrics_port)
+        host, port = server.server_address[:2]
+        print(f"📈 Métricas en http://{host}:{port}/metrics")
+    if args.metrics_json:
+        metrics.start_json_dumper(args.metrics_json, interval=args.metrics_interval)
+    if args.profile_dir:
+        metrics.enable_profiling(args.profile_dir)
 
 
 def main():
@@ -171,10 +323,22 @@ Ejemplos:
   python main.py train
   python main.py classify --text "Un robot viaja en el tiempo..."
   python main.py classify --file documento.txt
+  python main.py classify --batch doc1.txt doc2.pdf doc3.docx
+  python main.py compress --dtype int8
+  python main.py serve --workers 4 --port 8765
   python main.py email-daemon --email tu@gmail.com --password contraseña
+  python main.py --metrics-port 9100 email-daemon --email tu@gmail.com --password contraseña
         """
     )
     
+    # Opciones globales de instrumentación (antes del comando)
+    parser.add_argument('--metrics-port', type=int,
+                        help='Servir métricas Prometheus en este puerto (/metrics y /metrics.json)')
+    parser.add_argument('--metrics-json', help='Volcar las métricas en este archivo JSON')
+    parser.add_argument('--metrics-interval', type=float, default=60,
+                        help='Segundos entre volcados JSON (default: 60)')
+    parser.add_argument('--profile-dir', help='Guardar un perfil cProfile (.prof) por petición o micro-lote')
+    
     subparsers = parser.add_subparsers(dest='command', help='Comandos disponibles')
     
     # Comando: train
@@ -189,6 +353,37 @@ Ejemplos:
     classify_parser.add_argument('--text', help='Texto a clasificar')
     classify_parser.add_argument('--file', help='Archivo a clasificar (.txt, .pdf, .docx)')
     classify_parser.add_argument('--model', help='Ruta al modelo entrenado')
+    classify_parser.add_argument('--max-chars', type=int,
+                                 help='Máximo de caracteres a leer del archivo (default: todo)')
+    classify_parser.add_argument('--batch', nargs='+', metavar='FILE',
+                                 help='Varios archivos a clasificar en micro-lotes')
+    classify_parser.add_argument('--max-batch-size', type=int, default=32,
+                                 help='Máximo de textos por micro-lote con --batch (default: 32)')
+    classify_parser.add_argument('--max-delay', type=float, default=0.005,
+                                 help='Espera máxima para completar un lote, en segundos (default: 0.005)')
+    
+    # Comando: compress
+    compress_parser = subparsers.add_parser('compress', help='Comprimir modelo entrenado')
+    compress_parser.add_argument('--model', help='Ruta al modelo entrenado')
+    compress_parser.add_argument('--output', help='Ruta para guardar el modelo comprimido')
+    compress_parser.add_argument('--data', help='Ruta al dataset CSV (para comparar métricas)')
+    compress_parser.add_argument('--test-size', type=float, default=0.2,
+                                 help='Proporción de datos para test (default: 0.2)')
+    compress_parser.add_argument('--prune-ratio', type=float, default=0.01,
+                                 help='Poda características con peso < ratio × máximo (default: 0.01)')
+    compress_parser.add_argument('--dtype', choices=['int8', 'float16', 'float32'], default='int8',
+                                 help='Tipo de los pesos (default: int8)')
+    
+    # Comando: serve
+    serve_parser = subparsers.add_parser('serve', help='Servidor multi-proceso (pre-fork)')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Dirección de escucha')
+    serve_parser.add_argument('--port', type=int, default=8765, help='Puerto de escucha')
+    serve_parser.add_argument('--workers', type=int, help='Procesos worker (default: número de CPUs)')
+    serve_parser.add_argument('--max-batch-size', type=int, default=32,
+                              help='Máximo de textos por micro-lote (default: 32)')
+    serve_parser.add_argument('--max-delay', type=float, default=0.002,
+                              help='Espera máxima para completar un lote, en segundos (default: 0.002)')
+    serve_parser.add_argument('--model', help='Ruta al modelo entrenado')
     
     # Comando: email-daemon
     email_parser = subparsers.add_parser('email-daemon', help='Servidor de email')
@@ -198,17 +393,32 @@ Ejemplos:
     email_parser.add_argument('--smtp-server', default='smtp.gmail.com', help='Servidor SMTP')
     email_parser.add_argument('--interval', type=int, default=60, help='Intervalo de revisión (seg)')
     email_parser.add_argument('--model', help='Ruta al modelo entrenado')
+    email_parser.add_argument('--concurrency', type=int, default=4,
+                              help='Emails procesados a la vez (default: 4)')
+    email_parser.add_argument('--max-batch-size', type=int, default=32,
+                              help='Máximo de textos por micro-lote (default: 32)')
+    email_parser.add_argument('--max-delay', type=float, default=0.005,
+                              help='Espera máxima para completar un lote, en segundos (default: 0.005)')
     
     args = parser.parse_args()
+    setup_instrumentation(args)
     
     if args.command == 'train':
         train_model(args)
     elif args.command == 'classify':
         classify_text(args)
+    elif args.command == 'compress':
+        compress_model(args)
+    elif args.command == 'serve':
+        run_server(args)
     elif args.command == 'email-daemon':
         run_email_daemon(args)
     else:
         parser.print_help()
+    
+    # Último volcado al terminar (los comandos cortos no llegan al siguiente intervalo)
+    if args.metrics_json:
+        metrics.dump_json(args.metrics_json)
 
 
 if __name__ == "__main__":
@@ -2,13 +2,34 @@
 Paquete src para clasificación multi-etiqueta de documentos.
 """
 
+import importlib
+
 from .model import MultiLabelClassifier
 from .document_handler import extract_text_from_file, extract_from_bytes
 from .email_handler import EmailHandler
 
+# serving y batching se importan al pedirlos: también se ejecutan como
+# `python -m src.serving` y `python -m src.batching`, y si el paquete ya
+# los hubiera importado runpy avisaría con un RuntimeWarning
+_LAZY = {
+    'PreforkServer': 'serving',
+    'ServingClient': 'serving',
+    'MicroBatchScheduler': 'batching',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module = importlib.import_module(f'.{_LAZY[name]}', __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     'MultiLabelClassifier',
     'extract_text_from_file',
     'extract_from_bytes',
-    'EmailHandler'
+    'EmailHandler',
+    'PreforkServer',
+    'ServingClient',
+    'MicroBatchScheduler'
 ]
@@ -0,0 +1,269 @@
+"""
+Módulo de micro-lotes dinámicos para el clasificador.
+
+Las peticiones llegan de una en una (email, CLI, servidores), pero
+vectorizar y puntuar N textos de golpe cuesta mucho menos por texto que
+N llamadas a predict(). MicroBatchScheduler recoge las peticiones
+concurrentes durante unos milisegundos (o hasta N textos), las clasifica
+con una sola llamada a predict_batch() y resuelve el Future de cada una.
+
+Con las métricas activadas (src.metrics), cada lote publica los
+histogramas scheduler_batch_size y scheduler_queue_delay_seconds. Con
+enable_profiling(), cada lote se perfila en el hilo del planificador, que
+es donde se ejecuta el modelo.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .model import MultiLabelClassifier
+from . import metrics
+
+
+# Marca de cierre para el hilo del planificador
+_STOP = object()
+
+
+class MicroBatchScheduler:
+    """Planificador de micro-lotes delante de un MultiLabelClassifier."""
+
+    def __init__(
+        self,
+        classifier: MultiLabelClassifier,
+        max_batch_size: int = 32,
+        max_delay: float = 0.005,
+        metrics_window: int = 10000,
+        profile_name: str = 'batch'
+    ):
+        """
+        Inicializa el planificador y arranca su hilo.
+
+        Args:
+            classifier: Clasificador ya entrenado o cargado
+            max_batch_size: Máximo de textos por llamada a predict_batch
+            max_delay: Segundos que se espera a completar un lote desde que
+                llega su primera petición
+            metrics_window: Esperas en cola que se guardan para los percentiles
+            profile_name: Prefijo de los .prof de cada lote (con enable_profiling)
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size debe ser >= 1: {max_batch_size}")
+        if max_delay < 0:
+            raise ValueError(f"max_delay debe ser >= 0: {max_delay}")
+        if not classifier.is_fitted:
+            raise ValueError("El modelo no ha sido entrenado.")
+
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.profile_name = profile_name
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._batch_sizes = Counter()
+        self._queue_delays = deque(maxlen=metrics_window)
+        self._n_requests = 0
+        self._n_errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="MicroBatchScheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Encola un texto para clasificar.
+
+        Args:
+            text: Texto a clasificar
+
+        Returns:
+            Future que se resuelve con el diccionario de predict()
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El planificador está cerrado.")
+            self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def predict(self, text: str, timeout: Optional[float] = None) -> dict:
+        """
+        Igual que MultiLabelClassifier.predict, pero pasando por un lote.
+
+        Permite usar el planificador donde se espera un clasificador
+        (p. ej. EmailHandler.set_classifier).
+        """
+        return self.submit(text).result(timeout)
+
+    def predict_many(self, texts: List[str], timeout: Optional[float] = None) -> List[Dict]:
+        """Encola varios textos y devuelve sus resultados en orden."""
+        futures = [self.submit(text) for text in texts]
+        return [future.result(timeout) for future in futures]
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.classifier.is_fitted
+
+    def _collect_batch(self) -> list:
+        """Espera la primera petición y reúne más hasta llenar el lote o agotar max_delay."""
+        first = self._queue.get()
+        if first is _STOP:
+            return [first]
+
+        batch = [first]
+        deadline = first[2] + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Lo que ya está en cola entra aunque se haya agotado el plazo
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is _STOP:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
+
+            if batch:
+                self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: list):
+        start = time.perf_counter()
+        # Se descartan las peticiones cuyo Future se canceló mientras esperaban
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            with metrics.profile_request(self.profile_name):
+                results = self.classifier.predict_batch([text for text, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            n_errors = len(batch)
+        else:
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+            n_errors = 0
+
+        with self._lock:
+            self._n_requests += len(batch)
+            self._n_errors += n_errors
+            self._batch_sizes[len(batch)] += 1
+            self._queue_delays.extend(start - submitted for _, _, submitted in batch)
+
+        metrics.observe('scheduler_batch_size', len(batch), buckets=metrics.BATCH_SIZE_BUCKETS)
+        for _, _, submitted in batch:
+            metrics.observe('scheduler_queue_delay_seconds', start - submitted)
+        metrics.inc('scheduler_requests_total', len(batch))
+        if n_errors:
+            metrics.inc('scheduler_errors_total', n_errors)
+
+    def metrics(self) -> dict:
+        """
+        Métricas acumuladas desde el inicio.
+
+        Returns:
+            Diccionario con peticiones, lotes, tamaño medio de lote,
+            histograma de tamaños y espera en cola (media, p50, p95, máx, en s)
+        """
+        with self._lock:
+            batch_sizes = dict(sorted(self._batch_sizes.items()))
+            delays = np.array(self._queue_delays)
+            n_requests, n_errors = self._n_requests, self._n_errors
+
+        n_batches = sum(batch_sizes.values())
+        result = {
+            'requests': n_requests,
+            'errors': n_errors,
+            'batches': n_batches,
+            'mean_batch_size': n_requests / n_batches if n_batches else 0.0,
+            'batch_sizes': batch_sizes,
+            'queue_delay_mean': 0.0,
+            'queue_delay_p50': 0.0,
+            'queue_delay_p95': 0.0,
+            'queue_delay_max': 0.0,
+        }
+        if len(delays):
+            p50, p95 = np.percentile(delays, [50, 95])
+            result.update(queue_delay_mean=float(delays.mean()), queue_delay_p50=float(p50),
+                          queue_delay_p95=float(p95), queue_delay_max=float(delays.max()))
+        return result
+
+    def close(self, wait: bool = True):
+        """Deja de aceptar peticiones; las ya encoladas se procesan antes de parar."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if wait:
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pandas as pd
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="Benchmark del planificador de micro-lotes")
+    parser.add_argument('--model', default=os.path.join(base_dir, "models", "multilabel_classifier.pkl"))
+    parser.add_argument('--data', default=os.path.join(base_dir, "data", "documents.csv"),
+                        help='CSV con textos de ejemplo')
+    parser.add_argument('--threads', type=int, default=16, help='Peticiones concurrentes')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-delay', type=float, default=0.005)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        raise SystemExit(f"No se encontró el modelo en {args.model}. Ejecute: python main.py train")
+
+    classifier = MultiLabelClassifier(args.model)
+    texts = pd.read_csv(args.data)['text'].tolist()
+    requests = [texts[i % len(texts)] for i in range(args.requests)]
+
+    print(f"\n--- {args.requests} peticiones desde {args.threads} hilos ---")
+    with ThreadPoolExecutor(args.threads) as pool:
+        start = time.perf_counter()
+        list(pool.map(classifier.predict, requests))
+        direct = time.perf_counter() - start
+    print(f"predict() directo:   {args.requests / direct:8.0f} textos/s")
+
+    with MicroBatchScheduler(classifier, args.max_batch_size, args.max_delay) as scheduler, \
+            ThreadPoolExecutor(args.threads) as pool:
+        start = time.perf_counter()
+        list(pool.map(scheduler.predict, requests))
+        batched = time.perf_counter() - start
+        stats = scheduler.metrics()
+    print(f"MicroBatchScheduler: {args.requests / batched:8.0f} textos/s ({direct / batched:.1f}x)")
+    print(f"  Lotes: {stats['batches']}, tamaño medio {stats['mean_batch_size']:.1f}")
+    print(f"  Espera en cola: media {stats['queue_delay_mean'] * 1000:.2f} ms, "
+          f"p95 {stats['queue_delay_p95'] * 1000:.2f} ms, máx {stats['queue_delay_max'] * 1000:.2f} ms")
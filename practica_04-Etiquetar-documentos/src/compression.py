@@ -0,0 +1,162 @@
+"""
+Módulo de compresión del modelo multi-etiqueta.
+Poda el vocabulario y cuantiza los coeficientes para obtener un modelo
+pequeño que se carga igual que el original (MultiLabelClassifier.load).
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+# Tipos de cuantización soportados
+QUANTIZE_DTYPES = ('int8', 'float16', 'float32')
+
+
+class QuantizedLinearClassifier:
+    """
+    Sustituto ligero de OneVsRestClassifier(LogisticRegression).
+
+    Guarda solo los pesos (cuantizados) de cada etiqueta y expone
+    predict_proba/predict con la misma forma de salida, así que el
+    resto de MultiLabelClassifier lo usa sin cambios.
+    """
+
+    def __init__(self, weights: np.ndarray, scales: np.ndarray, intercept: np.ndarray):
+        """
+        Args:
+            weights: Pesos (n_features, n_labels) en int8, float16 o float32
+            scales: Escala por etiqueta (n_labels,): peso real = weights * scales
+            intercept: Término independiente por etiqueta (n_labels,)
+        """
+        self.weights = weights
+        self.scales = scales.astype(np.float32)
+        self.intercept = intercept.astype(np.float32)
+
+    def decision_function(self, X) -> np.ndarray:
+        """
+        Args:
+            X: Matriz TF-IDF dispersa (n_samples, n_features)
+
+        Returns:
+            Puntuaciones (n_samples, n_labels)
+        """
+        # Se acumula en float32 y se aplica la escala al final: una
+        # multiplicación por etiqueta en vez de descuantizar toda la matriz
+        scores = X @ self.weights.astype(np.float32, copy=False)
+        return np.asarray(scores) * self.scales + self.intercept
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Probabilidad de cada etiqueta (sigmoide, como LogisticRegression)."""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+
+    def predict(self, X) -> np.ndarray:
+        """Etiquetas 0/1 con umbral 0.5 (como OneVsRestClassifier)."""
+        return (self.decision_function(X) > 0).astype(int)
+
+    @property
+    def n_features(self) -> int:
+        return self.weights.shape[0]
+
+
+def _stack_coefficients(classifier) -> Tuple[np.ndarray, np.ndarray]:
+    """Coeficientes (n_labels, n_features) e intercepts de un OneVsRestClassifier."""
+    coef = np.vstack([est.coef_.ravel() for est in classifier.estimators_])
+    intercept = np.array([est.intercept_[0] for est in classifier.estimators_])
+    return coef, intercept
+
+
+def quantize(coef: np.ndarray, dtype: str = 'int8') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cuantiza coeficientes con una escala por etiqueta.
+
+    Args:
+        coef: Coeficientes (n_labels, n_features)
+        dtype: 'int8' (escala = máximo absoluto / 127), 'float16' o 'float32'
+
+    Returns:
+        (pesos (n_features, n_labels) en dtype, escalas (n_labels,))
+    """
+    if dtype not in QUANTIZE_DTYPES:
+        raise ValueError(f"dtype no soportado: {dtype}. Use {', '.join(QUANTIZE_DTYPES)}")
+
+    if dtype != 'int8':
+        return np.ascontiguousarray(coef.T, dtype=dtype), np.ones(coef.shape[0])
+
+    max_abs = np.abs(coef).max(axis=1)
+    scales = np.where(max_abs > 0, max_abs / 127.0, 1.0)
+    weights = np.clip(np.round(coef / scales[:, None]), -127, 127).astype(np.int8)
+    return np.ascontiguousarray(weights.T), scales
+
+
+def prune_features(coef: np.ndarray, prune_ratio: float) -> np.ndarray:
+    """
+    Índices de las características que se conservan.
+
+    Una característica se elimina si su peso es despreciable para TODAS las
+    etiquetas: menor que prune_ratio × el mayor peso absoluto de cada etiqueta.
+    Con int8 y prune_ratio <= 1/254 se eliminan justo las que se cuantizarían a 0.
+
+    Las características podadas tampoco cuentan en la normalización L2 del
+    TF-IDF: las probabilidades cambian algo más que por quitar sus pesos,
+    por eso `main.py compress` informa de la diferencia de métricas.
+
+    Args:
+        coef: Coeficientes (n_labels, n_features)
+        prune_ratio: Fracción del peso máximo de cada etiqueta
+
+    Returns:
+        Índices ordenados de las características conservadas
+    """
+    if not 0 <= prune_ratio < 1:
+        raise ValueError(f"prune_ratio debe estar en [0, 1): {prune_ratio}")
+
+    max_abs = np.abs(coef).max(axis=1, keepdims=True)
+    relevant = np.abs(coef) >= prune_ratio * max_abs
+    return np.flatnonzero(relevant.any(axis=0))
+
+
+def prune_vectorizer(vectorizer, keep: np.ndarray):
+    """
+    Copia del TfidfVectorizer con solo las características de keep.
+
+    No se copia stop_words_ (los términos descartados por max_features, que
+    no se usan para transformar). Las stopwords del idioma sí se conservan:
+    hacen falta para formar los bigramas igual que en el entrenamiento.
+
+    Args:
+        vectorizer: TfidfVectorizer entrenado
+        keep: Índices de las características a conservar
+
+    Returns:
+        Nuevo TfidfVectorizer entrenado con el vocabulario reducido
+    """
+    terms = vectorizer.get_feature_names_out()[keep]
+    params = vectorizer.get_params()
+    params.update(vocabulary={term: i for i, term in enumerate(terms)}, dtype=np.float32)
+
+    # Con vocabulario fijo, fit solo prepara el vectorizador (no calcula
+    # stop_words_); el idf se copia después del original
+    pruned = type(vectorizer)(**params).fit([''])
+    pruned.idf_ = vectorizer.idf_[keep].astype(np.float32)
+    return pruned
+
+
+def compress_model(vectorizer, classifier, prune_ratio: float = 0.01,
+                   dtype: str = 'int8') -> tuple:
+    """
+    Poda y cuantiza un modelo TF-IDF + OneVsRestClassifier(LogisticRegression).
+
+    Args:
+        vectorizer: TfidfVectorizer entrenado
+        classifier: OneVsRestClassifier entrenado
+        prune_ratio: Umbral relativo de poda (0 = no podar)
+        dtype: Tipo de los pesos cuantizados ('int8', 'float16', 'float32')
+
+    Returns:
+        (vectorizer podado, QuantizedLinearClassifier)
+    """
+    coef, intercept = _stack_coefficients(classifier)
+    keep = prune_features(coef, prune_ratio)
+    weights, scales = quantize(coef[:, keep], dtype)
+    return prune_vectorizer(vectorizer, keep), QuantizedLinearClassifier(weights, scales, intercept)
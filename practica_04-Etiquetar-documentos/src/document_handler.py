@@ -3,16 +3,42 @@ Módulo para manejo de documentos.
 Extrae texto de archivos .txt, .pdf, .docx
 """
 
+import codecs
+import io
+import mmap
 import os
 from typing import Optional
 
+from . import metrics
 
-def extract_text_from_file(file_path: str) -> str:
+
+# Archivos a partir de este tamaño se mapean en memoria en vez de leerse
+MMAP_THRESHOLD = 1024 * 1024
+# Bytes que se decodifican en cada paso
+CHUNK_SIZE = 64 * 1024
+# Bytes por carácter en la primera lectura con max_chars (UTF-8 y UTF-32;
+# si no llegan, p. ej. CRLF en UTF-32, se sigue leyendo)
+MAX_BYTES_PER_CHAR = 4
+
+# El BOM de UTF-32 LE empieza igual que el de UTF-16 LE: va primero
+_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+# latin-1 decodifica cualquier byte: es el último recurso si no es UTF-8
+FALLBACK_ENCODING = 'latin-1'
+
+
+def extract_text_from_file(file_path: str, max_chars: Optional[int] = None) -> str:
     """
     Extrae texto de un archivo según su extensión.
     
     Args:
         file_path: Ruta al archivo
+        max_chars: Máximo de caracteres a extraer (None = todo el texto)
         
     Returns:
         Texto extraído del archivo
@@ -22,49 +48,151 @@ def extract_text_from_file(file_path: str) -> str:
     
     ext = os.path.splitext(file_path)[1].lower()
     
-    if ext == '.txt':
-        return extract_from_txt(file_path)
-    elif ext == '.pdf':
-        return extract_from_pdf(file_path)
-    elif ext == '.docx':
-        return extract_from_docx(file_path)
-    else:
-        raise ValueError(f"Extensión no soportada: {ext}. Use .txt, .pdf o .docx")
+    with metrics.timer('document_extract_seconds', {'ext': ext}):
+        if ext == '.txt':
+            text = extract_from_txt(file_path, max_chars)
+        elif ext == '.pdf':
+            text = extract_from_pdf(file_path, max_chars)
+        elif ext == '.docx':
+            text = extract_from_docx(file_path, max_chars)
+        else:
+            raise ValueError(f"Extensión no soportada: {ext}. Use .txt, .pdf o .docx")
+    
+    metrics.inc('document_extract_chars_total', len(text), {'ext': ext})
+    return text
+
+
+def extract_from_txt(file_path: str, max_chars: Optional[int] = None) -> str:
+    """
+    Extrae texto de un archivo .txt leyéndolo una sola vez.
+    
+    Los archivos grandes se mapean en memoria (mmap): solo se cargan las
+    páginas que se llegan a decodificar. Con max_chars se leen solo los
+    bytes necesarios para ese número de caracteres (o hasta el final).
+    
+    Args:
+        file_path: Ruta al archivo
+        max_chars: Máximo de caracteres a extraer (None = todo el texto)
+        
+    Returns:
+        Texto extraído del archivo
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            if max_chars is None:
+                return decode_text(f.read())
+            # +1 carácter por el BOM
+            data = f.read((max_chars + 1) * MAX_BYTES_PER_CHAR)
+            while True:
+                at_eof = f.tell() >= size
+                text = decode_text(data, max_chars, final=at_eof)
+                if at_eof or len(text) >= max_chars:
+                    return text
+                # Faltan caracteres (un CRLF en UTF-32 son 8 bytes): el doble
+                data += f.read(len(data))
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return decode_text(view, max_chars)
+
+
+def detect_encoding(data: bytes) -> Optional[str]:
+    """
+    Detecta la codificación por el BOM (marca de orden de bytes).
+    
+    Args:
+        data: Contenido (bytes, bytearray o memoryview)
+        
+    Returns:
+        Codificación (que ya descarta el BOM al decodificar) o None si no hay BOM
+    """
+    head = bytes(data[:4])
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def decode_text(data: bytes, max_chars: Optional[int] = None, final: bool = True) -> str:
+    """
+    Decodifica bytes a texto en una sola pasada sobre el mismo buffer.
+    
+    Sin BOM se intenta UTF-8 (la decodificación es a la vez la comprobación
+    de validez); si aparece un byte inválido se vuelve a empezar con
+    FALLBACK_ENCODING, pero desde memoria, sin releer el archivo. Los saltos
+    de línea se normalizan a '\\n', como al abrir el archivo en modo texto.
+    
+    Args:
+        data: Contenido (bytes, bytearray o memoryview)
+        max_chars: Máximo de caracteres a devolver (None = todo el texto)
+        final: False si data es solo el principio del contenido (puede
+            acabar a mitad de un carácter)
+        
+    Returns:
+        Texto decodificado
+    """
+    if max_chars is not None and max_chars < 0:
+        raise ValueError(f"max_chars debe ser >= 0: {max_chars}")
+    
+    encoding = detect_encoding(data)
+    if encoding is not None:
+        return _decode_incremental(data, encoding, max_chars, final)
+    
+    try:
+        return _decode_incremental(data, 'utf-8', max_chars, final)
+    except UnicodeDecodeError:
+        return _decode_incremental(data, FALLBACK_ENCODING, max_chars, final)
 
 
-def extract_from_txt(file_path: str) -> str:
-    """Extrae texto de un archivo .txt"""
-    encodings = ['utf-8', 'latin-1', 'cp1252']
+def _decode_incremental(data: bytes, encoding: str, max_chars: Optional[int], final: bool) -> str:
+    """Decodifica por bloques de CHUNK_SIZE y se detiene al llegar a max_chars."""
+    decoder = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(encoding)(errors='strict'),
+        translate=True
+    )
+    view = memoryview(data)
+    pieces = []
+    n_chars = 0
     
-    for encoding in encodings:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                return f.read()
-        except UnicodeDecodeError:
-            continue
+    for start in range(0, len(view), CHUNK_SIZE):
+        piece = decoder.decode(view[start:start + CHUNK_SIZE])
+        pieces.append(piece)
+        n_chars += len(piece)
+        if max_chars is not None and n_chars > max_chars:
+            break
+    else:
+        pieces.append(decoder.decode(b'', final=final))
     
-    raise ValueError(f"No se pudo decodificar el archivo: {file_path}")
+    view.release()
+    text = ''.join(pieces)
+    return text if max_chars is None else text[:max_chars]
 
 
-def extract_from_pdf(file_path: str) -> str:
-    """Extrae texto de un archivo .pdf"""
+def extract_from_pdf(file_path: str, max_chars: Optional[int] = None) -> str:
+    """Extrae texto de un archivo .pdf (deja de leer páginas al llegar a max_chars)"""
     try:
         from PyPDF2 import PdfReader
     except ImportError:
         raise ImportError("Instale PyPDF2: pip install PyPDF2")
     
     reader = PdfReader(file_path)
-    text = ""
+    pages = []
+    n_chars = 0
     
     for page in reader.pages:
         page_text = page.extract_text()
         if page_text:
-            text += page_text + "\n"
+            pages.append(page_text)
+            n_chars += len(page_text) + 1
+            if max_chars is not None and n_chars > max_chars:
+                break
     
-    return text.strip()
+    text = "\n".join(pages).strip()
+    return text if max_chars is None else text[:max_chars]
 
 
-def extract_from_docx(file_path: str) -> str:
+def extract_from_docx(file_path: str, max_chars: Optional[int] = None) -> str:
     """Extrae texto de un archivo .docx"""
     try:
         from docx import Document
@@ -73,16 +201,21 @@ def extract_from_docx(file_path: str) -> str:
     
     doc = Document(file_path)
     paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
-    return "\n".join(paragraphs)
+    text = "\n".join(paragraphs)
+    return text if max_chars is None else text[:max_chars]
 
 
-def extract_from_bytes(content: bytes, filename: str) -> str:
+def extract_from_bytes(content: bytes, filename: str, max_chars: Optional[int] = None) -> str:
     """
     Extrae texto de contenido en bytes (para adjuntos de email).
     
+    Los .txt se decodifican directamente desde memoria; .pdf y .docx
+    pasan por un archivo temporal porque sus librerías leen de disco.
+    
     Args:
         content: Contenido del archivo en bytes
         filename: Nombre del archivo para determinar el tipo
+        max_chars: Máximo de caracteres a extraer (None = todo el texto)
         
     Returns:
         Texto extraído
@@ -91,12 +224,18 @@ def extract_from_bytes(content: bytes, filename: str) -> str:
     
     ext = os.path.splitext(filename)[1].lower()
     
+    if ext == '.txt':
+        with metrics.timer('document_extract_seconds', {'ext': ext}):
+            text = decode_text(content, max_chars)
+        metrics.inc('document_extract_chars_total', len(text), {'ext': ext})
+        return text
+    
     with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
         tmp.write(content)
         tmp_path = tmp.name
     
     try:
-        text = extract_text_from_file(tmp_path)
+        text = extract_text_from_file(tmp_path, max_chars)
     finally:
         os.unlink(tmp_path)
     
@@ -14,6 +14,7 @@ from typing import List, Dict, Optional, Tuple
 
 from .model import MultiLabelClassifier
 from .document_handler import extract_from_bytes
+from . import metrics
 
 
 class EmailHandler:
@@ -53,7 +54,7 @@ class EmailHandler:
         self.classifier = None
     
     def set_classifier(self, classifier: MultiLabelClassifier):
-        """Establece el clasificador a usar."""
+        """Establece el clasificador a usar (o un MicroBatchScheduler delante de él)."""
         self.classifier = classifier
     
     def connect_imap(self):
@@ -95,6 +96,13 @@ class EmailHandler:
         Returns:
             Lista de diccionarios con información del email y adjuntos
         """
+        with metrics.timer('imap_fetch_seconds'):
+            emails = self._fetch_unread_emails_with_attachments()
+        metrics.inc('emails_fetched_total', len(emails))
+        return emails
+    
+    def _fetch_unread_emails_with_attachments(self) -> List[Dict]:
+        """Búsqueda y descarga IMAP de get_unread_emails_with_attachments."""
         if not self.imap_connection:
             self.connect_imap()
         
@@ -163,36 +171,82 @@ class EmailHandler:
         if not self.classifier:
             raise ValueError("No se ha establecido un clasificador")
         
+        # Perfila este hilo (extracción y SMTP); con un MicroBatchScheduler el
+        # modelo corre en el hilo del planificador, que tiene sus propios .prof
+        with metrics.profile_request('email'), metrics.timer('email_process_seconds'):
+            self._process_and_reply(email_data)
+        
+        metrics.inc('emails_processed_total')
+        return True
+    
+    def _process_and_reply(self, email_data: Dict):
+        """Clasificación de los adjuntos y envío de la respuesta de process_and_reply."""
         results = []
+        texts = []
         
+        # Extraer primero todos los textos para clasificarlos juntos
         for attachment in email_data['attachments']:
             try:
-                # Extraer texto
                 text = extract_from_bytes(
                     attachment['content'],
                     attachment['filename']
                 )
-                
-                # Clasificar
-                prediction = self.classifier.predict(text)
-                
-                results.append({
-                    'filename': attachment['filename'],
-                    'labels': prediction['labels'],
-                    'probabilities': prediction['probabilities'],
-                    'text_preview': text[:200] + "..." if len(text) > 200 else text
-                })
+                results.append({'filename': attachment['filename']})
+                texts.append(text)
             except Exception as e:
+                metrics.inc('attachment_errors_total')
                 results.append({
                     'filename': attachment['filename'],
                     'error': str(e)
                 })
+                texts.append(None)
+        
+        # Clasificar
+        predictions = self._classify_many([text for text in texts if text is not None])
+        for result, text in zip(results, texts):
+            if text is None:
+                continue
+            prediction = next(predictions)
+            if isinstance(prediction, Exception):
+                metrics.inc('attachment_errors_total')
+                result['error'] = str(prediction)
+                continue
+            result.update({
+                'labels': prediction['labels'],
+                'probabilities': prediction['probabilities'],
+                'text_preview': text[:200] + "..." if len(text) > 200 else text
+            })
+            metrics.inc('attachments_processed_total')
         
         # Crear y enviar respuesta
         reply_body = self._format_reply(results)
         self._send_reply(email_data['from'], email_data['subject'], reply_body)
+    
+    def _classify_many(self, texts: List[str]):
+        """
+        Clasifica varios textos de una vez.
         
-        return True
+        Con un MicroBatchScheduler se encolan todos antes de esperar, de modo
+        que entran en el mismo lote (junto con los de otros emails que se
+        estén procesando a la vez). Con un MultiLabelClassifier se usa
+        predict_batch.
+        
+        Returns:
+            Iterador con la predicción (o la excepción) de cada texto, en orden
+        """
+        if hasattr(self.classifier, 'submit'):
+            futures = [self.classifier.submit(text) for text in texts]
+            for future in futures:
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield e
+        else:
+            try:
+                yield from self.classifier.predict_batch(texts)
+            except Exception as e:
+                for _ in texts:
+                    yield e
     
     def _format_reply(self, results: List[Dict]) -> str:
         """Formatea los resultados de clasificación para el email de respuesta."""
@@ -241,25 +295,33 @@ class EmailHandler:
         
         msg.attach(MIMEText(body, 'plain', 'utf-8'))
         
-        with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-            server.starttls()
-            server.login(self.email_address, self.password)
-            server.send_message(msg)
+        with metrics.timer('smtp_send_seconds'):
+            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                server.starttls()
+                server.login(self.email_address, self.password)
+                server.send_message(msg)
+        metrics.inc('emails_sent_total')
         
         print(f"Respuesta enviada a: {to_addr}")
     
-    def run_daemon(self, check_interval: int = 60):
+    def run_daemon(self, check_interval: int = 60, concurrency: int = 1):
         """
         Ejecuta el manejador como demonio, revisando emails periódicamente.
         
         Args:
             check_interval: Intervalo en segundos entre revisiones
+            concurrency: Emails que se procesan a la vez. Con más de uno y un
+                MicroBatchScheduler como clasificador, los adjuntos de varios
+                emails se clasifican en el mismo lote
         """
         import time
+        from concurrent.futures import ThreadPoolExecutor
         
         print(f"Iniciando demonio de email (revisar cada {check_interval}s)")
         print("Presione Ctrl+C para detener\n")
         
+        pool = ThreadPoolExecutor(concurrency, thread_name_prefix='email') if concurrency > 1 else None
+        
         try:
             while True:
                 print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Revisando emails...")
@@ -272,11 +334,17 @@ class EmailHandler:
                         
                         for email_data in emails:
                             print(f"  Procesando: {email_data['subject']}")
-                            self.process_and_reply(email_data)
+                        if pool is None:
+                            for email_data in emails:
+                                self.process_and_reply(email_data)
+                        else:
+                            # list() propaga aquí el primer error, como en el caso secuencial
+                            list(pool.map(self.process_and_reply, emails))
                     else:
                         print("No hay emails nuevos con adjuntos")
                         
                 except Exception as e:
+                    metrics.inc('email_daemon_errors_total')
                     print(f"Error: {e}")
                     # Reconectar si hay error de conexión
                     self.disconnect_imap()
@@ -286,6 +354,9 @@ class EmailHandler:
         except KeyboardInterrupt:
             print("\n\nDeteniendo demonio...")
             self.disconnect_imap()
+        finally:
+            if pool is not None:
+                pool.shutdown()
 
 
 if __name__ == "__main__":
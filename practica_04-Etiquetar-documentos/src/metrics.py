@@ -0,0 +1,495 @@
+"""
+Módulo de instrumentación: contadores, histogramas de duración y perfiles.
+
+Desactivado por defecto. Mientras lo está, timer() devuelve siempre el
+mismo contexto vacío e inc() retorna en la primera línea: el coste en el
+camino caliente es una llamada a función y una comprobación de un booleano.
+
+Uso:
+    from src import metrics
+
+    metrics.enable()
+    with metrics.timer('model_vectorize_seconds'):
+        X = vectorizer.transform(texts)
+    metrics.inc('predictions_total', len(texts))
+
+    print(metrics.render_prometheus())      # formato de texto de Prometheus
+    metrics.start_http_server(9100)         # GET /metrics y /metrics.json
+    metrics.start_json_dumper('metrics.json', interval=30)
+
+Varios procesos (servidor pre-fork): cada worker vuelca su registro en
+un directorio común (set_multiprocess_dir + dump_process) y el padre suma
+esos archivos a sus métricas al exportarlas, como el modo multiproceso
+del cliente oficial de Prometheus.
+
+Perfiles por petición (cProfile): con enable_profiling(dir), cada bloque
+`with metrics.profile_request('classify'):` guarda un .prof en dir, que se
+puede abrir con `python -m pstats` o snakeviz. Las fases instrumentadas
+son funciones normales, así que también aparecen con nombre en py-spy.
+"""
+
+import bisect
+import cProfile
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+
+# Límites de los buckets de duración (segundos), como los de los clientes de Prometheus
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Buckets para tamaños de lote (número de textos por llamada a predict_batch)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+_enabled = False
+_profile_dir = None
+_multiprocess_dir = None
+_multiprocess_lock = threading.Lock()
+
+
+class Counter:
+    """Contador monótono."""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1.0):
+        with self._lock:
+            self.value += value
+
+
+class Histogram:
+    """Histograma con buckets acumulativos (estilo Prometheus); por defecto, de duraciones."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # el último es +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def merge(self, snapshot: dict):
+        """Suma al histograma un snapshot() con los mismos buckets (p. ej. de otro proceso)."""
+        cumulative = list(snapshot['buckets'].values())
+        if len(cumulative) != len(self.counts):
+            raise ValueError("Los buckets del snapshot no coinciden con los del histograma")
+        counts = [c - previous for c, previous in zip(cumulative, [0] + cumulative[:-1])]
+        with self._lock:
+            for i, c in enumerate(counts):
+                self.counts[i] += c
+            self.sum += snapshot['sum']
+            self.count += snapshot['count']
+
+    def snapshot(self) -> dict:
+        """Copia coherente de los valores (buckets acumulados)."""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative, acc = [], 0
+        for c in counts:
+            acc += c
+            cumulative.append(acc)
+        return {
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], cumulative)),
+            'sum': total,
+            'count': count,
+        }
+
+
+class MetricsRegistry:
+    """Conjunto de métricas identificadas por nombre + etiquetas."""
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Optional[Dict[str, str]]) -> tuple:
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+    def counter(self, name: str, labels: Optional[Dict[str, str]] = None) -> Counter:
+        key = self._key(name, labels)
+        metric = self._counters.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._counters.setdefault(key, Counter())
+        return metric
+
+    def histogram(self, name: str, labels: Optional[Dict[str, str]] = None,
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Histograma `name`; buckets solo se usa la primera vez que se crea."""
+        key = self._key(name, labels)
+        metric = self._histograms.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._histograms.get(key)
+                if metric is None:
+                    metric = self._histograms[key] = Histogram(buckets)
+        return metric
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def merge(self, data: dict):
+        """Suma a este registro las métricas de un to_dict() (p. ej. de otro proceso)."""
+        for c in data['counters']:
+            self.counter(c['name'], c['labels']).inc(c['value'])
+        for h in data['histograms']:
+            buckets = tuple(float(b) for b in h['buckets'] if b != '+Inf')
+            self.histogram(h['name'], h['labels'], buckets).merge(h)
+
+    def to_dict(self) -> dict:
+        """Todas las métricas como diccionario serializable a JSON."""
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = list(self._histograms.items())
+        return {
+            'timestamp': time.time(),
+            'counters': [{'name': name, 'labels': dict(labels), 'value': c.value}
+                         for (name, labels), c in sorted(counters, key=lambda item: item[0])],
+            'histograms': [{'name': name, 'labels': dict(labels), **h.snapshot()}
+                           for (name, labels), h in sorted(histograms, key=lambda item: item[0])],
+        }
+
+    def render_prometheus(self) -> str:
+        """Métricas en el formato de texto de Prometheus (versión 0.0.4)."""
+        return _render_prometheus(self.to_dict())
+
+
+def _render_prometheus(data: dict) -> str:
+    lines = []
+    declared = set()
+
+    for c in data['counters']:
+        if c['name'] not in declared:
+            lines.append(f"# TYPE {c['name']} counter")
+            declared.add(c['name'])
+        lines.append(f"{c['name']}{_format_labels(c['labels'])} {c['value']:g}")
+
+    for h in data['histograms']:
+        name = h['name']
+        if name not in declared:
+            lines.append(f"# TYPE {name} histogram")
+            declared.add(name)
+        for bound, count in h['buckets'].items():
+            labels = _format_labels({**h['labels'], 'le': bound})
+            lines.append(f"{name}_bucket{labels} {count}")
+        lines.append(f"{name}_sum{_format_labels(h['labels'])} {h['sum']:.6f}")
+        lines.append(f"{name}_count{_format_labels(h['labels'])} {h['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+# Registro global del proceso
+REGISTRY = MetricsRegistry()
+
+
+# ============================================================
+# API DE INSTRUMENTACIÓN
+# ============================================================
+def enable():
+    """Activa la recogida de métricas."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Desactiva la recogida de métricas (las ya recogidas se conservan)."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+class _NullTimer:
+    """Contexto vacío que se devuelve mientras las métricas están desactivadas."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+def timer(name: str, labels: Optional[Dict[str, str]] = None):
+    """
+    Contexto que mide la duración del bloque en el histograma `name`.
+
+    Args:
+        name: Nombre de la métrica (p. ej. 'model_vectorize_seconds')
+        labels: Etiquetas opcionales (p. ej. {'ext': '.pdf'})
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(REGISTRY.histogram(name, labels))
+
+
+def inc(name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None):
+    """Suma value al contador `name`."""
+    if not _enabled:
+        return
+    REGISTRY.counter(name, labels).inc(value)
+
+
+def observe(name: str, value: float, labels: Optional[Dict[str, str]] = None,
+            buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+    """
+    Registra value en el histograma `name` (para valores que no son duraciones de un bloque).
+
+    Args:
+        name: Nombre de la métrica (p. ej. 'scheduler_batch_size')
+        value: Valor observado
+        labels: Etiquetas opcionales
+        buckets: Límites de los buckets si el histograma aún no existe
+    """
+    if not _enabled:
+        return
+    REGISTRY.histogram(name, labels, buckets).observe(value)
+
+
+def render_prometheus() -> str:
+    """Métricas de este proceso (y de sus workers, ver set_multiprocess_dir) en formato Prometheus."""
+    return _render_prometheus(to_dict())
+
+
+def to_dict() -> dict:
+    """Métricas de este proceso (y de sus workers, ver set_multiprocess_dir) como diccionario."""
+    if _multiprocess_dir is None:
+        return REGISTRY.to_dict()
+
+    with _multiprocess_lock:
+        merged = MetricsRegistry()
+        merged.merge(REGISTRY.to_dict())
+        for _, data in _read_process_files():
+            merged.merge(data)
+    return merged.to_dict()
+
+
+def _write_json(data: dict, path: str):
+    # Escritura atómica: nunca queda un archivo a medias
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def dump_json(path: str):
+    """Guarda las métricas en JSON (escritura atómica: nunca queda un archivo a medias)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    _write_json(to_dict(), path)
+
+
+# ============================================================
+# VARIOS PROCESOS
+# ============================================================
+def set_multiprocess_dir(path: Optional[str]):
+    """
+    Directorio donde los procesos hijos vuelcan sus métricas (None = ninguno).
+
+    Se fija en el padre antes de crear los hijos; estos lo heredan con fork().
+    """
+    global _multiprocess_dir
+    if path is not None:
+        os.makedirs(path, exist_ok=True)
+    _multiprocess_dir = path
+
+
+def multiprocess_dir() -> Optional[str]:
+    return _multiprocess_dir
+
+
+def dump_process():
+    """Vuelca las métricas de este proceso en proc-<pid>.json del directorio multiproceso."""
+    if _multiprocess_dir is None:
+        return
+    _write_json(REGISTRY.to_dict(), os.path.join(_multiprocess_dir, f"proc-{os.getpid()}.json"))
+
+
+def _read_process_files() -> list:
+    """[(ruta, métricas)] de los volcados de los hijos."""
+    parts = []
+    for name in sorted(os.listdir(_multiprocess_dir)):
+        if not (name.startswith('proc-') and name.endswith('.json')):
+            continue
+        path = os.path.join(_multiprocess_dir, name)
+        try:
+            with open(path, encoding='utf-8') as f:
+                parts.append((path, json.load(f)))
+        except (OSError, ValueError):
+            # Borrado entre listdir y open
+            continue
+    return parts
+
+
+def absorb_process_files():
+    """
+    Suma al registro de este proceso los volcados de los hijos y los borra.
+
+    Se llama cuando los hijos han terminado, para que sus métricas sigan en
+    las exportaciones del padre (p. ej. el último dump_json) sin el directorio.
+    """
+    if _multiprocess_dir is None:
+        return
+    with _multiprocess_lock:
+        for path, data in _read_process_files():
+            REGISTRY.merge(data)
+            os.remove(path)
+
+
+# ============================================================
+# EXPORTACIÓN
+# ============================================================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            body = render_prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif self.path == '/metrics.json':
+            body = json.dumps(to_dict()).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Sin una línea por cada consulta de Prometheus
+        pass
+
+
+def start_http_server(port: int = 9100, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Sirve /metrics (Prometheus) y /metrics.json en un hilo en segundo plano.
+
+    Args:
+        port: Puerto (0 = uno libre; ver server.server_address)
+        host: Dirección de escucha
+
+    Returns:
+        Servidor HTTP (server.shutdown() para detenerlo)
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+
+def start_json_dumper(path: str, interval: float = 60.0) -> threading.Event:
+    """
+    Guarda las métricas en `path` cada `interval` segundos.
+
+    Returns:
+        Evento que detiene el volcado (event.set()); al detenerse se hace un último volcado
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            dump_json(path)
+        dump_json(path)
+
+    threading.Thread(target=run, name='metrics-json', daemon=True).start()
+    return stop
+
+
+# ============================================================
+# PERFILES POR PETICIÓN
+# ============================================================
+def enable_profiling(output_dir: str):
+    """Activa cProfile por petición; los perfiles se guardan en output_dir."""
+    global _profile_dir
+    os.makedirs(output_dir, exist_ok=True)
+    _profile_dir = output_dir
+
+
+def disable_profiling():
+    global _profile_dir
+    _profile_dir = None
+
+
+class _ProfileRequest:
+    __slots__ = ('name', 'profiler')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        try:
+            self.profiler.enable()
+        except ValueError:
+            # Ya hay otro perfil activo (otra petición en otro hilo): esta no se perfila
+            self.profiler = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler is None:
+            return False
+        self.profiler.disable()
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        filename = f"{self.name}-{stamp}-{os.getpid()}-{time.perf_counter_ns() % 10**9}.prof"
+        self.profiler.dump_stats(os.path.join(_profile_dir, filename))
+        return False
+
+
+def profile_request(name: str):
+    """
+    Contexto que perfila el bloque con cProfile si enable_profiling() está activo.
+
+    Args:
+        name: Prefijo del archivo .prof (p. ej. 'classify', 'email')
+    """
+    if _profile_dir is None:
+        return _NULL_TIMER
+    return _ProfileRequest(name)
@@ -5,6 +5,7 @@ Usa TF-IDF + OneVsRestClassifier para clasificación de géneros de películas.
 
 import os
 import re
+from typing import List
 import pandas as pd
 import joblib
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -15,6 +16,12 @@ from sklearn.metrics import classification_report, hamming_loss, f1_score
 import nltk
 from nltk.corpus import stopwords
 
+try:
+    from . import metrics
+except ImportError:
+    # Ejecutado como script (python src/model.py)
+    import metrics
+
 # Descargar stopwords en español si no están disponibles
 try:
     stopwords.words('spanish')
@@ -83,16 +90,19 @@ class MultiLabelClassifier:
         text = re.sub(r'\s+', ' ', text).strip()
         return text
     
-    def train(self, data_path: str, test_size: float = 0.2) -> dict:
+    def load_split(self, data_path: str, test_size: float = 0.2) -> tuple:
         """
-        Entrena el modelo con los datos proporcionados.
+        Carga y preprocesa el dataset y lo divide en train/test.
+        
+        La división es siempre la misma (random_state=42), así que sirve
+        para evaluar más tarde un modelo con los mismos datos de test.
         
         Args:
             data_path: Ruta al archivo CSV con los datos
             test_size: Proporción de datos para test
             
         Returns:
-            Diccionario con métricas de evaluación
+            (X_train, X_test, y_train, y_test) con los textos ya preprocesados
         """
         # Cargar datos
         df = pd.read_csv(data_path)
@@ -104,9 +114,20 @@ class MultiLabelClassifier:
         y = df[self.LABELS].values
         
         # Dividir en train/test
-        X_train, X_test, y_train, y_test = train_test_split(
-            texts, y, test_size=test_size, random_state=42
-        )
+        return train_test_split(texts, y, test_size=test_size, random_state=42)
+    
+    def train(self, data_path: str, test_size: float = 0.2) -> dict:
+        """
+        Entrena el modelo con los datos proporcionados.
+        
+        Args:
+            data_path: Ruta al archivo CSV con los datos
+            test_size: Proporción de datos para test
+            
+        Returns:
+            Diccionario con métricas de evaluación
+        """
+        X_train, X_test, y_train, y_test = self.load_split(data_path, test_size)
         
         # Vectorizar
         X_train_tfidf = self.vectorizer.fit_transform(X_train)
@@ -117,18 +138,67 @@ class MultiLabelClassifier:
         self.is_fitted = True
         
         # Evaluar
-        y_pred = self.classifier.predict(X_test_tfidf)
+        return self.evaluate(X_test, y_test, preprocessed=True)
+    
+    def evaluate(self, texts: list, y, preprocessed: bool = False) -> dict:
+        """
+        Evalúa el modelo (sin el boost por palabras clave).
         
-        metrics = {
-            'hamming_loss': hamming_loss(y_test, y_pred),
-            'f1_micro': f1_score(y_test, y_pred, average='micro'),
-            'f1_macro': f1_score(y_test, y_pred, average='macro'),
+        Args:
+            texts: Textos a clasificar
+            y: Etiquetas reales (n_textos, n_etiquetas) con 0/1
+            preprocessed: True si los textos ya pasaron por _preprocess_text
+            
+        Returns:
+            Diccionario con métricas de evaluación y las predicciones ('y_pred')
+        """
+        if not self.is_fitted:
+            raise ValueError("El modelo no ha sido entrenado. Ejecute train() primero.")
+        
+        if not preprocessed:
+            texts = [self._preprocess_text(t) for t in texts]
+        y_pred = self.classifier.predict(self.vectorizer.transform(texts))
+        
+        return {
+            'hamming_loss': hamming_loss(y, y_pred),
+            'f1_micro': f1_score(y, y_pred, average='micro', zero_division=0),
+            'f1_macro': f1_score(y, y_pred, average='macro', zero_division=0),
             'classification_report': classification_report(
-                y_test, y_pred, target_names=self.LABELS, zero_division=0
-            )
+                y, y_pred, target_names=self.LABELS, zero_division=0
+            ),
+            'y_pred': y_pred
         }
+    
+    def compress(self, prune_ratio: float = 0.01, dtype: str = 'int8') -> 'MultiLabelClassifier':
+        """
+        Crea una versión comprimida del modelo (ver src/compression.py).
+        
+        Elimina las características con peso despreciable para todas las
+        etiquetas y cuantiza los pesos restantes con una escala por etiqueta.
+        El resultado se guarda con save() y se carga con load() como
+        cualquier otro modelo.
+        
+        Args:
+            prune_ratio: Fracción del peso máximo de cada etiqueta por debajo
+                de la cual una característica se considera despreciable
+            dtype: Tipo de los pesos: 'int8', 'float16' o 'float32'
+            
+        Returns:
+            Nuevo MultiLabelClassifier comprimido (este no se modifica)
+        """
+        if not self.is_fitted:
+            raise ValueError("El modelo no ha sido entrenado. Ejecute train() primero.")
+        if not hasattr(self.classifier, 'estimators_'):
+            raise ValueError("El modelo ya está comprimido.")
         
-        return metrics
+        from .compression import compress_model
+        
+        compressed = MultiLabelClassifier.__new__(MultiLabelClassifier)
+        compressed.vectorizer, compressed.classifier = compress_model(
+            self.vectorizer, self.classifier, prune_ratio=prune_ratio, dtype=dtype
+        )
+        compressed.is_fitted = True
+        return compressed
     
     # Palabras clave por género para boost
     KEYWORDS = {
@@ -155,18 +225,47 @@ class MultiLabelClassifier:
         Returns:
             Diccionario con etiquetas y probabilidades
         """
+        return self.predict_batch([text])[0]
+    
+    def predict_batch(self, texts: List[str]) -> List[dict]:
+        """
+        Predice las etiquetas para varios textos a la vez.
+        
+        Vectorizar y calcular probabilidades para N textos en una sola
+        llamada evita el coste fijo de sklearn (validaciones, matrices de
+        una fila) que en predict() se paga por cada texto.
+        
+        Args:
+            texts: Textos a clasificar
+            
+        Returns:
+            Lista de diccionarios con etiquetas y probabilidades (mismo orden)
+        """
         if not self.is_fitted:
             raise ValueError("El modelo no ha sido entrenado. Ejecute train() primero.")
+        if not texts:
+            return []
         
         # Preprocesar
-        processed_text = self._preprocess_text(text)
+        with metrics.timer('model_preprocess_seconds'):
+            processed_texts = [self._preprocess_text(text) for text in texts]
         
         # Vectorizar
-        X = self.vectorizer.transform([processed_text])
+        with metrics.timer('model_vectorize_seconds'):
+            X = self.vectorizer.transform(processed_texts)
         
-        # Predecir probabilidades del modelo ML
-        probabilities = self.classifier.predict_proba(X)[0]
+        # Predecir probabilidades del modelo ML (+ boost por palabras clave)
+        with metrics.timer('model_score_seconds'):
+            probabilities = self.classifier.predict_proba(X)
+            results = [self._format_prediction(probs, processed_text)
+                       for probs, processed_text in zip(probabilities, processed_texts)]
         
+        metrics.inc('model_predictions_total', len(texts))
+        metrics.inc('model_batches_total')
+        return results
+    
+    def _format_prediction(self, probabilities, processed_text: str) -> dict:
+        """Aplica el boost por palabras clave y el umbral a las probabilidades de un texto."""
         # Aplicar boost por palabras clave
         boosted_probs = list(probabilities)
         for i, label in enumerate(self.LABELS):
@@ -239,13 +338,13 @@ if __name__ == "__main__":
     
     # Crear y entrenar modelo
     classifier = MultiLabelClassifier()
-    metrics = classifier.train(data_path)
+    train_metrics = classifier.train(data_path)
     
     print("\n=== Métricas de Entrenamiento ===")
-    print(f"Hamming Loss: {metrics['hamming_loss']:.4f}")
-    print(f"F1 Micro: {metrics['f1_micro']:.4f}")
-    print(f"F1 Macro: {metrics['f1_macro']:.4f}")
-    print(f"\n{metrics['classification_report']}")
+    print(f"Hamming Loss: {train_metrics['hamming_loss']:.4f}")
+    print(f"F1 Micro: {train_metrics['f1_micro']:.4f}")
+    print(f"F1 Macro: {train_metrics['f1_macro']:.4f}")
+    print(f"\n{train_metrics['classification_report']}")
     
     # Guardar modelo
     classifier.save(model_path)
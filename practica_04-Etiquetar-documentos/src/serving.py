@@ -0,0 +1,569 @@
+"""
+Módulo de servicio multi-proceso (pre-fork) del clasificador.
+
+El proceso padre carga el modelo una vez y crea N procesos hijos con
+fork(): todos comparten las páginas de memoria del modelo (copy-on-write),
+así que N workers no ocupan N veces el modelo. Cada worker acepta
+conexiones del mismo socket y agrupa las peticiones en micro-lotes.
+
+Protocolo (JSON por líneas sobre TCP):
+    petición:  {"id": 1, "text": "Un robot viaja en el tiempo..."}
+    respuesta: {"id": 1, "labels": [...], "probabilities": {...}}
+               {"id": 1, "error": "..."}   si la petición no es válida
+Las respuestas de una conexión llegan en el mismo orden que las peticiones.
+
+Con las métricas activadas (src.metrics), cada worker vuelca las suyas
+en un directorio temporal y el padre las suma al exportar (/metrics,
+dump_json): serving_request_seconds mide cada petición desde que llega
+su línea hasta que su respuesta está lista para enviarse.
+"""
+
+import gc
+import json
+import os
+import selectors
+import shutil
+import signal
+import socket
+import tempfile
+import time
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+from .model import MultiLabelClassifier
+from . import metrics
+
+
+# Segundos entre volcados de las métricas de un worker con actividad
+METRICS_DUMP_INTERVAL = 1.0
+
+
+class PreforkServer:
+    """Servidor pre-fork: un modelo en el padre, N workers que lo comparten."""
+
+    def __init__(
+        self,
+        classifier: MultiLabelClassifier,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        n_workers: Optional[int] = None,
+        max_batch_size: int = 32,
+        max_delay: float = 0.002
+    ):
+        """
+        Inicializa el servidor (no arranca los workers hasta start()).
+
+        Args:
+            classifier: Clasificador ya entrenado o cargado
+            host: Dirección de escucha
+            port: Puerto de escucha (0 = uno libre)
+            n_workers: Procesos worker (None = número de CPUs)
+            max_batch_size: Máximo de textos por llamada a predict_batch
+            max_delay: Segundos que un worker espera a completar un lote
+        """
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("El modo pre-fork necesita os.fork() (Linux o macOS)")
+        if not classifier.is_fitted:
+            raise ValueError("El modelo no ha sido entrenado.")
+
+        self.classifier = classifier
+        self.host = host
+        self.port = port
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        self.listener = None
+        self.workers = []
+        self._running = False
+        self._metrics_dir = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, puerto) real de escucha."""
+        return self.listener.getsockname()[:2]
+
+    def start(self) -> Tuple[str, int]:
+        """
+        Abre el socket y crea los workers.
+
+        Returns:
+            (host, puerto) de escucha
+        """
+        self.listener = socket.create_server((self.host, self.port), backlog=1024)
+
+        # Cada worker tiene su propio registro de métricas: los vuelca en un
+        # directorio común que el padre suma al exportar
+        if metrics.is_enabled() and metrics.multiprocess_dir() is None:
+            self._metrics_dir = tempfile.mkdtemp(prefix='prefork-metrics-')
+            metrics.set_multiprocess_dir(self._metrics_dir)
+
+        # Los objetos del modelo pasan a la generación permanente del GC: las
+        # recolecciones de los hijos no los recorren ni escriben en sus
+        # cabeceras, así que sus páginas siguen compartidas tras el fork
+        gc.collect()
+        gc.freeze()
+
+        self._running = True
+        for _ in range(self.n_workers):
+            self.workers.append(self._spawn_worker())
+        return self.address
+
+    def _spawn_worker(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            # Proceso hijo: Ctrl+C lo gestiona el padre; SIGTERM sale por el
+            # finally para volcar las métricas antes de terminar
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, _exit_on_sigterm)
+            # Las métricas heredadas del padre ya las exporta él
+            metrics.REGISTRY.reset()
+            code = 0
+            try:
+                _worker_loop(self.listener, self.classifier, self.max_batch_size, self.max_delay)
+            except SystemExit:
+                pass
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            finally:
+                signal.signal(signal.SIGTERM, signal.SIG_IGN)
+                try:
+                    metrics.dump_process()
+                except Exception:
+                    traceback.print_exc()
+                os._exit(code)
+        return pid
+
+    def serve_forever(self):
+        """Arranca (si hace falta) y vigila los workers, reemplazando los que mueran."""
+        if not self._running:
+            self.start()
+
+        try:
+            while self._running:
+                pid, _ = os.wait()
+                if pid in self.workers and self._running:
+                    self.workers[self.workers.index(pid)] = self._spawn_worker()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            # Un segundo Ctrl+C no debe dejar workers huérfanos
+            previous = signal.signal(signal.SIGINT, signal.SIG_IGN)
+            try:
+                self.stop()
+            finally:
+                signal.signal(signal.SIGINT, previous)
+
+    def stop(self):
+        """Detiene los workers y cierra el socket."""
+        self._running = False
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in self.workers:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.workers = []
+
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        gc.unfreeze()
+
+        # Las métricas de los workers pasan al registro del padre
+        metrics.absorb_process_files()
+        if self._metrics_dir is not None:
+            metrics.set_multiprocess_dir(None)
+            shutil.rmtree(self._metrics_dir, ignore_errors=True)
+            self._metrics_dir = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _exit_on_sigterm(signum, frame):
+    raise SystemExit(0)
+
+
+# Bytes de respuesta pendientes por conexión a partir de los cuales se deja
+# de leer de ella: un cliente que no lee sus respuestas no acumula memoria
+MAX_OUTPUT_BUFFER = 1024 * 1024
+
+
+class _Connection:
+    """Estado de una conexión en un worker: bytes recibidos y por enviar."""
+
+    __slots__ = ('sock', 'inbuf', 'outbuf', 'eof')
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.inbuf = b""            # recibido sin '\n' final
+        self.outbuf = bytearray()   # respuestas aún no enviadas
+        self.eof = False            # el cliente ya no enviará más (half-close)
+
+    def events(self) -> int:
+        events = 0
+        if not self.eof and len(self.outbuf) < MAX_OUTPUT_BUFFER:
+            events |= selectors.EVENT_READ
+        if self.outbuf:
+            events |= selectors.EVENT_WRITE
+        return events
+
+    def flush(self) -> bool:
+        """Envía lo que acepte el socket sin bloquear. False si la conexión se ha roto."""
+        try:
+            while self.outbuf:
+                sent = self.sock.send(self.outbuf)
+                del self.outbuf[:sent]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            return False
+        return True
+
+
+def _worker_loop(listener: socket.socket, classifier: MultiLabelClassifier,
+                 max_batch_size: int, max_delay: float):
+    """
+    Bucle de un worker: un único hilo con selectors, sin GIL compartido.
+
+    Las líneas recibidas de todas las conexiones se acumulan en un lote que
+    se clasifica cuando llega a max_batch_size o cuando la petición más
+    antigua lleva max_delay segundos esperando. Los sockets no bloquean:
+    las respuestas que no caben se guardan y se envían con EVENT_WRITE, así
+    que un cliente lento no detiene al worker para los demás. Si el cliente
+    cierra su lado de escritura (`nc -N`), se responde a lo que ya envió
+    (también a una última línea sin '\n') antes de cerrar.
+    """
+    listener.setblocking(False)
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+    pending = []            # [(conexión, petición, error, hora de llegada)]
+
+    # Volcado de métricas: como mucho cada METRICS_DUMP_INTERVAL y solo si
+    # ha habido peticiones desde el anterior
+    dump_metrics = metrics.multiprocess_dir() is not None
+    next_dump = None
+
+    def close(conn: _Connection):
+        nonlocal pending
+        if conn.sock in selector.get_map():
+            selector.unregister(conn.sock)
+        conn.sock.close()
+        # Peticiones de una conexión cerrada: no hay a quién responder
+        pending = [item for item in pending if item[0] is not conn]
+
+    def update(conn: _Connection):
+        events = conn.events()
+        registered = conn.sock in selector.get_map()
+        if not events:
+            # Tras el EOF y sin nada por enviar: se cierra si ya no quedan
+            # peticiones suyas en el lote; si quedan, se espera a responderlas
+            if not any(item[0] is conn for item in pending):
+                close(conn)
+            elif registered:
+                selector.unregister(conn.sock)
+        elif not registered:
+            selector.register(conn.sock, events, conn)
+        elif events != selector.get_key(conn.sock).events:
+            selector.modify(conn.sock, events, conn)
+
+    while True:
+        timeout = None
+        if pending:
+            timeout = max(0.0, pending[0][3] + max_delay - time.monotonic())
+        if next_dump is not None:
+            until_dump = max(0.0, next_dump - time.monotonic())
+            timeout = until_dump if timeout is None else min(timeout, until_dump)
+
+        for key, events in selector.select(timeout):
+            if key.fileobj is listener:
+                try:
+                    sock, _ = listener.accept()
+                except BlockingIOError:
+                    # Otro worker aceptó la conexión antes
+                    continue
+                sock.setblocking(False)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                selector.register(sock, selectors.EVENT_READ, _Connection(sock))
+                continue
+
+            conn = key.data
+            if events & selectors.EVENT_WRITE:
+                if not conn.flush():
+                    close(conn)
+                    continue
+                update(conn)
+            if not events & selectors.EVENT_READ:
+                continue
+
+            try:
+                data = conn.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except ConnectionError:
+                close(conn)
+                continue
+
+            if data:
+                *lines, conn.inbuf = (conn.inbuf + data).split(b"\n")
+            else:
+                # EOF: se deja de leer y lo que quedaba sin '\n' es la última petición
+                lines, conn.inbuf, conn.eof = [conn.inbuf], b"", True
+            now = time.monotonic()
+            for line in lines:
+                if line.strip():
+                    pending.append((conn, *_parse_request(line), now))
+            if conn.eof:
+                update(conn)
+
+        while pending and (len(pending) >= max_batch_size
+                           or time.monotonic() - pending[0][3] >= max_delay):
+            batch, pending = pending[:max_batch_size], pending[max_batch_size:]
+            for conn in _answer_batch(classifier, batch):
+                if conn.flush():
+                    update(conn)
+                else:
+                    close(conn)
+
+            done = time.monotonic()
+            metrics.observe('serving_batch_size', len(batch), buckets=metrics.BATCH_SIZE_BUCKETS)
+            for *_, arrival in batch:
+                metrics.observe('serving_request_seconds', done - arrival)
+            if dump_metrics and next_dump is None:
+                next_dump = done + METRICS_DUMP_INTERVAL
+
+        if next_dump is not None and time.monotonic() >= next_dump:
+            metrics.dump_process()
+            next_dump = None
+
+
+def _parse_request(line: bytes) -> Tuple[dict, Optional[str]]:
+    """(petición, None) si es válida; (petición o {}, mensaje de error) si no."""
+    try:
+        request = json.loads(line)
+    except ValueError:
+        return {}, "JSON no válido"
+    if not isinstance(request, dict):
+        return {}, "La petición debe ser un objeto JSON"
+    if not isinstance(request.get('text'), str):
+        return request, "Falta el campo 'text'"
+    return request, None
+
+
+def _answer_batch(classifier: MultiLabelClassifier, batch: list) -> list:
+    """
+    Clasifica un lote y añade cada respuesta al buffer de salida de su
+    conexión (en orden). Devuelve las conexiones con respuestas nuevas.
+    """
+    texts = [request['text'] for _, request, error, _ in batch if error is None]
+    try:
+        predictions = iter(classifier.predict_batch(texts))
+        failure = None
+    except Exception as e:
+        predictions, failure = iter(()), str(e)
+
+    answered = []
+    metrics.inc('serving_requests_total', len(batch))
+    for conn, request, error, _ in batch:
+        error = error or failure
+        if error is not None:
+            metrics.inc('serving_request_errors_total')
+            response = {'id': request.get('id'), 'error': error}
+        else:
+            response = {'id': request.get('id'), **next(predictions)}
+        conn.outbuf += (json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8")
+        if conn not in answered:
+            answered.append(conn)
+    return answered
+
+
+class ServingClient:
+    """Cliente del PreforkServer (una conexión, peticiones en cadena)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, timeout: float = 30.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+
+    def predict(self, text: str) -> dict:
+        """Clasifica un texto."""
+        return self.predict_many([text])[0]
+
+    def predict_many(self, texts: List[str], window: int = 64) -> List[Dict]:
+        """
+        Clasifica varios textos enviando hasta `window` peticiones antes de
+        leer sus respuestas: el worker las recibe juntas y las agrupa en lote.
+
+        Args:
+            texts: Textos a clasificar
+            window: Peticiones en vuelo como máximo (acota los buffers del socket)
+
+        Returns:
+            Respuestas del servidor, en el mismo orden que texts
+        """
+        results = []
+        for start in range(0, len(texts), window):
+            chunk = texts[start:start + window]
+            payload = "".join(json.dumps({'id': start + i, 'text': text}, ensure_ascii=False) + "\n"
+                              for i, text in enumerate(chunk))
+            self.sock.sendall(payload.encode("utf-8"))
+            for _ in chunk:
+                line = self.reader.readline()
+                if not line:
+                    raise ConnectionError("El servidor cerró la conexión")
+                results.append(json.loads(line))
+        return results
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+# BENCHMARK
+# ============================================================
+def _client_process(address: Tuple[str, int], texts: List[str], n_requests: int,
+                    window: int, start_at: float):
+    # Todos los clientes empiezan a la vez
+    time.sleep(max(0.0, start_at - time.time()))
+    requests = [texts[i % len(texts)] for i in range(n_requests)]
+    with ServingClient(*address) as client:
+        client.predict_many(requests, window=window)
+
+
+def benchmark_serving(
+    classifier: MultiLabelClassifier,
+    texts: List[str],
+    worker_counts: Tuple[int, ...] = (1, 2, 4),
+    n_clients: Optional[int] = None,
+    requests_per_client: int = 500,
+    window: int = 64,
+    max_batch_size: int = 32,
+    verbose: bool = True
+) -> List[Dict]:
+    """
+    Mide peticiones/s del servidor con distinto número de workers.
+
+    Los clientes son procesos aparte (no comparten GIL con nadie). El
+    escalado solo puede acercarse a lineal mientras haya núcleos libres
+    para workers y clientes a la vez.
+
+    Args:
+        classifier: Clasificador a servir
+        texts: Textos de ejemplo (se repiten cíclicamente)
+        worker_counts: Números de workers a probar
+        n_clients: Clientes simultáneos (None = 2 × máximo de workers)
+        requests_per_client: Peticiones por cliente
+        window: Peticiones en vuelo por cliente
+        max_batch_size: Tamaño máximo de micro-lote en los workers
+        verbose: Mostrar resultados
+
+    Returns:
+        Lista de diccionarios con workers, wall_time, requests_per_sec,
+        speedup y efficiency
+    """
+    import multiprocessing as mp
+
+    ctx = mp.get_context('fork')
+    n_clients = n_clients or 2 * max(worker_counts)
+    total = n_clients * requests_per_client
+    results = []
+
+    for n_workers in worker_counts:
+        with PreforkServer(classifier, port=0, n_workers=n_workers,
+                           max_batch_size=max_batch_size) as server:
+            # Calentamiento: cada worker acepta y responde al menos una vez
+            with ServingClient(*server.address) as client:
+                client.predict_many(texts[:8])
+
+            start_at = time.time() + 0.2
+            clients = [ctx.Process(target=_client_process,
+                                   args=(server.address, texts, requests_per_client, window, start_at))
+                       for _ in range(n_clients)]
+            for p in clients:
+                p.start()
+            for p in clients:
+                p.join()
+            wall_time = time.time() - start_at
+
+            failed = [p.exitcode for p in clients if p.exitcode != 0]
+            if failed:
+                raise RuntimeError(f"{len(failed)} clientes terminaron con error")
+
+        results.append({
+            'workers': n_workers,
+            'wall_time': wall_time,
+            'requests_per_sec': total / wall_time,
+        })
+
+    base = results[0]['requests_per_sec'] / results[0]['workers']
+    for r in results:
+        r['speedup'] = r['requests_per_sec'] / base
+        r['efficiency'] = r['speedup'] / r['workers']
+
+    if verbose:
+        print(f"\n{n_clients} clientes × {requests_per_client} peticiones "
+              f"(CPUs disponibles: {os.cpu_count()})")
+        print(f"{'Workers':>8} {'Tiempo (s)':>11} {'Peticiones/s':>13} {'Speedup':>8} {'Eficiencia':>11}")
+        for r in results:
+            print(f"{r['workers']:>8} {r['wall_time']:>11.2f} {r['requests_per_sec']:>13.0f} "
+                  f"{r['speedup']:>8.2f} {r['efficiency']:>11.0%}")
+
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="Benchmark del servidor pre-fork")
+    parser.add_argument('--model', default=os.path.join(base_dir, "models", "multilabel_classifier.pkl"))
+    parser.add_argument('--data', default=os.path.join(base_dir, "data", "documents.csv"),
+                        help='CSV con textos de ejemplo')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int)
+    parser.add_argument('--requests', type=int, default=500, help='Peticiones por cliente')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        raise SystemExit(f"No se encontró el modelo en {args.model}. Ejecute: python main.py train")
+
+    import pandas as pd
+
+    classifier = MultiLabelClassifier(args.model)
+    texts = pd.read_csv(args.data)['text'].tolist()
+
+    # Un proceso: predict() texto a texto frente a predict_batch()
+    sample = [texts[i % len(texts)] for i in range(512)]
+    start = time.perf_counter()
+    for text in sample:
+        classifier.predict(text)
+    single = len(sample) / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for i in range(0, len(sample), 32):
+        classifier.predict_batch(sample[i:i + 32])
+    batched = len(sample) / (time.perf_counter() - start)
+    print("\n--- UN PROCESO ---")
+    print(f"predict():           {single:8.0f} textos/s")
+    print(f"predict_batch(32):   {batched:8.0f} textos/s ({batched / single:.1f}x)")
+
+    print("\n--- SERVIDOR PRE-FORK ---")
+    benchmark_serving(classifier, texts, worker_counts=tuple(args.workers),
+                      n_clients=args.clients, requests_per_client=args.requests)